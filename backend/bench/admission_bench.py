@@ -0,0 +1,149 @@
+"""
+Latency of admitted requests under overload, with and without admission control.
+
+With --target toy (the default), builds an app whose single route holds one
+of --pool "connections" for --service-ms, like a request on a connection
+pool, and sends it --rate requests per second for --seconds, well beyond
+what the pool can serve (pool / service time). Without admission control
+every request queues on the pool and latency grows with the backlog for as
+long as the overload lasts; with AdmissionMiddleware (limit = --pool,
+bounded queue) the admitted requests keep a bounded p99 and the rest get a
+fast 503:
+
+  python -m bench.admission_bench --rate 600 --seconds 10
+
+With --target app, the same open loop runs against the real app (its whole
+middleware stack, the admission limits from the settings and the engine's
+pool) on GET --path, after seeding the database DATABASE_URL points at. The
+unlimited run empties the app's limiters. Pick a --rate above what the
+machine serves, from backend/:
+
+  DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m bench.admission_bench --target app --rate 400
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import APIRouter, FastAPI
+
+from bench.load import percentile
+from bench.seed import seed
+from src.core.admission import ConcurrencyLimiter, admission_limiters
+from src.core.middleware.admission_middleware import AdmissionMiddleware
+
+
+def build_app(pool_size: int, service_seconds: float, limiters=None) -> FastAPI:
+  pool = asyncio.Semaphore(pool_size)
+  router = APIRouter()
+
+  @router.get("/api/projects/")
+  async def list_projects():
+    async with pool:
+      await asyncio.sleep(service_seconds)
+    return {"data": [], "status": "success"}
+
+  app = FastAPI()
+  app.include_router(router)
+  if limiters is not None:
+    app.add_middleware(AdmissionMiddleware, limiters=limiters)
+  return app
+
+
+async def run(app: FastAPI, rate: float, seconds: float, path: str = "/api/projects/") -> dict:
+  admitted, shed = [], []
+
+  async def send(client: httpx.AsyncClient):
+    start = time.perf_counter()
+    response = await client.get(path)
+    elapsed = time.perf_counter() - start
+    if response.status_code == 503:
+      assert response.headers["retry-after"]
+      shed.append(elapsed)
+    else:
+      admitted.append(elapsed)
+
+  transport = httpx.ASGITransport(app=app)
+  limits = httpx.Limits(max_connections=None)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, headers={"user-agent": "bench"}) as client:
+    # Open loop: requests keep arriving at the same rate however slow the responses get
+    start = time.perf_counter()
+    sent = []
+    for index in range(int(rate * seconds)):
+      await asyncio.sleep(max(0.0, start + index / rate - time.perf_counter()))
+      sent.append(asyncio.create_task(send(client)))
+    await asyncio.gather(*sent)
+    elapsed = time.perf_counter() - start
+
+  admitted.sort()
+  shed.sort()
+  return {
+    "admitted": len(admitted),
+    "admitted_rps": len(admitted) / elapsed,
+    "p50_ms": percentile(admitted, 0.50) * 1000,
+    "p99_ms": percentile(admitted, 0.99) * 1000,
+    "shed": len(shed),
+    "shed_p99_ms": percentile(shed, 0.99) * 1000 if shed else 0.0,
+  }
+
+
+def report(label: str, result: dict) -> None:
+  print(
+    f"{label:<10}{result['admitted']:>7} admitted{result['admitted_rps']:>8.0f} req/s"
+    f"{result['p50_ms']:>9.1f}ms p50{result['p99_ms']:>9.1f}ms p99"
+    f"{result['shed']:>7} shed{result['shed_p99_ms']:>8.2f}ms shed p99"
+  )
+
+
+async def run_toy(args) -> None:
+  service_seconds = args.service_ms / 1000
+  print(f"offered {args.rate:.0f} req/s, capacity {args.pool / service_seconds:.0f} req/s")
+  cases = [
+    ("unlimited", None),
+    ("admission", {"reads": ConcurrencyLimiter("reads", args.pool, args.queue_size, args.queue_timeout)}),
+  ]
+  for label, limiters in cases:
+    report(label, await run(build_app(args.pool, service_seconds, limiters), args.rate, args.seconds))
+
+
+async def run_app(args) -> None:
+  from src.core.db import async_engine
+  from src.main import app
+
+  logging.getLogger("app").setLevel(logging.WARNING)
+  await seed(args.projects, args.tasks, reset=True)
+
+  limits = {group: limiter.stats() for group, limiter in admission_limiters.items()}
+  print(f"offered {args.rate:.0f} req/s on GET {args.path}, admission limits {limits}")
+  configured = dict(admission_limiters)
+  admission_limiters.clear()
+  report("unlimited", await run(app, args.rate, args.seconds, args.path))
+  admission_limiters.update(configured)
+  report("admission", await run(app, args.rate, args.seconds, args.path))
+  await async_engine.dispose()
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--target", choices=["toy", "app"], default="toy")
+  parser.add_argument("--rate", type=float, default=600, help="requests per second")
+  parser.add_argument("--seconds", type=float, default=10)
+  parser.add_argument("--pool", type=int, default=15, help="toy: connections, DB_POOL_SIZE + DB_MAX_OVERFLOW")
+  parser.add_argument("--service-ms", type=float, default=50.0, help="toy: time a request holds its connection")
+  parser.add_argument("--queue-size", type=int, default=50, help="toy: admission queue size")
+  parser.add_argument("--queue-timeout", type=float, default=2.0, help="toy: admission queue timeout")
+  parser.add_argument("--path", default="/api/projects/?limit=50", help="app: route requested")
+  parser.add_argument("--projects", type=int, default=1000, help="app: projects seeded")
+  parser.add_argument("--tasks", type=int, default=10, help="app: tasks seeded per project")
+  args = parser.parse_args()
+
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+
+  if args.target == "app":
+    await run_app(args)
+  else:
+    await run_toy(args)
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+CPU cost and size of the compressed project list response, per coding and level.
+
+Compresses the body of a 10k-row project page, as the serializer renders it,
+in one piece and in 64KB chunks (the streaming path, each chunk flushed) with
+the encoders of CompressionMiddleware, to pick the COMPRESSION_* levels:
+
+  python -m bench.compression_bench --rows 10000
+"""
+import argparse
+import time
+
+from src.core.config import settings
+from src.core.middleware import compression_middleware
+from src.core.serialization import ResponseSerializer
+from src.models.models import Project
+from src.schemas.ProjectSchema import ProjectResponse
+
+from bench.serialization_bench import build_rows
+
+LEVELS = {
+  "gzip": ("COMPRESSION_GZIP_LEVEL", (1, 6, 9)),
+  "zstd": ("COMPRESSION_ZSTD_LEVEL", (1, 3, 9)),
+  "br": ("COMPRESSION_BROTLI_QUALITY", (1, 4, 9)),
+}
+
+
+def measure(encoder_factory, body: bytes, chunk_size: int, repeat: int):
+  best = None
+  for _ in range(repeat):
+    encoder = encoder_factory()
+    chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)]
+    start = time.thread_time()
+    size = sum(len(encoder.compress(chunk, final=index == len(chunks) - 1)) for index, chunk in enumerate(chunks))
+    seconds = time.thread_time() - start
+    best = seconds if best is None else min(best, seconds)
+  return best, size
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--rows", type=int, default=10000)
+  parser.add_argument("--chunk-size", type=int, default=settings.EXPORT_FLUSH_BYTES)
+  parser.add_argument("--repeat", type=int, default=5)
+  args = parser.parse_args()
+
+  serializer = ResponseSerializer(Project, ProjectResponse)
+  body = serializer.page({"data": build_rows(args.rows), "next_cursor": None, "status": "success"}).body
+  print(f"identity: {len(body):,} bytes")
+
+  encoders = compression_middleware.available_encoders()
+  for encoding, (setting, levels) in LEVELS.items():
+    if encoding not in encoders:
+      print(f"{encoding}: not installed")
+      continue
+    for level in levels:
+      setattr(settings, setting, level)
+      for label, chunk_size in (("whole", len(body)), ("chunked", args.chunk_size)):
+        seconds, size = measure(encoders[encoding], body, chunk_size, args.repeat)
+        print(
+          f"{encoding:<5}{level:>3} {label:<8}{size:>12,} bytes{size / len(body):>8.1%}"
+          f"{seconds * 1000:>9.1f} ms cpu{(len(body) - size) / seconds / 1e6:>10.1f} MB saved/cpu-s"
+        )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,329 @@
+"""
+Load benchmark of every project and task route against a seeded database.
+
+Each scenario sends a fixed number of requests at a fixed concurrency and
+reports throughput and p50/p95/p99 latency. The app is driven either
+in-process through httpx's ASGI transport or over HTTP against a real uvicorn
+worker (spawned here, or already running with --url). The database is the one
+DATABASE_URL points at, seeded first with bench.seed. From backend/:
+
+  export DATABASE_URL=sqlite+aiosqlite:///./bench.db
+  python -m bench.seed --projects 1000 --tasks 10 --reset
+  python -m bench.load --target asgi --output bench/results/asgi.json
+  python -m bench.load --target uvicorn --baseline bench/results/asgi.json
+
+Results are written as JSON; with --baseline the run is compared against a
+previous result file and, with --fail-on-regression, exits non-zero when a
+scenario is slower than --max-regression allows.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from itertools import count
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import func, select
+
+from bench.seed import WORDS as SEARCH_WORDS
+from src.core.db import async_engine
+from src.models.models import Project
+
+# (method, path, httpx request kwargs)
+RequestSpec = Tuple[str, str, dict]
+
+
+@dataclass
+class BenchContext:
+  """State shared by the request builders of one run"""
+  run_id: str
+  rng: random.Random
+  min_project_id: int
+  max_project_id: int
+  # Request numbers, never reused so created names stay unique across warm up and measured runs
+  sequence: Iterator[int] = field(default_factory=count)
+
+  def project_id(self) -> int:
+    return self.rng.randint(self.min_project_id, self.max_project_id)
+
+
+@dataclass
+class Scenario:
+  name: str
+  expected_status: int
+  build: Callable[[BenchContext, int], RequestSpec]
+
+
+def _project_payload(context: BenchContext, index: int) -> dict:
+  return {
+    "project_name": f"Bench {context.run_id} {index}",
+    "project_description": "Created by the load benchmark",
+    "client_name": "Bench Client",
+  }
+
+
+def _task_payload(index: int) -> dict:
+  return {"task_name": f"Bench task {index}", "task_description": "Created by the load benchmark"}
+
+
+def _import_body(context: BenchContext, index: int) -> bytes:
+  lines = []
+  for offset in range(10):
+    project = _project_payload(context, f"import-{index}-{offset}")
+    project["tasks"] = [_task_payload(task_index) for task_index in range(3)]
+    lines.append(json.dumps(project))
+  return ("\n".join(lines) + "\n").encode()
+
+
+SCENARIOS: List[Scenario] = [
+  Scenario("projects.list", 200, lambda c, i: ("GET", "/api/projects/", {"params": {"limit": 50}})),
+  Scenario("projects.list_filtered", 200, lambda c, i: ("GET", "/api/projects/", {"params": {"limit": 50, "client_name": "Client Alpha"}})),
+  # Pickers only need the ID and name of each project
+  Scenario("projects.list_sparse", 200, lambda c, i: ("GET", "/api/projects/", {"params": {"limit": 50, "fields": "id,project_name"}})),
+  Scenario("projects.list_with_tasks", 200, lambda c, i: ("GET", "/api/projects/", {"params": {"limit": 50, "include": "tasks"}})),
+  Scenario("projects.get", 200, lambda c, i: ("GET", f"/api/projects/{c.project_id()}", {})),
+  # Polling clients revalidating their copy ("*" matches any current version)
+  Scenario("projects.list_revalidate", 304, lambda c, i: ("GET", "/api/projects/", {"params": {"limit": 50}, "headers": {"if-none-match": "*"}})),
+  Scenario("projects.get_revalidate", 304, lambda c, i: ("GET", f"/api/projects/{c.project_id()}", {"headers": {"if-none-match": "*"}})),
+  Scenario("projects.create", 201, lambda c, i: ("POST", "/api/projects/", {"json": _project_payload(c, i)})),
+  Scenario("projects.update", 200, lambda c, i: (
+    "PATCH", f"/api/projects/{c.project_id()}", {"json": {"project_description": f"Updated by the load benchmark {i}"}}
+  )),
+  Scenario("projects.import", 201, lambda c, i: (
+    "POST", "/api/projects/import", {"content": _import_body(c, i), "headers": {"content-type": "application/x-ndjson"}}
+  )),
+  Scenario("projects.export_ndjson", 200, lambda c, i: ("GET", "/api/projects/export", {"params": {"format": "ndjson"}})),
+  Scenario("projects.export_csv_tasks", 200, lambda c, i: ("GET", "/api/projects/export", {"params": {"format": "csv", "include": "tasks"}})),
+  Scenario("search", 200, lambda c, i: ("GET", "/api/search", {"params": {"q": c.rng.choice(SEARCH_WORDS), "limit": 20}})),
+  Scenario("tasks.list", 200, lambda c, i: ("GET", f"/api/tasks/{c.project_id()}/tasks", {"params": {"limit": 50}})),
+  Scenario("tasks.list_open", 200, lambda c, i: (
+    "GET", f"/api/tasks/{c.project_id()}/tasks", {"params": [("status", "pending"), ("status", "in_progress"), ("limit", 50)]}
+  )),
+  Scenario("tasks.list_recent", 200, lambda c, i: (
+    "GET", f"/api/tasks/{c.project_id()}/tasks", {"params": {"limit": 50, "sort": "created_at", "order": "desc"}}
+  )),
+  Scenario("tasks.create", 201, lambda c, i: ("POST", f"/api/tasks/{c.project_id()}/tasks", {"json": _task_payload(i)})),
+  Scenario("tasks.bulk", 201, lambda c, i: (
+    "POST", f"/api/tasks/{c.project_id()}/tasks/bulk", {"json": [_task_payload(n) for n in range(50)]}
+  )),
+]
+
+# Full exports are orders of magnitude heavier than the other routes
+HEAVY_SCENARIOS = {"projects.export_ndjson", "projects.export_csv_tasks"}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+  """Nearest-rank percentile of an already sorted list"""
+  if not sorted_values:
+    return 0.0
+  rank = max(1, math.ceil(fraction * len(sorted_values)))
+  return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, context: BenchContext, requests: int, concurrency: int) -> dict:
+  latencies: List[float] = []
+  errors: Dict[str, int] = {}
+  remaining = iter(range(requests))
+
+  async def worker():
+    for _ in remaining:
+      method, path, kwargs = scenario.build(context, next(context.sequence))
+      start = time.perf_counter()
+      try:
+        response = await client.request(method, path, **kwargs)
+        # Streaming routes are only done once the whole body has been read
+        await response.aread()
+        outcome = str(response.status_code)
+      except httpx.HTTPError as e:
+        outcome = type(e).__name__
+      latencies.append(time.perf_counter() - start)
+      if outcome != str(scenario.expected_status):
+        errors[outcome] = errors.get(outcome, 0) + 1
+
+  start = time.perf_counter()
+  await asyncio.gather(*(worker() for _ in range(concurrency)))
+  elapsed = time.perf_counter() - start
+
+  latencies.sort()
+  return {
+    "requests": requests,
+    "concurrency": concurrency,
+    "errors": errors,
+    "seconds": round(elapsed, 4),
+    "throughput_rps": round(requests / elapsed, 2),
+    "latency_ms": {
+      "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+      "p50": round(percentile(latencies, 0.50) * 1000, 3),
+      "p95": round(percentile(latencies, 0.95) * 1000, 3),
+      "p99": round(percentile(latencies, 0.99) * 1000, 3),
+      "max": round(latencies[-1] * 1000, 3),
+    },
+  }
+
+
+async def seeded_project_range() -> Tuple[int, int]:
+  async with async_engine.connect() as connection:
+    result = await connection.execute(select(func.min(Project.id), func.max(Project.id)))
+    min_id, max_id = result.one()
+  if min_id is None:
+    sys.exit("The database has no projects, seed it first: python -m bench.seed")
+  return min_id, max_id
+
+
+def _free_port() -> int:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+
+async def start_uvicorn(port: int) -> subprocess.Popen:
+  """Start one uvicorn worker serving the app and wait until it answers"""
+  process = subprocess.Popen(
+    [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port), "--workers", "1", "--no-access-log"],
+    env=os.environ.copy(),
+    # App logs go to stdout, startup errors to stderr
+    stdout=subprocess.DEVNULL,
+  )
+  async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", headers={"user-agent": "bench"}) as client:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+      if process.poll() is not None:
+        sys.exit(f"uvicorn exited with code {process.returncode}")
+      try:
+        await client.get("/")
+        return process
+      except httpx.TransportError:
+        await asyncio.sleep(0.2)
+  process.terminate()
+  sys.exit("uvicorn did not start within 30s")
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> List[str]:
+  """
+  Print the change of each scenario against a baseline run.
+
+  Returns:
+      List of the scenarios whose throughput dropped, or p99 latency grew, by more than max_regression
+  """
+  regressions = []
+  print(f"\n{'scenario':<28}{'rps':>12}{'Δ rps':>10}{'p99 ms':>12}{'Δ p99':>10}")
+  for name, current in results["scenarios"].items():
+    previous = baseline.get("scenarios", {}).get(name)
+    if previous is None:
+      continue
+    rps_change = current["throughput_rps"] / previous["throughput_rps"] - 1
+    p99_change = current["latency_ms"]["p99"] / previous["latency_ms"]["p99"] - 1 if previous["latency_ms"]["p99"] else 0.0
+    regressed = rps_change < -max_regression or p99_change > max_regression
+    if regressed:
+      regressions.append(name)
+    print(
+      f"{name:<28}{current['throughput_rps']:>12.1f}{rps_change:>+10.1%}"
+      f"{current['latency_ms']['p99']:>12.2f}{p99_change:>+10.1%}{'  REGRESSION' if regressed else ''}"
+    )
+  return regressions
+
+
+async def run(args, scenarios: List[Scenario]) -> dict:
+  min_id, max_id = await seeded_project_range()
+  context = BenchContext(uuid.uuid4().hex[:8], random.Random(args.seed), min_id, max_id)
+
+  process: Optional[subprocess.Popen] = None
+  if args.target == "asgi":
+    from src.main import app
+    lifespan = app.router.lifespan_context(app)
+    await lifespan.__aenter__()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench", headers={"user-agent": "bench"})
+  else:
+    base_url = args.url
+    if base_url is None:
+      port = _free_port()
+      process = await start_uvicorn(port)
+      base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    client = httpx.AsyncClient(base_url=base_url, headers={"user-agent": "bench"}, limits=limits, timeout=60)
+
+  results = {}
+  try:
+    for scenario in scenarios:
+      requests = max(1, args.requests // 10) if scenario.name in HEAVY_SCENARIOS else args.requests
+      if args.warmup:
+        await run_scenario(client, scenario, context, min(args.warmup, requests), args.concurrency)
+      results[scenario.name] = result = await run_scenario(client, scenario, context, requests, args.concurrency)
+      latency = result["latency_ms"]
+      print(
+        f"{scenario.name:<28}{result['throughput_rps']:>10.1f} req/s"
+        f"  p50 {latency['p50']:>8.2f}ms  p95 {latency['p95']:>8.2f}ms  p99 {latency['p99']:>8.2f}ms"
+        f"{'  errors ' + json.dumps(result['errors']) if result['errors'] else ''}"
+      )
+  finally:
+    await client.aclose()
+    if args.target == "asgi":
+      await lifespan.__aexit__(None, None, None)
+    if process is not None:
+      process.terminate()
+      process.wait(timeout=10)
+
+  return results
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi")
+  parser.add_argument("--url", help="with --target uvicorn, benchmark an already running server instead of spawning one")
+  parser.add_argument("--requests", type=int, default=500, help="requests per scenario (a tenth of it for exports)")
+  parser.add_argument("--concurrency", type=int, default=20)
+  parser.add_argument("--warmup", type=int, default=20, help="requests per scenario sent before measuring")
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--scenarios", nargs="+", choices=[scenario.name for scenario in SCENARIOS], help="default: all")
+  parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+  parser.add_argument("--baseline", type=Path, help="compare against a previous results file")
+  parser.add_argument("--max-regression", type=float, default=0.10, help="tolerated fractional slowdown against the baseline")
+  parser.add_argument("--fail-on-regression", action="store_true")
+  parser.add_argument("--with-logging", action="store_true", help="keep request logs enabled")
+  args = parser.parse_args()
+
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+  if not args.with_logging:
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+  scenarios = [scenario for scenario in SCENARIOS if not args.scenarios or scenario.name in args.scenarios]
+  results = {
+    "meta": {
+      "timestamp": datetime.now(timezone.utc).isoformat(),
+      "target": args.target if args.url is None else args.url,
+      "database": async_engine.dialect.name,
+      "requests": args.requests,
+      "concurrency": args.concurrency,
+      "python": platform.python_version(),
+      "platform": platform.platform(),
+    },
+    "scenarios": await run(args, scenarios),
+  }
+  await async_engine.dispose()
+
+  if args.output:
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nResults written to {args.output}")
+
+  if args.baseline:
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.max_regression)
+    if regressions and args.fail_on_regression:
+      sys.exit(f"Regressions against {args.baseline}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark of the logging cost paid on the event loop thread per request.
+
+Replays the records a typical request emits (request start/completion from
+LoggingMiddleware plus the operation/entity helpers) through:
+
+  * legacy: StreamHandler + RotatingFileHandler called synchronously, with the
+    message, colors and f-strings built eagerly (the pipeline before the queue)
+  * queued: the current src.core.logging helpers, which enqueue the record and
+    leave formatting and I/O to the QueueListener thread
+  * sampled: the same as queued with app.request/app.operations sampled at --sample-rate
+
+Console output goes to os.devnull and the file output to a temporary
+directory. Run from backend/ with the usual settings available:
+
+  python -m bench.logging_bench --requests 20000
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import tempfile
+import time
+
+from src.core import logging as app_logging
+from src.core.logging import (
+  LogColors,
+  SamplingFilter,
+  log_entity_created,
+  log_operation_start,
+  log_operation_success,
+  operation_logger,
+  request_logger,
+  setup_logging
+)
+
+
+def build_legacy_logger(directory: str) -> logging.Logger:
+  legacy_logger = logging.getLogger("bench.legacy")
+  legacy_logger.propagate = False
+  formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+  console = logging.StreamHandler(open(os.devnull, "w"))
+  file = logging.handlers.RotatingFileHandler(os.path.join(directory, "legacy.log"), maxBytes=10485760, backupCount=5)
+  for handler in (console, file):
+    handler.setFormatter(formatter)
+    legacy_logger.addHandler(handler)
+  legacy_logger.setLevel(logging.INFO)
+  return legacy_logger
+
+def legacy_request(legacy_logger: logging.Logger, index: int):
+  legacy_logger.info(f"Request Started: {LogColors.YELLOW}POST /api/projects/{LogColors.RESET}", extra={"method": "POST", "path": "/api/projects/"})
+  legacy_logger.info(f"{LogColors.YELLOW}Validating project existence: ID: {index}{LogColors.RESET}")
+  legacy_logger.info(f"{LogColors.GREEN}Project validation completed successfully: Project: Bench ✅{LogColors.RESET}")
+  legacy_logger.info(f"{LogColors.YELLOW}Creating task: Bench task for project {index}{LogColors.RESET}")
+  legacy_logger.info(f"{LogColors.GREEN}Task created successfully: Bench task (ID: {index}) ✅{LogColors.RESET}")
+  legacy_logger.info(
+    f"Request Completed: {LogColors.YELLOW}POST /api/projects/{LogColors.RESET} - {LogColors.GREEN}201{LogColors.RESET} in {LogColors.YELLOW}{1.23:.2f}ms{LogColors.RESET}",
+    extra={"method": "POST", "path": "/api/projects/", "status_code": 201, "response_time": 1.23}
+  )
+
+def queued_request(index: int):
+  request_logger.info("Request Started: %s %s", "POST", "/api/projects/", extra={"color": LogColors.YELLOW, "method": "POST", "path": "/api/projects/"})
+  log_operation_start("Validating project existence", f"ID: {index}")
+  log_operation_success("Project validation", "Project: Bench")
+  log_operation_start("Creating task", f"Bench task for project {index}")
+  log_entity_created("Task", "Bench task", index)
+  request_logger.info(
+    "Request Completed: %s %s - %s in %.2fms", "POST", "/api/projects/", 201, 1.23,
+    extra={"color": LogColors.GREEN, "method": "POST", "path": "/api/projects/", "status_code": 201, "response_time": 1.23}
+  )
+
+def measure(label: str, emit, requests: int):
+  start = time.perf_counter()
+  for index in range(requests):
+    emit(index)
+  elapsed = time.perf_counter() - start
+  print(f"{label:>8}: {elapsed / requests * 1e6:8.2f} us per request on the calling thread")
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--requests", type=int, default=20000)
+  parser.add_argument("--sample-rate", type=float, default=0.1)
+  args = parser.parse_args()
+  setup_logging()
+
+  with tempfile.TemporaryDirectory() as directory:
+    legacy_logger = build_legacy_logger(directory)
+    measure("legacy", lambda index: legacy_request(legacy_logger, index), args.requests)
+
+    # Send the listener's console output to devnull like the legacy one, and
+    # let the queue grow so no record is dropped during the burst
+    for handler in app_logging.log_listener.handlers:
+      if not isinstance(handler, logging.FileHandler):
+        handler.setStream(open(os.devnull, "w"))
+    for handler in app_logging.logger.handlers:
+      if isinstance(handler, logging.handlers.QueueHandler):
+        handler.queue.maxsize = 0
+    measure("queued", queued_request, args.requests)
+
+    for sampled_logger in (request_logger, operation_logger):
+      sampled_logger.addFilter(SamplingFilter(args.sample_rate))
+    measure("sampled", queued_request, args.requests)
+
+
+if __name__ == "__main__":
+  main()
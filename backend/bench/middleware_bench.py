@@ -0,0 +1,117 @@
+"""
+Microbenchmark of the HTTP middleware stack on the create endpoints.
+
+Builds two apps exposing POST /api/projects/ and POST /api/tasks/{project_id}/tasks
+with the real ProjectCreate/TaskCreate bodies but no database, so only the
+middleware and body handling are measured:
+
+  * legacy: BaseHTTPMiddleware logging + function-based validation middleware
+    (the stack before the pure ASGI rewrite), default APIRoute
+  * asgi:   LoggingMiddleware + ValidationMiddleware from src, CachedBodyRoute
+
+Run from backend/ with the usual settings available (.env or environment):
+
+  python -m bench.middleware_bench --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.core.logging import logger, LogColors
+from src.core.middleware.logging_middleware import LoggingMiddleware
+from src.middleware.validation import CachedBodyRoute, ValidationMiddleware
+from src.schemas.ProjectSchema import ProjectCreate
+from src.schemas.TaskSchema import TaskCreate
+
+PROJECT_PAYLOAD = {"project_name": "Benchmark", "project_description": "Middleware benchmark", "client_name": "Bench Client"}
+TASK_PAYLOAD = {"task_name": "Benchmark task", "task_description": "Middleware benchmark"}
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+  async def dispatch(self, request: Request, call_next):
+    start_time = time.time()
+    logger.info(f"Request Started: {LogColors.YELLOW}{request.method} {request.url.path}{LogColors.RESET}")
+    response = await call_next(request)
+    response_time = (time.time() - start_time) * 1000
+    logger.info(f"Request Completed: {request.method} {request.url.path} - {response.status_code} in {response_time:.2f}ms")
+    return response
+
+async def legacy_validation_middleware(request: Request, call_next):
+  if request.method == "POST":
+    if "application/json" not in request.headers.get("content-type", ""):
+      raise HTTPException(status_code=400, detail="Content-Type must be application/json")
+    body = await request.body()
+    if not body:
+      raise HTTPException(status_code=400, detail="Request body cannot be empty")
+    json.loads(body)
+  if not request.headers.get("user-agent"):
+    raise HTTPException(status_code=400, detail="User-Agent header is required")
+  return await call_next(request)
+
+
+def build_app(legacy: bool) -> FastAPI:
+  router = APIRouter() if legacy else APIRouter(route_class=CachedBodyRoute)
+
+  @router.post("/api/projects/", status_code=201)
+  async def create_project(project_data: ProjectCreate):
+    return {"data": project_data.model_dump()}
+
+  @router.post("/api/tasks/{project_id}/tasks", status_code=201)
+  async def create_task(project_id: int, task_data: TaskCreate):
+    return {"data": {**task_data.model_dump(), "project_id": project_id}}
+
+  app = FastAPI()
+  app.include_router(router)
+  if legacy:
+    app.add_middleware(LegacyLoggingMiddleware)
+    app.middleware("http")(legacy_validation_middleware)
+  else:
+    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(ValidationMiddleware)
+  return app
+
+
+async def run(app: FastAPI, path: str, payload: dict, requests: int, concurrency: int) -> float:
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"user-agent": "bench"}) as client:
+    remaining = iter(range(requests))
+
+    async def worker():
+      for _ in remaining:
+        response = await client.post(path, json=payload)
+        assert response.status_code == 201, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--requests", type=int, default=5000)
+  parser.add_argument("--concurrency", type=int, default=50)
+  parser.add_argument("--with-logging", action="store_true", help="keep request logs enabled (they dominate otherwise-equal stacks)")
+  args = parser.parse_args()
+
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+  if not args.with_logging:
+    logger.setLevel(logging.WARNING)
+
+  for path, payload in (("/api/projects/", PROJECT_PAYLOAD), ("/api/tasks/1/tasks", TASK_PAYLOAD)):
+    results = {}
+    for name in ("legacy", "asgi"):
+      app = build_app(legacy=name == "legacy")
+      await run(app, path, payload, min(args.requests, 200), args.concurrency)  # warm up
+      results[name] = await run(app, path, payload, args.requests, args.concurrency)
+    speedup = results["asgi"] / results["legacy"]
+    print(f"POST {path}: legacy {results['legacy']:.0f} req/s, asgi {results['asgi']:.0f} req/s ({speedup:.2f}x)")
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Latency and memory of the project listing as the number of projects grows.
+
+The database is grown in steps and after every step GET /api/projects/ is
+timed in-process: the first page, pages starting at a random position (the
+keyset cursor of a random ID) and a client_name filter. Each page is a range
+scan of the primary key or of the client_name index that stops after
+limit + 1 rows, so latency should stay flat from the first to the last step,
+where OFFSET pagination would scan every skipped row. The peak memory traced
+while serving a page (tracemalloc, in separate requests since tracing slows
+them down) should stay flat as well, only the page is ever loaded.
+
+Uses the database DATABASE_URL points at, which is reset first. From backend/:
+
+  DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m bench.project_list_bench --steps 1000 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+import httpx
+from sqlalchemy import func, select
+
+from bench.load import percentile
+from bench.seed import CLIENTS, seed
+from src.core.db import async_engine
+from src.helpers.pagination import encode_cursor
+from src.models.models import Project
+
+LIMIT = 50
+
+
+def page_params(name: str, min_id: int, max_id: int, rng: random.Random) -> dict:
+  if name == "first":
+    return {"limit": LIMIT}
+  if name == "deep":
+    return {"limit": LIMIT, "cursor": encode_cursor({"id": rng.randint(min_id, max_id)})}
+  return {"limit": LIMIT, "client_name": rng.choice(CLIENTS)}
+
+QUERIES = ("first", "deep", "client")
+
+
+async def measure(client: httpx.AsyncClient, requests: int, memory_requests: int, rng: random.Random) -> dict:
+  async with async_engine.connect() as connection:
+    min_id, max_id = (await connection.execute(select(func.min(Project.id), func.max(Project.id)))).one()
+
+  results = {}
+  for name in QUERIES:
+    latencies = []
+    for _ in range(requests):
+      params = page_params(name, min_id, max_id, rng)
+      start = time.perf_counter()
+      response = await client.get("/api/projects/", params=params)
+      latencies.append(time.perf_counter() - start)
+      assert response.status_code in (200, 404), response.text
+    latencies.sort()
+
+    peaks = []
+    for _ in range(memory_requests):
+      params = page_params(name, min_id, max_id, rng)
+      tracemalloc.start()
+      response = await client.get("/api/projects/", params=params)
+      peaks.append(tracemalloc.get_traced_memory()[1])
+      tracemalloc.stop()
+    results[name] = {
+      "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+      "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+      "peak_kib": round(max(peaks) / 1024, 1),
+    }
+  return results
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--steps", type=int, nargs="+", default=[1000, 10000, 100000, 1000000], help="project counts to measure at")
+  parser.add_argument("--requests", type=int, default=300, help="timed requests per query and step")
+  parser.add_argument("--memory-requests", type=int, default=20, help="traced requests per query and step")
+  parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+  args = parser.parse_args()
+
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+  logging.getLogger("app").setLevel(logging.WARNING)
+
+  from src.main import app
+  rng = random.Random(42)
+  results = []
+  projects = 0
+
+  await seed(0, 0, reset=True)
+
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"user-agent": "bench"}) as client:
+    for target_projects in sorted(args.steps):
+      if target_projects > projects:
+        await seed(target_projects - projects, 0, seed_value=target_projects, first_index=projects)
+        projects = target_projects
+
+      step = {"projects": projects, **await measure(client, args.requests, args.memory_requests, rng)}
+      results.append(step)
+      print(f"{step['projects']:>10} projects  " + "  ".join(
+        f"{name} p50 {step[name]['p50_ms']:>6.2f}ms p99 {step[name]['p99_ms']:>6.2f}ms peak {step[name]['peak_kib']:>6.0f}KiB"
+        for name in QUERIES
+      ))
+
+  await async_engine.dispose()
+  if args.output:
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({"limit": LIMIT, "steps": results}, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
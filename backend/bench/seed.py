@@ -0,0 +1,122 @@
+"""
+Seed a synthetic dataset of N projects x M tasks for the benchmarks.
+
+Rows are written with multi-row INSERTs in batches through the application's
+engine, so the target database is whatever DATABASE_URL (or the POSTGRES_*
+settings) points at. For a local SQLite run, from backend/:
+
+  DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m bench.seed --projects 1000 --tasks 10 --reset
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlmodel import SQLModel, insert
+
+from src.core.db import async_engine, create_db_and_tables
+from src.helpers.task_counters import count_statuses, initial_task_counters
+from src.models.models import Project, Task, TaskStatus
+
+WORDS = (
+  "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet",
+  "kilo", "lima", "mike", "november", "oscar", "papa", "quebec", "romeo", "sierra", "tango"
+)
+CLIENTS = tuple(f"Client {word.title()}" for word in WORDS)
+STATUSES = tuple(TaskStatus)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+  return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+async def seed(
+    projects: int,
+    tasks_per_project: int,
+    batch_size: int = 1000,
+    reset: bool = False,
+    seed_value: int = 42,
+    first_index: int = 0
+) -> dict:
+  """
+  Create the tables if needed and insert the synthetic dataset.
+
+  Args:
+      projects: Number of projects to create
+      tasks_per_project: Number of tasks created for each project
+      batch_size: Rows per INSERT batch
+      reset: Drop and recreate all tables first
+      seed_value: Random seed, the same value produces the same dataset
+      first_index: Number of the first project, to add more projects to an already seeded database
+
+  Returns:
+      dict: Rows created and time taken
+  """
+  rng = random.Random(seed_value)
+  start = time.perf_counter()
+
+  if reset:
+    async with async_engine.begin() as connection:
+      await connection.run_sync(SQLModel.metadata.drop_all)
+  # Like the app's startup, so an empty database gets its schema_version row
+  await create_db_and_tables()
+
+  created_tasks = 0
+  for offset in range(0, projects, batch_size):
+    count = min(batch_size, projects - offset)
+    # Statuses are drawn first so each project row carries its task counters
+    project_statuses = [[rng.choice(STATUSES) for _ in range(tasks_per_project)] for _ in range(count)]
+    project_rows = [
+      {
+        "project_name": f"Project {first_index + offset + index:08d} {rng.choice(WORDS)}",
+        "project_description": _sentence(rng, 12),
+        "client_name": rng.choice(CLIENTS),
+        **initial_task_counters(count_statuses(statuses)),
+      }
+      for index, statuses in enumerate(project_statuses)
+    ]
+
+    async with async_engine.begin() as connection:
+      result = await connection.execute(
+        insert(Project).returning(Project.id, sort_by_parameter_order=True),
+        project_rows
+      )
+      project_ids = result.scalars().all()
+
+      task_rows = [
+        {
+          "task_name": f"Task {task_index} {rng.choice(WORDS)}",
+          "task_description": _sentence(rng, 8),
+          "status": task_status,
+          "project_id": project_id,
+        }
+        for project_id, statuses in zip(project_ids, project_statuses)
+        for task_index, task_status in enumerate(statuses)
+      ]
+      for task_offset in range(0, len(task_rows), batch_size):
+        await connection.execute(insert(Task), task_rows[task_offset:task_offset + batch_size])
+      created_tasks += len(task_rows)
+
+  return {
+    "projects": projects,
+    "tasks": created_tasks,
+    "seconds": round(time.perf_counter() - start, 3),
+  }
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--projects", type=int, default=1000)
+  parser.add_argument("--tasks", type=int, default=10, help="tasks per project")
+  parser.add_argument("--batch-size", type=int, default=1000)
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--reset", action="store_true", help="drop and recreate the tables first")
+  args = parser.parse_args()
+
+  summary = await seed(args.projects, args.tasks, args.batch_size, args.reset, args.seed)
+  print(f"Seeded {summary['projects']} projects and {summary['tasks']} tasks in {summary['seconds']}s")
+  await async_engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
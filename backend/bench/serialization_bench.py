@@ -0,0 +1,100 @@
+"""
+Serialization throughput of a 10k-row project list response.
+
+Four apps serve the same {"data": [...], "next_cursor", "status"} envelope
+holding prebuilt Project instances, so only the response path is measured:
+
+  * legacy:         dict returned, jsonable_encoder + json.dumps (the old default)
+  * orjson:         dict returned, jsonable_encoder + orjson (DefaultJSONResponse)
+  * response_model: PageResponse[ProjectResponse] as response_model, FastAPI
+                    validates the rows into the schema then serializes them
+  * serializer:     ResponseSerializer, one pydantic-core pass to JSON bytes
+
+Run from backend/ with the usual settings available (.env or environment):
+
+  python -m bench.serialization_bench --rows 10000 --requests 30
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from src.core.serialization import DefaultJSONResponse, ResponseSerializer
+from src.helpers.format_date import now_without_microseconds
+from src.models.models import Project
+from src.schemas.ProjectSchema import ProjectResponse
+from src.schemas.ResponseSchema import PageResponse
+
+
+def build_rows(count: int) -> list:
+  now = now_without_microseconds()
+  return [
+    Project(
+      id=index,
+      project_name=f"Project {index:08d}",
+      project_description="Synthetic project used by the serialization benchmark",
+      client_name=f"Client {index % 50}",
+      tasks_pending=index % 7,
+      tasks_completed=index % 3,
+      created_at=now,
+      updated_at=now,
+    )
+    for index in range(1, count + 1)
+  ]
+
+
+def build_app(variant: str, rows: list) -> FastAPI:
+  envelope = {"data": rows, "next_cursor": None, "status": "success"}
+  serializer = ResponseSerializer(Project, ProjectResponse)
+
+  if variant == "legacy":
+    app = FastAPI(default_response_class=JSONResponse)
+    app.get("/projects")(lambda: envelope)
+  elif variant == "orjson":
+    app = FastAPI(default_response_class=DefaultJSONResponse)
+    app.get("/projects")(lambda: envelope)
+  elif variant == "response_model":
+    app = FastAPI(default_response_class=DefaultJSONResponse)
+    app.get("/projects", response_model=PageResponse[ProjectResponse])(lambda: envelope)
+  else:
+    app = FastAPI(default_response_class=DefaultJSONResponse)
+    app.get("/projects", response_model=PageResponse[ProjectResponse])(lambda: serializer.page(envelope))
+  return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+    response = await client.get("/projects")  # warm up
+    assert response.status_code == 200, response.text
+    start = time.perf_counter()
+    for _ in range(requests):
+      await client.get("/projects")
+    return (time.perf_counter() - start) / requests
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--rows", type=int, default=10000)
+  parser.add_argument("--requests", type=int, default=30)
+  args = parser.parse_args()
+
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+  rows = build_rows(args.rows)
+
+  baseline = None
+  for variant in ("legacy", "orjson", "response_model", "serializer"):
+    seconds = await run(build_app(variant, rows), args.requests)
+    baseline = baseline or seconds
+    print(
+      f"{variant:<16}{seconds * 1000:>9.1f} ms/response{args.rows / seconds:>12,.0f} rows/s"
+      f"{baseline / seconds:>8.2f}x"
+    )
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
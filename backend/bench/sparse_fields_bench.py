@@ -0,0 +1,89 @@
+"""
+Bytes and latency saved by sparse fieldsets (?fields=) on the list endpoints.
+
+Pages of the largest size are fetched in-process with the full rows and with
+the id and name only, as a picker would. The unrequested columns are neither
+read (load_only) nor serialized, so both the body size and the time per
+page drop. Bodies are requested without compression to compare their size.
+
+Uses the database DATABASE_URL points at, which is reset and seeded first.
+From backend/:
+
+  DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m bench.sparse_fields_bench --projects 5000
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from bench.load import percentile
+from bench.seed import seed
+from src.core.config import settings
+from src.core.db import async_engine
+from src.models.models import Project
+
+CASES = [
+  ("projects", "full", None),
+  ("projects", "sparse", "id,project_name"),
+  ("tasks", "full", None),
+  ("tasks", "sparse", "id,task_name"),
+]
+
+
+async def measure(client: httpx.AsyncClient, path, fields, requests: int) -> tuple:
+  params = {"limit": settings.PAGINATION_MAX_LIMIT}
+  if fields is not None:
+    params["fields"] = fields
+
+  latencies, size = [], 0
+  for _ in range(requests):
+    start = time.perf_counter()
+    response = await client.get(path(), params=params, headers={"accept-encoding": "identity"})
+    latencies.append(time.perf_counter() - start)
+    assert response.status_code == 200, response.text
+    size = len(response.content)
+  latencies.sort()
+  return size, percentile(latencies, 0.50), percentile(latencies, 0.99)
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--projects", type=int, default=5000)
+  parser.add_argument("--tasks", type=int, default=settings.PAGINATION_MAX_LIMIT, help="tasks per project")
+  parser.add_argument("--requests", type=int, default=200)
+  args = parser.parse_args()
+
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+  logging.getLogger("app").setLevel(logging.WARNING)
+
+  from src.main import app
+  await seed(args.projects, args.tasks, reset=True)
+  async with async_engine.connect() as connection:
+    min_id = (await connection.execute(select(func.min(Project.id)))).scalar_one()
+
+  rng = random.Random(42)
+  paths = {
+    "projects": lambda: "/api/projects/",
+    "tasks": lambda: f"/api/tasks/{min_id + rng.randrange(args.projects)}/tasks",
+  }
+
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"user-agent": "bench"}) as client:
+    full = {}
+    for endpoint, label, fields in CASES:
+      size, p50, p99 = await measure(client, paths[endpoint], fields, args.requests)
+      full.setdefault(endpoint, (size, p50))
+      print(
+        f"{endpoint:<9}{label:<7}{size:>10,} bytes/page{p50 * 1000:>8.2f}ms p50{p99 * 1000:>8.2f}ms p99"
+        f"{size / full[endpoint][0]:>8.1%} bytes{p50 / full[endpoint][1]:>8.1%} time"
+      )
+
+  await async_engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
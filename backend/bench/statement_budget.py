@@ -0,0 +1,70 @@
+"""
+Check the number of SQL statements the write endpoints issue.
+
+Each request runs in-process under assert_statement_count, which fails with
+the list of statements issued when an endpoint goes over (or under) its
+budget, e.g. a create that refreshes its row after the INSERT ... RETURNING:
+
+  * POST /api/projects/                   INSERT ... RETURNING
+  * PATCH /api/projects/{id}              UPDATE ... RETURNING (the If-Match
+                                          check is part of its WHERE)
+  * POST /api/tasks/{project_id}/tasks    INSERT ... RETURNING and the
+                                          project's counter UPDATE, plus the
+                                          project SELECT when it is not cached
+
+Uses the database DATABASE_URL points at, which is reset first. From backend/:
+
+  DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m bench.statement_budget
+"""
+import asyncio
+import logging
+
+import httpx
+
+from bench.seed import seed
+from src.core.cache import project_cache
+from src.core.db import async_engine
+from src.helpers.statement_counter import assert_statement_count
+
+PROJECT_PAYLOAD = {"project_name": "Statement budget", "project_description": "Statement budget check", "client_name": "Bench Client"}
+TASK_PAYLOAD = {"task_name": "Budget task", "task_description": "Statement budget check"}
+
+
+async def check(client: httpx.AsyncClient, label: str, expected: int, method: str, path: str, **kwargs) -> httpx.Response:
+  with assert_statement_count(async_engine, expected) as counter:
+    response = await client.request(method, path, **kwargs)
+  assert response.status_code < 400, f"{label}: {response.status_code} {response.text}"
+  operations = " + ".join(statement.split(None, 1)[0] for statement in counter.statements)
+  print(f"{label:<34}{counter.count:>3} statements  {operations}")
+  return response
+
+
+async def main():
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+  logging.getLogger("app").setLevel(logging.WARNING)
+
+  from src.main import app
+  await seed(0, 0, reset=True)
+
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"user-agent": "bench"}) as client:
+    created = await check(client, "create project", 1, "POST", "/api/projects/", json=PROJECT_PAYLOAD)
+    project_id = created.json()["data"]["id"]
+
+    updated = await check(client, "update project", 1, "PATCH", f"/api/projects/{project_id}", json={"client_name": "Other Client"})
+    await check(
+      client, "update project with If-Match", 1, "PATCH", f"/api/projects/{project_id}",
+      json={"client_name": "Bench Client"}, headers={"if-match": updated.headers["etag"]}
+    )
+
+    project_cache.clear()
+    await check(client, "create task, project not cached", 3, "POST", f"/api/tasks/{project_id}/tasks", json=TASK_PAYLOAD)
+    # The task create invalidated the cached project (its counters changed), reading it caches it again
+    await client.get(f"/api/projects/{project_id}")
+    await check(client, "create task, project cached", 2, "POST", f"/api/tasks/{project_id}/tasks", json=TASK_PAYLOAD)
+
+  await async_engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
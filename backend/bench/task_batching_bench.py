@@ -0,0 +1,121 @@
+"""
+Throughput of concurrent task creation with and without write batching.
+
+Fires --requests POST /api/tasks/{project_id}/tasks in-process, --concurrency
+at a time, against a few projects, first with one transaction per request and
+then with TASK_BATCHING_ENABLED, and reports requests per second, latency
+percentiles and the number of task INSERT statements and commits it took.
+SQLite runs the INSERT ... RETURNING of a batch one row per statement (its
+RETURNING order is not guaranteed), so there only the commits are shared.
+
+Uses the database DATABASE_URL points at, which is reset and seeded first.
+From backend/:
+
+  DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m bench.task_batching_bench --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+from sqlalchemy import event, func, select
+
+from bench.load import percentile
+from bench.seed import seed
+from src.core.batching import task_batcher
+from src.core.config import settings
+from src.core.db import async_engine
+from src.models.models import Project
+
+
+async def run(client: httpx.AsyncClient, project_ids: list, requests: int, concurrency: int, rng: random.Random) -> dict:
+  inserts = commits = 0
+
+  def count_insert(connection, cursor, statement, parameters, context, executemany):
+    nonlocal inserts
+    if statement.startswith("INSERT INTO tasks"):
+      inserts += 1
+      connection.info["wrote_tasks"] = True
+
+  def count_commit(connection):
+    # Only the transactions that wrote tasks, not the requests' read ones
+    nonlocal commits
+    if connection.info.pop("wrote_tasks", False):
+      commits += 1
+
+  event.listen(async_engine.sync_engine, "before_cursor_execute", count_insert)
+  event.listen(async_engine.sync_engine, "commit", count_commit)
+  latencies = []
+  errors = 0
+  queue = iter(range(requests))
+
+  async def worker():
+    nonlocal errors
+    for index in queue:
+      payload = {"task_name": f"Batched task {index}", "task_description": "Created by the batching benchmark"}
+      start = time.perf_counter()
+      response = await client.post(f"/api/tasks/{rng.choice(project_ids)}/tasks", json=payload)
+      latencies.append(time.perf_counter() - start)
+      if response.status_code != 201:
+        errors += 1
+
+  start = time.perf_counter()
+  await asyncio.gather(*(worker() for _ in range(concurrency)))
+  elapsed = time.perf_counter() - start
+  event.remove(async_engine.sync_engine, "before_cursor_execute", count_insert)
+  event.remove(async_engine.sync_engine, "commit", count_commit)
+
+  latencies.sort()
+  return {
+    "rps": requests / elapsed,
+    "p50_ms": percentile(latencies, 0.50) * 1000,
+    "p99_ms": percentile(latencies, 0.99) * 1000,
+    "inserts": inserts,
+    "commits": commits,
+    "errors": errors,
+  }
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--requests", type=int, default=5000)
+  parser.add_argument("--concurrency", type=int, default=200)
+  parser.add_argument("--projects", type=int, default=20)
+  parser.add_argument("--window-ms", type=float, default=settings.TASK_BATCH_WINDOW_MS)
+  parser.add_argument("--max-size", type=int, default=settings.TASK_BATCH_MAX_SIZE)
+  args = parser.parse_args()
+
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+  logging.getLogger("app").setLevel(logging.WARNING)
+
+  from src.main import app
+  await seed(args.projects, 0, reset=True)
+  async with async_engine.connect() as connection:
+    project_ids = (await connection.execute(select(Project.id))).scalars().all()
+
+  task_batcher.window_ms = args.window_ms
+  task_batcher.max_size = args.max_size
+
+  transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+  limits = httpx.Limits(max_connections=None)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, headers={"user-agent": "bench"}) as client:
+    baseline = None
+    for label, enabled in (("per-request", False), ("batched", True)):
+      settings.TASK_BATCHING_ENABLED = enabled
+      result = await run(client, project_ids, args.requests, args.concurrency, random.Random(42))
+      baseline = baseline or result["rps"]
+      print(
+        f"{label:<12}{result['rps']:>9.0f} req/s{result['p50_ms']:>9.2f}ms p50{result['p99_ms']:>9.2f}ms p99"
+        f"{result['inserts']:>7} inserts{result['commits']:>7} commits{result['errors']:>6} errors{result['rps'] / baseline:>8.2f}x"
+      )
+
+  async with async_engine.connect() as connection:
+    counted = (await connection.execute(select(func.sum(Project.tasks_pending)))).scalar_one()
+  print(f"tasks_pending counters: {counted} (expected {2 * args.requests} minus errors)")
+  await async_engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
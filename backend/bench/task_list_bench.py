@@ -0,0 +1,108 @@
+"""
+Latency of the task listing as the total number of tasks grows.
+
+The database is grown in steps (more projects with the same number of tasks
+each) and after every step GET /api/tasks/{project_id}/tasks is timed
+in-process for random projects, with and without a status filter. With the
+(project_id, status, id) and (project_id, created_at, id) indexes each page is
+an index range scan, so the latency should stay flat while the table grows;
+run it with --without-indexes to see the sequential scans it replaces.
+
+Uses the database DATABASE_URL points at, which is reset first. From backend/:
+
+  DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m bench.task_list_bench --steps 10000 100000 500000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import func, select, text
+
+from bench.load import percentile
+from bench.seed import seed
+from src.core.db import async_engine
+from src.models.models import Project, Task
+
+QUERIES = {
+  "all": {"limit": 50},
+  "open": [("status", "pending"), ("status", "in_progress"), ("limit", 50)],
+  "recent": {"limit": 50, "sort": "created_at", "order": "desc"},
+}
+
+
+async def drop_task_indexes():
+  async with async_engine.begin() as connection:
+    for index in Task.__table__.indexes:
+      if index.name.startswith("ix_tasks_project_id_"):
+        await connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+async def measure(client: httpx.AsyncClient, project_count: int, requests: int, rng: random.Random) -> dict:
+  async with async_engine.connect() as connection:
+    min_id = (await connection.execute(select(func.min(Project.id)))).scalar_one()
+
+  results = {}
+  for name, params in QUERIES.items():
+    latencies = []
+    for _ in range(requests):
+      project_id = min_id + rng.randrange(project_count)
+      start = time.perf_counter()
+      response = await client.get(f"/api/tasks/{project_id}/tasks", params=params)
+      latencies.append(time.perf_counter() - start)
+      assert response.status_code == 200, response.text
+    latencies.sort()
+    results[name] = {
+      "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+      "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+  return results
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--steps", type=int, nargs="+", default=[10000, 100000, 500000], help="total task counts to measure at")
+  parser.add_argument("--tasks", type=int, default=50, help="tasks per project")
+  parser.add_argument("--requests", type=int, default=300, help="requests per query and step")
+  parser.add_argument("--without-indexes", action="store_true", help="drop the composite task indexes first")
+  parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+  args = parser.parse_args()
+
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+  logging.getLogger("app").setLevel(logging.WARNING)
+
+  from src.main import app
+  rng = random.Random(42)
+  results = []
+  projects = 0
+
+  await seed(0, 0, reset=True)
+  if args.without_indexes:
+    await drop_task_indexes()
+
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"user-agent": "bench"}) as client:
+    for total_tasks in sorted(args.steps):
+      target_projects = max(1, total_tasks // args.tasks)
+      if target_projects > projects:
+        await seed(target_projects - projects, args.tasks, seed_value=target_projects, first_index=projects)
+        projects = target_projects
+
+      step = {"tasks": projects * args.tasks, **await measure(client, projects, args.requests, rng)}
+      results.append(step)
+      print(f"{step['tasks']:>10} tasks  " + "  ".join(
+        f"{name} p50 {step[name]['p50_ms']:>7.2f}ms p99 {step[name]['p99_ms']:>7.2f}ms" for name in QUERIES
+      ))
+
+  await async_engine.dispose()
+  if args.output:
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({"indexes": not args.without_indexes, "steps": results}, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+Concurrent creates of the same project name, and the round trip the unique index saved.
+
+Fires --concurrency POST /api/projects/ in-process at once, all with the same
+name, --rounds times, and asserts that each round stores exactly one row:
+one request gets 201 and all the others get the duplicate-name 400. The old
+SELECT pre-check let several of them through. Requests over the write
+group's admission capacity are shed with 503 before reaching the database,
+they are counted apart.
+
+It then times --requests creates with distinct names, and the SELECT of the
+whole row by name that the removed pre-check ran before each of them, the
+latency that is now saved.
+
+Uses the database DATABASE_URL points at, which is reset first. From backend/:
+
+  DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m bench.unique_name_bench --concurrency 20
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter
+
+import httpx
+from sqlalchemy import func, select
+
+from bench.load import percentile
+from bench.seed import seed
+from src.core.db import AsyncSessionLocal, async_engine
+from src.models.models import Project
+
+
+def payload(name: str) -> dict:
+  return {"project_name": name, "project_description": "Unique name benchmark", "client_name": "Bench Client"}
+
+
+async def race(client: httpx.AsyncClient, name: str, concurrency: int) -> Counter:
+  responses = await asyncio.gather(*(client.post("/api/projects/", json=payload(name)) for _ in range(concurrency)))
+  statuses = Counter(response.status_code for response in responses)
+  admitted = concurrency - statuses[503]
+  assert statuses == Counter({201: 1, 400: admitted - 1, 503: statuses[503]}), f"{name}: {dict(statuses)}"
+
+  async with async_engine.connect() as connection:
+    stored = (await connection.execute(select(func.count()).where(Project.project_name == name))).scalar_one()
+  assert stored == 1, f"{name}: {stored} rows"
+  return statuses
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--concurrency", type=int, default=20)
+  parser.add_argument("--rounds", type=int, default=20)
+  parser.add_argument("--requests", type=int, default=500)
+  args = parser.parse_args()
+
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+  logging.getLogger("app").setLevel(logging.WARNING)
+
+  from src.main import app
+  await seed(0, 0, reset=True)
+
+  transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+  limits = httpx.Limits(max_connections=None)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, headers={"user-agent": "bench"}) as client:
+    shed = 0
+    for round_number in range(args.rounds):
+      shed += (await race(client, f"Raced project {round_number}", args.concurrency))[503]
+    print(f"{args.rounds} rounds of {args.concurrency} concurrent creates: 1 x 201 and the others 400 each, no duplicates"
+          f" ({shed} requests shed by admission control)")
+
+    creates = []
+    for index in range(args.requests):
+      start = time.perf_counter()
+      response = await client.post("/api/projects/", json=payload(f"Timed project {index}"))
+      creates.append(time.perf_counter() - start)
+      assert response.status_code == 201, response.text
+
+  # The statement the removed validate_project_name_not_exists ran before every create
+  checks = []
+  async with AsyncSessionLocal() as session:
+    for index in range(args.requests):
+      start = time.perf_counter()
+      await session.execute(select(Project).where(Project.project_name == f"Timed project {index}"))
+      checks.append(time.perf_counter() - start)
+
+  creates.sort()
+  checks.sort()
+  p50_create, p50_check = percentile(creates, 0.50), percentile(checks, 0.50)
+  print(f"create           {p50_create * 1000:>8.2f}ms p50{percentile(creates, 0.99) * 1000:>8.2f}ms p99")
+  print(f"removed pre-check{p50_check * 1000:>8.2f}ms p50{percentile(checks, 0.99) * 1000:>8.2f}ms p99"
+        f"  ({p50_check / (p50_create + p50_check):.0%} of a create with it)")
+  await async_engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,28 @@
+"""
+Create and fill the full-text search indexes of an existing database.
+
+create_all sets the indexes up together with new tables; databases created
+before search was added, or whose SQLite FTS tables got out of sync, need
+this once. From backend/:
+
+  python -m src.commands.rebuild_search_index
+"""
+import asyncio
+
+from src.core.db import async_engine
+from src.core.logging import log_operation_start, log_operation_success, setup_logging
+from src.models.search import ensure_search_indexes
+
+
+async def main():
+  setup_logging()
+  log_operation_start("Rebuilding search indexes", async_engine.dialect.name)
+  async with async_engine.begin() as connection:
+    await ensure_search_indexes(connection)
+  log_operation_success("Rebuilding search indexes")
+  print("Search indexes rebuilt")
+  await async_engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,29 @@
+"""
+Rebuild the per-project task status counters from the tasks table.
+
+The counters are maintained by every statement that writes tasks; this is
+the way back to a consistent state after rows were changed by hand or the
+columns were added to an existing database. Running servers pick the new
+values up as their cached projects expire. From backend/:
+
+  python -m src.commands.repair_task_counters
+"""
+import asyncio
+
+from src.core.db import async_engine
+from src.core.logging import log_operation_start, log_operation_success, setup_logging
+from src.helpers.task_counters import repair_task_counters
+
+
+async def main():
+  setup_logging()
+  log_operation_start("Repairing task counters")
+  async with async_engine.begin() as connection:
+    updated = await repair_task_counters(connection)
+  log_operation_success("Repairing task counters", f"{updated} projects")
+  print(f"Task counters rebuilt for {updated} projects")
+  await async_engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,163 @@
+"""
+Upgrade a database created before schema versioning to SCHEMA_VERSION.
+
+create_all only creates missing tables, so an existing database keeps its
+old tables and is refused at startup. This brings them up to date, from
+backend/:
+
+  python -m src.commands.upgrade_schema
+
+  * checks that no two projects share a name, and otherwise lists them and
+    stops without changing anything: rename or delete them, then run it again
+  * adds the missing columns: the task counters and version of projects,
+    created_at and updated_at of tasks (their server defaults fill the
+    existing rows, the tasks' timestamps are set to now), e.g. on SQLite
+      ALTER TABLE projects ADD COLUMN tasks_pending INTEGER DEFAULT '0' NOT NULL
+      ALTER TABLE projects ADD COLUMN version INTEGER DEFAULT '1' NOT NULL
+      ALTER TABLE tasks ADD COLUMN created_at DATETIME
+  * replaces the plain index on project_name with the unique one and creates
+    the missing indexes
+      DROP INDEX ix_projects_project_name
+      CREATE UNIQUE INDEX ix_projects_project_name ON projects (project_name)
+      CREATE INDEX ix_tasks_project_id_status_id ON tasks (project_id, status, id)
+      CREATE INDEX ix_tasks_project_id_created_at_id ON tasks (project_id, created_at, id)
+  * computes the task counters (see repair_task_counters), builds the search
+    indexes (see rebuild_search_index) and records SCHEMA_VERSION
+
+It runs in one transaction. SQLite commits each ALTER TABLE and CREATE INDEX
+at once though; after a failure there, run it again, it skips the columns
+and indexes that exist.
+"""
+import asyncio
+import sys
+from typing import List, Tuple
+
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateColumn
+from sqlmodel import SQLModel, insert
+
+from src.core.db import async_engine
+from src.core.logging import log_operation_start, log_operation_success, setup_logging
+from src.helpers.format_date import now_without_microseconds
+from src.helpers.task_counters import repair_task_counters
+from src.models.models import SCHEMA_VERSION, Project, SchemaVersion, Task
+from src.models.search import SEARCH_INDEXES, ensure_search_indexes
+
+
+def _inspect_tables(sync_connection) -> dict:
+  inspector = inspect(sync_connection)
+  return {
+    name: {
+      "columns": {column["name"] for column in inspector.get_columns(name)},
+      "indexes": {index["name"]: bool(index["unique"]) for index in inspector.get_indexes(name)},
+    }
+    for name in inspector.get_table_names()
+  }
+
+async def duplicate_project_names(connection: AsyncConnection) -> List[Tuple[str, int]]:
+  """
+  Project names shared by several rows, which the unique index would reject.
+
+  Args:
+      connection: Connection to query
+
+  Returns:
+      list: (name, number of projects) of every duplicated name
+  """
+  result = await connection.execute(
+    select(Project.project_name, func.count(Project.id))
+    .group_by(Project.project_name)
+    .having(func.count(Project.id) > 1)
+    .order_by(Project.project_name)
+  )
+  return [tuple(row) for row in result.all()]
+
+async def upgrade_schema(connection: AsyncConnection) -> List[str]:
+  """
+  Bring the tables of an unversioned database up to SCHEMA_VERSION.
+
+  Args:
+      connection: Connection to run the DDL on, the caller commits
+
+  Returns:
+      list: Description of every change made, in order
+
+  Raises:
+      RuntimeError: The database already holds a schema version, has no
+      tables, or projects share a name
+  """
+  tables = await connection.run_sync(_inspect_tables)
+  if SchemaVersion.__tablename__ in tables:
+    stored = (await connection.execute(select(SchemaVersion.version))).scalar()
+    raise RuntimeError(f"Database schema version is already {stored}, this upgrades unversioned databases to {SCHEMA_VERSION}")
+  if Project.__tablename__ not in tables:
+    raise RuntimeError("The database has no tables to upgrade, DB_STARTUP_MODE=create_all initializes an empty database")
+
+  duplicates = await duplicate_project_names(connection)
+  if duplicates:
+    listed = "\n".join(f"  {name!r}: {count} projects" for name, count in duplicates)
+    raise RuntimeError(f"Project names must be unique before the upgrade, rename or delete the duplicates:\n{listed}")
+
+  changes = []
+  for table in SQLModel.metadata.sorted_tables:
+    if table.name not in tables:
+      continue
+    for column in table.columns:
+      if column.name not in tables[table.name]["columns"]:
+        column_ddl = CreateColumn(column).compile(dialect=connection.dialect)
+        await connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}")
+        changes.append(f"added column {table.name}.{column.name}")
+
+  # Expression indexes of the search, built by ensure_search_indexes below
+  search_indexes = {id(index) for index in SEARCH_INDEXES}
+  for table in SQLModel.metadata.sorted_tables:
+    if table.name not in tables:
+      continue
+    existing = tables[table.name]["indexes"]
+    for index in sorted(table.indexes, key=lambda index: index.name or ""):
+      if id(index) in search_indexes:
+        continue
+      if index.name in existing and existing[index.name] != bool(index.unique):
+        await connection.run_sync(lambda sync_connection, index=index: index.drop(sync_connection))
+        existing.pop(index.name)
+      if index.name not in existing:
+        await connection.run_sync(lambda sync_connection, index=index: index.create(sync_connection))
+        changes.append(f"created {'unique ' if index.unique else ''}index {index.name}")
+
+  # Tasks created before the timestamps existed
+  now = now_without_microseconds()
+  result = await connection.execute(update(Task).where(Task.created_at.is_(None)).values(created_at=now, updated_at=now))
+  if result.rowcount:
+    changes.append(f"set the timestamps of {result.rowcount} tasks")
+
+  # Missing tables, schema_version included
+  await connection.run_sync(SQLModel.metadata.create_all)
+
+  updated = await repair_task_counters(connection)
+  changes.append(f"computed the task counters of {updated} projects")
+  await ensure_search_indexes(connection)
+  changes.append("built the search indexes")
+
+  await connection.execute(insert(SchemaVersion).values(version=SCHEMA_VERSION))
+  changes.append(f"recorded schema version {SCHEMA_VERSION}")
+  return changes
+
+
+async def main():
+  setup_logging()
+  log_operation_start("Upgrading schema", async_engine.dialect.name)
+  try:
+    async with async_engine.begin() as connection:
+      changes = await upgrade_schema(connection)
+  except RuntimeError as e:
+    print(f"Nothing was changed: {e}", file=sys.stderr)
+    await async_engine.dispose()
+    sys.exit(1)
+  log_operation_success("Upgrading schema", f"{len(changes)} changes")
+  print("\n".join(changes))
+  await async_engine.dispose()
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -0,0 +1,169 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Callable, List
+
+from sqlmodel import select
+
+from src.models.models import Project, Task
+from src.schemas.ExportSchema import ExportFormat
+from src.core.config import settings
+from src.core.db import AsyncSessionLocal
+from src.core.logging import log_operation_start, log_operation_success
+
+PROJECT_COLUMNS = [column.name for column in Project.__table__.columns]
+TASK_COLUMNS = [column.name for column in Task.__table__.columns]
+
+def _task_label(name: str) -> str:
+  # Prefix task columns so they don't clash with project columns in joined rows
+  return name if name.startswith("task_") else f"task_{name}"
+
+def _json_default(value):
+  if isinstance(value, datetime):
+    return value.isoformat()
+  return str(value)
+
+def _csv_value(value):
+  if value is None:
+    return ""
+  if isinstance(value, datetime):
+    return value.isoformat()
+  if hasattr(value, "value"):
+    return value.value
+  return value
+
+
+class ExportController:
+  """
+  Streams projects (and optionally their tasks) as NDJSON or CSV.
+
+  The response body is produced after the request dependencies have been
+  torn down, so the export opens its own session from session_factory
+  instead of receiving the request-scoped one. The route passes
+  request_session, which picks a read replica like get_async_session; a
+  replica failing on the query hands it over to the primary, a failure once
+  rows were sent ends the stream.
+  """
+  def __init__(self, session_factory: Callable = AsyncSessionLocal):
+    self.session_factory = session_factory
+
+  async def stream_projects(self, export_format: ExportFormat, include_tasks: bool = False) -> AsyncIterator[bytes]:
+    """
+    Stream every project ordered by ID through a server-side cursor.
+
+    Rows are fetched EXPORT_BATCH_SIZE at a time and the encoded output is
+    flushed whenever EXPORT_FLUSH_BYTES have accumulated; the first batch is
+    flushed straight away so the client gets the first byte early.
+    
+    Args:
+        export_format: Output format (ndjson or csv)
+        include_tasks: Whether to embed each project's tasks
+        
+    Yields:
+        bytes: Encoded chunks of the export
+    """
+    log_operation_start("Exporting projects", f"format: {export_format.value}, tasks: {include_tasks}")
+
+    if export_format == ExportFormat.CSV:
+      encoder = _CSVEncoder(include_tasks)
+    else:
+      encoder = _NDJSONEncoder(include_tasks)
+
+    header = encoder.header()
+    if header:
+      yield header.encode("utf-8")
+
+    async with self.session_factory() as session:
+      if include_tasks:
+        query = (
+          select(
+            *Project.__table__.columns,
+            *[column.label(_task_label(column.name)) for column in Task.__table__.columns]
+          )
+          .outerjoin(Task, Task.project_id == Project.id)
+          .order_by(Project.id.asc(), Task.id.asc())
+        )
+      else:
+        query = select(*Project.__table__.columns).order_by(Project.id.asc())
+
+      result = await session.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+
+      buffered = 0
+      parts: List[str] = []
+      first_batch = True
+      async for rows in result.partitions():
+        for row in rows:
+          encoded = encoder.encode(row._mapping)
+          if encoded:
+            parts.append(encoded)
+            buffered += len(encoded)
+
+        if parts and (first_batch or buffered >= settings.EXPORT_FLUSH_BYTES):
+          yield "".join(parts).encode("utf-8")
+          parts.clear()
+          buffered = 0
+        first_batch = False
+
+      parts.append(encoder.finish())
+      tail = "".join(parts)
+      if tail:
+        yield tail.encode("utf-8")
+
+    log_operation_success("Exporting projects", f"format: {export_format.value}")
+
+
+class _NDJSONEncoder:
+  """One JSON object per project; tasks are grouped under their project."""
+  def __init__(self, include_tasks: bool):
+    self.include_tasks = include_tasks
+    self.current = None
+
+  def header(self) -> str:
+    return ""
+
+  def encode(self, row) -> str:
+    if not self.include_tasks:
+      return json.dumps({name: row[name] for name in PROJECT_COLUMNS}, default=_json_default) + "\n"
+
+    # Rows come ordered by project, so a project is complete once the next one starts
+    encoded = ""
+    if self.current is None or self.current["id"] != row["id"]:
+      encoded = self.finish()
+      self.current = {name: row[name] for name in PROJECT_COLUMNS}
+      self.current["tasks"] = []
+    if row["task_id"] is not None:
+      self.current["tasks"].append({name: row[_task_label(name)] for name in TASK_COLUMNS})
+    return encoded
+
+  def finish(self) -> str:
+    if self.current is None:
+      return ""
+    encoded = json.dumps(self.current, default=_json_default) + "\n"
+    self.current = None
+    return encoded
+
+
+class _CSVEncoder:
+  """One CSV row per project, or per task with the project columns repeated."""
+  def __init__(self, include_tasks: bool):
+    self.include_tasks = include_tasks
+    self.columns = PROJECT_COLUMNS + ([_task_label(name) for name in TASK_COLUMNS] if include_tasks else [])
+    self.buffer = io.StringIO()
+    self.writer = csv.writer(self.buffer)
+
+  def _render(self, values) -> str:
+    self.writer.writerow(values)
+    encoded = self.buffer.getvalue()
+    self.buffer.seek(0)
+    self.buffer.truncate(0)
+    return encoded
+
+  def header(self) -> str:
+    return self._render(self.columns)
+
+  def encode(self, row) -> str:
+    return self._render([_csv_value(row[name]) for name in self.columns])
+
+  def finish(self) -> str:
+    return ""
@@ -1,10 +1,26 @@
 # Validate business logic 
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from fastapi import HTTPException, status
-from sqlmodel import select
+from pydantic import ValidationError
+from sqlmodel import select, insert, update
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
-from src.schemas.ProjectSchema import ProjectCreate, ProjectUpdate
-from src.models.models import Project
+from src.schemas.ProjectSchema import ProjectCreate, ProjectUpdate, ProjectImport
+from src.models.models import Project, Task
 from src.core.db import AsyncSessionDependency
+from src.core.config import settings
+from src.core.cache import project_cache
+from src.helpers.pagination import encode_cursor, decode_cursor
+from src.helpers.http_cache import collection_etag, entity_etag
+from src.helpers.sparse_fields import load_fields
+from src.helpers.ndjson import iter_ndjson_lines
+from src.helpers.db_errors import is_unique_violation, release_failed_cursor
+from src.helpers.task_counters import count_statuses, initial_task_counters
+from src.core.profiler import profiled
 from src.core.logging import (
     log_operation_start,
     log_operation_success,
@@ -14,86 +30,267 @@ from src.core.logging import (
 
 from src.errors.project_errors import (
   ProjectNotFoundError,
-  NoFieldsToUpdateError
+  DuplicateProjectNameError,
+  NoFieldsToUpdateError,
+  ProjectVersionMismatchError
 )
+from src.errors.pagination_errors import InvalidCursorError
 
 
 class ProjectController:
   def __init__(self, session: AsyncSessionDependency):
     self.session = session
 
+  @profiled
   async def create_project(self, project_data: ProjectCreate):
     try: 
       log_operation_start("Creating project", project_data.project_name)
     
-      # Create the project object
+      # Insert the project and get the stored row back in the same statement,
+      # name uniqueness is enforced by the unique index on project_name
       project_data_dict = project_data.model_dump()
-      project = Project(**project_data_dict) # Project object that will be created in the database
-      self.session.add(project)
-      await self.session.commit()
-      await self.session.refresh(project)
+      try:
+        result = await self.session.execute(
+          insert(Project).values(**project_data_dict).returning(Project)
+        )
+        project = result.scalar_one()
+        await self.session.commit()
+      except IntegrityError as e:
+        release_failed_cursor(e)
+        await self.session.rollback()
+        if is_unique_violation(e, "project_name"):
+          raise DuplicateProjectNameError(f"A project with the name '{project_data.project_name}' already exists")
+        raise
+      project_cache.set(project.id, project.model_dump())
 
       log_entity_created("Project", project.project_name, project.id)
       
       return {
         "message": "Project created successfully",
-        "data": project.model_dump(),
+        "data": project,
         "status": "success"
       }
     
+    except DuplicateProjectNameError as e:
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
       raise e
 
-  async def get_all_projects(self):
+  @profiled
+  async def get_all_projects(
+      self,
+      limit: int,
+      cursor: Optional[str] = None,
+      client_name: Optional[str] = None,
+      project_name: Optional[str] = None,
+      fields: Optional[List[str]] = None,
+      include_tasks: bool = False
+  ):
+    """
+    Get a page of projects ordered by ID using keyset pagination.
+    
+    Args:
+        limit: Maximum number of projects to return
+        cursor: Opaque cursor returned by the previous page
+        client_name: Optional exact match filter on the client name
+        project_name: Optional exact match filter on the project name
+        fields: Sparse fieldset, only these columns (plus the ones the cursor
+            and the validators need) are read
+        include_tasks: Whether to load each project's first tasks into
+            Project.tasks, with a single extra query for the whole page
+        
+    Returns:
+        dict: The page of projects and the cursor for the next page
+    """
     try:
       log_operation_start("Getting all projects")
-      
-      projects = await self.session.execute(select(Project).order_by(Project.id.asc()))
+
+      query = self._projects_page_query(select(Project), limit, cursor, client_name, project_name)
+      if fields is not None:
+        query = query.options(load_fields(Project, fields, required=("id", "version", "updated_at")))
+      projects = await self.session.execute(query)
       projects_list = projects.scalars().all()
       
       # Check if no projects were found
-      if not projects_list: 
+      if not projects_list and cursor is None: 
         raise ProjectNotFoundError("No projects found")
+
+      # The extra row only tells us whether there is a next page
+      next_cursor = None
+      if len(projects_list) > limit:
+        projects_list = projects_list[:limit]
+        next_cursor = encode_cursor({"id": projects_list[-1].id})
+
+      if include_tasks:
+        await self.load_tasks(projects_list)
       
       log_operation_success("Getting all projects")
-      return projects_list
+      return {
+        "data": projects_list,
+        "next_cursor": next_cursor,
+        "status": "success"
+      }
     
     except ProjectNotFoundError as e:
       raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (InvalidCursorError, ValueError, TypeError) as e:
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
       raise e
 
-  async def get_project_by_id(self, project: Project):
+  @profiled
+  async def get_projects_page_validators(
+      self,
+      limit: int,
+      cursor: Optional[str] = None,
+      client_name: Optional[str] = None,
+      project_name: Optional[str] = None
+  ) -> Optional[Tuple[str, datetime]]:
+    """
+    ETag and Last-Modified of a page of projects, computed from the
+    (id, version, updated_at) of its rows without loading the rows themselves.
+    
+    Args:
+        limit: Maximum number of projects in the page
+        cursor: Opaque cursor returned by the previous page
+        client_name: Optional exact match filter on the client name
+        project_name: Optional exact match filter on the project name
+        
+    Returns:
+        The validators, or None if the page is empty or the cursor is invalid
+        (get_all_projects then produces the error response)
+    """
+    try:
+      query = self._projects_page_query(
+        select(Project.id, Project.version, Project.updated_at), limit, cursor, client_name, project_name
+      )
+    except (InvalidCursorError, ValueError, TypeError):
+      return None
+
+    result = await self.session.execute(query)
+    rows = result.all()
+    if not rows:
+      return None
+    return self.projects_page_validators(
+      limit, cursor, client_name, project_name, rows[:limit], has_next=len(rows) > limit
+    )
+
+  @staticmethod
+  def projects_page_validators(
+      limit: int,
+      cursor: Optional[str],
+      client_name: Optional[str],
+      project_name: Optional[str],
+      projects: Sequence,
+      has_next: bool
+  ) -> Tuple[str, Optional[datetime]]:
+    """ETag and Last-Modified of a page of projects (rows with id, version and updated_at), an empty page has no Last-Modified"""
+    etag = collection_etag({
+      "params": [limit, cursor, client_name, project_name],
+      "projects": [[project.id, project.version] for project in projects],
+      "next": has_next
+    })
+    return etag, max((project.updated_at for project in projects), default=None)
+
+  @staticmethod
+  def _projects_page_query(query, limit: int, cursor: Optional[str], client_name: Optional[str], project_name: Optional[str]):
+    # Keyset page ordered by ID, the extra row tells whether there is a next page
+    query = query.order_by(Project.id.asc()).limit(limit + 1)
+    if cursor is not None:
+      position = decode_cursor(cursor)
+      query = query.where(Project.id > int(position["id"]))
+    if client_name is not None:
+      query = query.where(Project.client_name == client_name)
+    if project_name is not None:
+      query = query.where(Project.project_name == project_name)
+    return query
+
+  @profiled
+  async def load_tasks(self, projects: Sequence[Project], limit: Optional[int] = None):
+    """
+    Populate Project.tasks of the given projects with their first tasks by ID.
+
+    The relationship is lazy and cannot be loaded implicitly in the async
+    session, and selectinload() would fetch every task of every project. All
+    the projects are served by one query instead, capped per project with
+    row_number() over the (project_id, status, id) index; the task counters
+    of each project tell how many tasks there are in total.
+    
+    Args:
+        projects: Projects of the page, already loaded in this session
+        limit: Maximum number of tasks per project, PROJECT_EMBEDDED_TASKS_LIMIT by default
+    """
+    if not projects:
+      return
+    limit = settings.PROJECT_EMBEDDED_TASKS_LIMIT if limit is None else limit
+    project_ids = [project.id for project in projects]
+
+    if len(project_ids) == 1:
+      query = select(Task).where(Task.project_id == project_ids[0]).order_by(Task.id).limit(limit)
+    else:
+      ranked = (
+        select(Task, func.row_number().over(partition_by=Task.project_id, order_by=Task.id).label("position"))
+        .where(Task.project_id.in_(project_ids))
+        .subquery("ranked_tasks")
+      )
+      ranked_task = aliased(Task, ranked)
+      query = (
+        select(ranked_task)
+        .where(ranked.c.position <= limit)
+        .order_by(ranked.c.project_id, ranked.c.id)
+      )
+
+    result = await self.session.execute(query)
+    tasks_by_project = {project_id: [] for project_id in project_ids}
+    for task in result.scalars():
+      tasks_by_project[task.project_id].append(task)
+
+    # Set as the loaded state, so reading the relationship issues no query
+    for project in projects:
+      set_committed_value(project, "tasks", tasks_by_project[project.id])
+
+  @profiled
+  async def get_project_by_id(self, project: Project, include_tasks: bool = False):
     """
     Get project by ID. Project is already validated by middleware.
     
     Args:
         project: Project object validated by middleware
+        include_tasks: Whether to load the project's first tasks into Project.tasks
         
     Returns:
         Project: The project object
     """
     try: 
       log_operation_start("Getting project by ID", f"ID: {project.id}")
+      if include_tasks:
+        await self.load_tasks([project])
       log_operation_success("Getting project by ID", project.project_name)
       return project
     
     except Exception as e:
       raise e
     
-  async def update_project(self, project: Project, project_data: ProjectUpdate):
+  @profiled
+  async def update_project(self, project_id: int, project_data: ProjectUpdate, expected_versions: Optional[List[int]] = None):
     """
-    Update project. Project is already validated by middleware.
+    Update project with a single UPDATE ... RETURNING statement.
     
     Args:
-        project: Project object validated by middleware
+        project_id: ID of the project to update, format validated by middleware
         project_data: Data to update the project
+        expected_versions: Versions accepted by the client's If-Match header,
+            None when the update is unconditional
         
     Returns:
         Project: The updated project object
+        
+    Raises:
+        HTTPException: 404 if no project matched the ID, 412 with the
+        current ETag if it exists with another version
     """
     try:
-      log_operation_start("Updating project", f"ID: {project.id}")
+      log_operation_start("Updating project", f"ID: {project_id}")
       
       # Check if at least one field is provided to update the project
       if not any([
@@ -112,19 +309,179 @@ class ProjectController:
       if project_data.client_name is not None:
           update_data["client_name"] = project_data.client_name
 
-      # Update the project only with the provided fields 
-      for field, value in update_data.items():
-        setattr(project, field, value)
+      # Update the project only with the provided fields, an empty result means it does not exist
+      # The version check is part of the UPDATE, so a concurrent write in between cannot be lost
+      statement = update(Project).where(Project.id == project_id)
+      if expected_versions is not None:
+        statement = statement.where(Project.version.in_(expected_versions))
+
+      try:
+        result = await self.session.execute(
+          statement
+          .values(**update_data, version=Project.version + 1)
+          .returning(Project)
+        )
+        project = result.scalar_one_or_none()
+      except IntegrityError as e:
+        release_failed_cursor(e)
+        await self.session.rollback()
+        if is_unique_violation(e, "project_name"):
+          raise DuplicateProjectNameError(f"A project with the name '{project_data.project_name}' already exists")
+        raise
+
+      if project is None:
+        if expected_versions is not None:
+          current = await self.session.execute(select(Project.version).where(Project.id == project_id))
+          current_version = current.scalar_one_or_none()
+          if current_version is not None:
+            raise ProjectVersionMismatchError(
+              f"Project with ID {project_id} was modified since it was read",
+              entity_etag(project_id, current_version)
+            )
+        raise ProjectNotFoundError(f"Project with ID {project_id} not found or does not exist")
 
-      self.session.add(project)
       await self.session.commit()
-      await self.session.refresh(project)
+      project_cache.set(project.id, project.model_dump())
 
       log_entity_updated("Project", project.project_name, project.id)
       return project
     
-    except NoFieldsToUpdateError as e:
+    except ProjectNotFoundError as e:
+      raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ProjectVersionMismatchError as e:
+      raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e), headers={"ETag": e.etag})
+    except (NoFieldsToUpdateError, DuplicateProjectNameError) as e:
       raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
       raise e
 
+  @profiled
+  async def import_projects(self, stream: AsyncIterator[bytes]):
+    """
+    Import projects with their embedded tasks from an NDJSON stream.
+
+    Lines are parsed as they arrive and written in chunks of
+    PROJECT_IMPORT_CHUNK_SIZE projects, each chunk in its own transaction,
+    so memory stays bounded by the chunk size rather than the body size.
+    
+    Args:
+        stream: Raw request body chunks, one project per line
+        
+    Returns:
+        dict: Import summary with the rejected lines
+    """
+    try:
+      log_operation_start("Importing projects")
+
+      summary = {
+        "projects_imported": 0,
+        "tasks_imported": 0,
+        "errors_count": 0,
+        "errors": []
+      }
+      chunk: List[Tuple[int, ProjectImport]] = []
+
+      async for line_number, line in iter_ndjson_lines(stream, settings.PROJECT_IMPORT_MAX_LINE_BYTES):
+        if line is None:
+          self._report_import_error(summary, line_number, f"Line exceeds {settings.PROJECT_IMPORT_MAX_LINE_BYTES} bytes")
+          continue
+
+        try:
+          project_data = ProjectImport.model_validate_json(line)
+        except ValidationError as e:
+          self._report_import_error(summary, line_number, e.errors(include_url=False, include_context=False, include_input=False))
+          continue
+
+        chunk.append((line_number, project_data))
+        if len(chunk) >= settings.PROJECT_IMPORT_CHUNK_SIZE:
+          await self._import_chunk(chunk, summary)
+          chunk = []
+
+      if chunk:
+        await self._import_chunk(chunk, summary)
+
+      log_operation_success(
+        "Importing projects",
+        f"{summary['projects_imported']} projects, {summary['tasks_imported']} tasks, {summary['errors_count']} rejected lines"
+      )
+      return {
+        "message": "Projects imported successfully",
+        "data": summary,
+        "status": "success" if not summary["errors_count"] else "partial"
+      }
+
+    except Exception as e:
+      raise e
+
+  async def _import_chunk(self, chunk: List[Tuple[int, ProjectImport]], summary: dict, retry_on_conflict: bool = True):
+    # Names already taken are found with one IN query for the whole chunk
+    names = {project_data.project_name for _, project_data in chunk}
+    existing = await self.session.execute(
+      select(Project.project_name).where(Project.project_name.in_(names))
+    )
+    taken_names = set(existing.scalars().all())
+
+    accepted: List[Tuple[int, ProjectImport]] = []
+    for line_number, project_data in chunk:
+      if project_data.project_name in taken_names:
+        self._report_import_error(summary, line_number, f"A project with the name '{project_data.project_name}' already exists")
+        continue
+      taken_names.add(project_data.project_name)
+      accepted.append((line_number, project_data))
+
+    if not accepted:
+      return
+
+    try:
+      result = await self.session.execute(
+        insert(Project).returning(Project.id, sort_by_parameter_order=True),
+        [
+          # Projects are new, so their counters are known before the insert
+          {
+            **project_data.model_dump(exclude={"tasks"}),
+            **initial_task_counters(count_statuses(task_data.status for task_data in project_data.tasks))
+          }
+          for _, project_data in accepted
+        ]
+      )
+      project_ids = result.scalars().all()
+
+      task_rows = [
+        {**task_data.model_dump(), "project_id": project_id}
+        for (_, project_data), project_id in zip(accepted, project_ids)
+        for task_data in project_data.tasks
+      ]
+      if task_rows:
+        await self.session.execute(insert(Task), task_rows)
+
+      await self.session.commit()
+    except IntegrityError as e:
+      release_failed_cursor(e)
+      await self.session.rollback()
+      if not is_unique_violation(e, "project_name"):
+        raise
+      if retry_on_conflict:
+        # A concurrent writer took one of the names after the check, the retry
+        # sees it; the lines rejected above are already reported
+        return await self._import_chunk(accepted, summary, retry_on_conflict=False)
+
+      # Raced again: report the lines rather than fail after earlier chunks committed
+      existing = await self.session.execute(
+        select(Project.project_name).where(Project.project_name.in_({project_data.project_name for _, project_data in accepted}))
+      )
+      taken_names = set(existing.scalars().all())
+      for line_number, project_data in accepted:
+        if project_data.project_name in taken_names:
+          self._report_import_error(summary, line_number, f"A project with the name '{project_data.project_name}' already exists")
+        else:
+          self._report_import_error(summary, line_number, "Not imported, projects of the same chunk conflicted with concurrent writes")
+      return
+
+    summary["projects_imported"] += len(project_ids)
+    summary["tasks_imported"] += len(task_rows)
+
+  @staticmethod
+  def _report_import_error(summary: dict, line_number: int, detail):
+    summary["errors_count"] += 1
+    if len(summary["errors"]) < settings.PROJECT_IMPORT_MAX_REPORTED_ERRORS:
+      summary["errors"].append({"line": line_number, "detail": detail})
@@ -0,0 +1,172 @@
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import Float, and_, func, literal, literal_column, or_, select, tuple_, union_all
+
+from src.models.models import Project, Task
+from src.models.search import (
+  FTS_TABLES,
+  TS_CONFIG,
+  fts_table,
+  fts5_query,
+  postgres_tsquery,
+  project_search_document,
+  search_terms,
+  task_search_document
+)
+from src.schemas.SearchSchema import SearchType
+from src.core.db import AsyncSessionDependency
+from src.core.profiler import profiled
+from src.helpers.pagination import encode_cursor, decode_cursor
+from src.core.logging import log_operation_start, log_operation_success
+
+from src.errors.search_errors import EmptySearchQueryError, SearchNotSupportedError
+from src.errors.pagination_errors import InvalidCursorError
+
+
+class SearchController:
+  def __init__(self, session: AsyncSessionDependency):
+    self.session = session
+
+  @profiled
+  async def search(
+      self,
+      query: str,
+      limit: int,
+      cursor: Optional[str] = None,
+      search_type: Optional[SearchType] = None
+  ):
+    """
+    Full-text search over projects and tasks, best matches first.
+
+    On PostgreSQL the matches come from the GIN indexes on the weighted
+    tsvector expressions, on SQLite from the FTS5 tables. Every word must
+    match, the last one as a prefix. Pages follow a keyset cursor on
+    (rank, type, id).
+
+    Args:
+        query: Words to search for
+        limit: Maximum number of results to return
+        cursor: Opaque cursor returned by the previous page
+        search_type: Only search projects or only tasks
+
+    Returns:
+        dict: The page of results and the cursor for the next page
+    """
+    try:
+      log_operation_start("Searching", query)
+
+      terms = search_terms(query)
+      if not terms:
+        raise EmptySearchQueryError("The search query must contain at least one word")
+
+      dialect = self.session.bind.dialect.name
+      if dialect == "postgresql":
+        hits = self._postgres_hits(terms, search_type)
+      elif dialect == "sqlite":
+        hits = self._sqlite_hits(terms, search_type)
+      else:
+        raise SearchNotSupportedError(f"Full-text search is not available on {dialect}")
+
+      results = (hits[0] if len(hits) == 1 else union_all(*hits)).subquery("results")
+      statement = (
+        select(results)
+        .order_by(results.c.rank.desc(), results.c.type, results.c.id)
+        .limit(limit + 1)
+      )
+      if cursor is not None:
+        position = decode_cursor(cursor, ("rank", "type", "id"))
+        rank, hit_type, hit_id = float(position["rank"]), str(position["type"]), int(position["id"])
+        statement = statement.where(or_(
+          results.c.rank < rank,
+          and_(results.c.rank == rank, tuple_(results.c.type, results.c.id) > tuple_(hit_type, hit_id))
+        ))
+
+      result = await self.session.execute(statement)
+      rows = [dict(row) for row in result.mappings().all()]
+
+      # The extra row only tells us whether there is a next page
+      next_cursor = None
+      if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({"rank": last["rank"], "type": last["type"], "id": last["id"]})
+
+      log_operation_success("Searching", f"{len(rows)} results for '{query}'")
+      return {
+        "data": rows,
+        "next_cursor": next_cursor,
+        "status": "success"
+      }
+
+    except (EmptySearchQueryError, InvalidCursorError, ValueError, TypeError) as e:
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except SearchNotSupportedError as e:
+      raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    except Exception as e:
+      raise e
+
+  @staticmethod
+  def _postgres_hits(terms: List[str], search_type: Optional[SearchType]) -> list:
+    # The documents are the indexed expressions, so @@ is a GIN index scan
+    tsquery = func.to_tsquery(TS_CONFIG, postgres_tsquery(terms))
+    hits = []
+    if search_type in (None, SearchType.PROJECTS):
+      document = project_search_document()
+      hits.append(
+        select(
+          literal("project").label("type"),
+          Project.id.label("id"),
+          Project.id.label("project_id"),
+          Project.project_name.label("name"),
+          Project.project_description.label("description"),
+          func.ts_rank_cd(document, tsquery, type_=Float).label("rank")
+        ).where(document.op("@@")(tsquery))
+      )
+    if search_type in (None, SearchType.TASKS):
+      document = task_search_document()
+      hits.append(
+        select(
+          literal("task").label("type"),
+          Task.id.label("id"),
+          Task.project_id.label("project_id"),
+          Task.task_name.label("name"),
+          Task.task_description.label("description"),
+          func.ts_rank_cd(document, tsquery, type_=Float).label("rank")
+        ).where(document.op("@@")(tsquery))
+      )
+    return hits
+
+  @staticmethod
+  def _sqlite_hits(terms: List[str], search_type: Optional[SearchType]) -> list:
+    # bm25() is lower for better matches, it is negated to rank like ts_rank_cd
+    match = fts5_query(terms)
+    hits = []
+    if search_type in (None, SearchType.PROJECTS):
+      fts = fts_table("projects")
+      hits.append(
+        select(
+          literal("project").label("type"),
+          Project.id.label("id"),
+          Project.id.label("project_id"),
+          Project.project_name.label("name"),
+          Project.project_description.label("description"),
+          (-func.bm25(literal_column(fts.name), *FTS_TABLES["projects"][2], type_=Float)).label("rank")
+        )
+        .select_from(fts.join(Project, Project.id == fts.c.rowid))
+        .where(literal_column(fts.name).op("MATCH")(match))
+      )
+    if search_type in (None, SearchType.TASKS):
+      fts = fts_table("tasks")
+      hits.append(
+        select(
+          literal("task").label("type"),
+          Task.id.label("id"),
+          Task.project_id.label("project_id"),
+          Task.task_name.label("name"),
+          Task.task_description.label("description"),
+          (-func.bm25(literal_column(fts.name), *FTS_TABLES["tasks"][2], type_=Float)).label("rank")
+        )
+        .select_from(fts.join(Task, Task.id == fts.c.rowid))
+        .where(literal_column(fts.name).op("MATCH")(match))
+      )
+    return hits
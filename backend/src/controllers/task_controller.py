@@ -1,33 +1,227 @@
-from src.schemas.TaskSchema import TaskCreate
-from src.models.models import Task
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlmodel import insert, select
+from sqlalchemy import tuple_
+
+from src.schemas.TaskSchema import TaskCreate, TaskSort, SortOrder
+from src.models.models import Task, TaskStatus
+from src.helpers.pagination import encode_cursor, decode_cursor
+from src.helpers.sparse_fields import load_fields
+from src.helpers.task_counters import count_statuses, increment_task_counters
+from src.core.cache import project_cache
+from src.core.batching import task_batcher
 from src.core.db import AsyncSessionDependency
+from src.core.config import settings
+from src.core.profiler import profiled
 from src.core.logging import (
     log_operation_start,
+    log_operation_success,
     log_entity_created
 )
 
+from src.errors.task_errors import (
+  EmptyTaskBatchError,
+  TaskBatchTooLargeError
+)
+from src.errors.pagination_errors import InvalidCursorError
+
 
 class TaskController: 
   def __init__(self, session: AsyncSessionDependency):
     self.session = session
 
+  @profiled
   async def create_task(self, project_id: int, task_data: TaskCreate):     
     try: 
       log_operation_start("Creating task", f"{task_data.task_name} for project {project_id}")
 
-      # Create the task object
-      task = Task(**task_data.model_dump(), project_id=project_id)
-      self.session.add(task)
-      await self.session.commit()
-      await self.session.refresh(task)
+      if settings.TASK_BATCHING_ENABLED:
+        # End the request's read transaction first: a waiting request must not
+        # hold a pooled connection the batch needs to be written
+        await self.session.commit()
+        # Committed together with the tasks other requests create meanwhile
+        task = await task_batcher.create(project_id, task_data.model_dump())
+      else:
+        # Insert the task and get the stored row back in the same statement
+        result = await self.session.execute(
+          insert(Task).values(**task_data.model_dump(), project_id=project_id).returning(Task)
+        )
+        task = result.scalar_one()
+        # The project's counters change in the same transaction as the task
+        await increment_task_counters(self.session, project_id, {task.status: 1})
+        await self.session.commit()
+        project_cache.invalidate(project_id)
 
       log_entity_created("Task", task.task_name, task.id)
 
       return {
         "message": "Task created successfully",
-        "data": task.model_dump(),
+        "data": task,
         "status": "success"
       }
       
     except Exception as e:
-      raise e
\ No newline at end of file
+      raise e
+
+  @profiled
+  async def get_tasks(
+      self,
+      project_id: int,
+      limit: int,
+      cursor: Optional[str] = None,
+      statuses: Optional[List[TaskStatus]] = None,
+      sort: TaskSort = TaskSort.ID,
+      order: SortOrder = SortOrder.ASC,
+      fields: Optional[List[str]] = None
+  ):
+    """
+    Get a page of a project's tasks using keyset pagination.
+
+    Filtering by status and ordering by ID is a range scan of the
+    (project_id, status, id) index, ordering by creation time one of the
+    (project_id, created_at, id) index, so the cost of a page does not
+    depend on how many tasks exist.
+    
+    Args:
+        project_id: ID of the project, already validated by middleware
+        limit: Maximum number of tasks to return
+        cursor: Opaque cursor returned by the previous page
+        statuses: Optional statuses to filter on, any of them matches
+        sort: Column the tasks are ordered by (ties on created_at are broken by ID)
+        order: Sort direction
+        fields: Sparse fieldset, only these columns (plus the ones the cursor
+            needs) are read
+        
+    Returns:
+        dict: The page of tasks and the cursor for the next page
+    """
+    try:
+      log_operation_start("Getting tasks", f"project {project_id}")
+
+      descending = order == SortOrder.DESC
+      if sort == TaskSort.CREATED_AT:
+        keyset = (Task.created_at, Task.id)
+        required_keys = ("created_at", "id")
+      else:
+        keyset = (Task.id,)
+        required_keys = ("id",)
+
+      query = (
+        select(Task)
+        .where(Task.project_id == project_id)
+        .order_by(*(column.desc() if descending else column.asc() for column in keyset))
+        .limit(limit + 1)
+      )
+
+      if fields is not None:
+        query = query.options(load_fields(Task, fields, required=required_keys))
+      if statuses:
+        query = query.where(Task.status == statuses[0] if len(statuses) == 1 else Task.status.in_(statuses))
+      if cursor is not None:
+        position = decode_cursor(cursor, required_keys)
+        if sort == TaskSort.CREATED_AT:
+          values = (datetime.fromisoformat(position["created_at"]), int(position["id"]))
+        else:
+          values = (int(position["id"]),)
+        after = tuple_(*keyset) < tuple_(*values) if descending else tuple_(*keyset) > tuple_(*values)
+        query = query.where(after)
+
+      result = await self.session.execute(query)
+      tasks = result.scalars().all()
+
+      # The extra row only tells us whether there is a next page
+      next_cursor = None
+      if len(tasks) > limit:
+        tasks = tasks[:limit]
+        last = tasks[-1]
+        position = {"id": last.id}
+        if sort == TaskSort.CREATED_AT:
+          position["created_at"] = last.created_at.isoformat()
+        next_cursor = encode_cursor(position)
+
+      log_operation_success("Getting tasks", f"{len(tasks)} tasks for project {project_id}")
+      return {
+        "data": tasks,
+        "next_cursor": next_cursor,
+        "status": "success"
+      }
+
+    except (InvalidCursorError, ValueError, TypeError) as e:
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+      raise e
+
+  @profiled
+  async def create_tasks_bulk(self, project_id: int, tasks_data: List[Any]):
+    """
+    Create many tasks for a project in a single transaction.
+
+    Every item is validated against TaskCreate first; the valid ones are
+    inserted with one multi-row INSERT ... RETURNING and the invalid ones
+    are reported back by their position in the payload.
+    
+    Args:
+        project_id: ID of the project, already validated by middleware
+        tasks_data: Raw task payloads
+        
+    Returns:
+        dict: The created task IDs and the per-item validation errors
+    """
+    try:
+      log_operation_start("Creating tasks in bulk", f"{len(tasks_data)} tasks for project {project_id}")
+
+      if not tasks_data:
+        raise EmptyTaskBatchError("At least one task must be provided")
+      if len(tasks_data) > settings.TASKS_BULK_MAX_ITEMS:
+        raise TaskBatchTooLargeError(f"A batch cannot contain more than {settings.TASKS_BULK_MAX_ITEMS} tasks")
+
+      rows = []
+      row_indexes = []
+      errors = []
+      for index, payload in enumerate(tasks_data):
+        try:
+          task_data = TaskCreate.model_validate(payload)
+        except ValidationError as e:
+          errors.append({
+            "index": index,
+            "errors": e.errors(include_url=False, include_context=False)
+          })
+          continue
+        rows.append({**task_data.model_dump(), "project_id": project_id})
+        row_indexes.append(index)
+
+      if not rows:
+        raise HTTPException(
+          status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+          detail={"message": "None of the tasks are valid", "errors": errors}
+        )
+
+      result = await self.session.execute(
+        insert(Task).returning(Task.id, sort_by_parameter_order=True),
+        rows
+      )
+      created_ids = result.scalars().all()
+      await increment_task_counters(self.session, project_id, count_statuses(row["status"] for row in rows))
+      await self.session.commit()
+      project_cache.invalidate(project_id)
+
+      log_operation_success("Creating tasks in bulk", f"{len(created_ids)} created, {len(errors)} rejected")
+
+      return {
+        "message": "Tasks created successfully",
+        "data": {
+          "created": [
+            {"index": index, "id": task_id}
+            for index, task_id in zip(row_indexes, created_ids)
+          ],
+          "errors": errors
+        },
+        "status": "success" if not errors else "partial"
+      }
+
+    except (EmptyTaskBatchError, TaskBatchTooLargeError) as e:
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+      raise e
@@ -0,0 +1,148 @@
+# Admission control
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from src.core.config import settings
+from src.core.metrics import registry, CallbackMetric, http_admission_queue_wait_seconds
+
+class ConcurrencyLimiter:
+  """
+  Caps the requests of a route group served at once, with a bounded wait queue.
+
+  Up to `limit` requests run concurrently; the next `queue_size` wait in
+  arrival order for a slot, at most `queue_timeout` seconds each. Anything
+  beyond is refused at once, so under overload the admitted requests keep a
+  bounded latency instead of everybody waiting for a pooled connection.
+
+  It is only touched from the event loop thread, like the caches.
+
+  Attributes:
+      name: Route group, used as the metrics label
+      limit: Requests served concurrently
+      queue_size: Requests allowed to wait for a slot
+      queue_timeout: Longest wait for a slot, in seconds
+      active: Requests currently holding a slot
+  """
+  def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+    self.name = name
+    self.limit = limit
+    self.queue_size = queue_size
+    self.queue_timeout = queue_timeout
+    self.active = 0
+    self._waiters: Deque[asyncio.Future] = deque()
+
+  @property
+  def queued(self) -> int:
+    return len(self._waiters)
+
+  async def acquire(self) -> Optional[str]:
+    """
+    Take a slot, waiting in the queue if they are all in use.
+
+    Returns:
+        None once the slot is held (release() it), otherwise why the
+        request is refused: "queue_full" or "queue_timeout"
+    """
+    if self.active < self.limit and not self._waiters:
+      self.active += 1
+      return None
+    if len(self._waiters) >= self.queue_size:
+      return "queue_full"
+
+    loop = asyncio.get_running_loop()
+    waiter = loop.create_future()
+    self._waiters.append(waiter)
+    timer = loop.call_later(self.queue_timeout, self._expire, waiter)
+    start = time.perf_counter()
+    try:
+      granted = await waiter
+    except asyncio.CancelledError:
+      # The client went away while queued; a slot handed over meanwhile is passed on
+      if waiter.done() and not waiter.cancelled() and waiter.result():
+        self.release()
+      elif waiter in self._waiters:
+        self._waiters.remove(waiter)
+      raise
+    finally:
+      timer.cancel()
+
+    if not granted:
+      return "queue_timeout"
+    http_admission_queue_wait_seconds.observe((self.name,), time.perf_counter() - start)
+    return None
+
+  def release(self) -> None:
+    # The slot goes straight to the oldest waiter, so active stays the same
+    while self._waiters:
+      waiter = self._waiters.popleft()
+      if not waiter.done():
+        waiter.set_result(True)
+        return
+    self.active -= 1
+
+  def _expire(self, waiter: asyncio.Future) -> None:
+    if not waiter.done():
+      self._waiters.remove(waiter)
+      waiter.set_result(False)
+
+  def stats(self) -> dict:
+    return {
+      "limit": self.limit,
+      "queue_size": self.queue_size,
+      "active": self.active,
+      "queued": self.queued
+    }
+
+# Share of the primary's connections each route group gets when ADMISSION_CONCURRENCY is unset
+DEFAULT_POOL_SHARES = {"reads": 0.4, "writes": 0.2, "tasks": 0.3, "exports": 0.1}
+
+def default_concurrency() -> Dict[str, int]:
+  """
+  Limits of the route groups derived from the pool capacity.
+
+  The shares of DB_POOL_SIZE + DB_MAX_OVERFLOW are rounded down, so the
+  admitted requests never need more connections than the pool has (5 + 10
+  gives reads 6, writes 3, tasks 4, exports 1); each group keeps at least
+  one slot.
+
+  Returns:
+      The concurrency limit keyed by route group
+  """
+  capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+  return {group: max(1, int(capacity * share)) for group, share in DEFAULT_POOL_SHARES.items()}
+
+def build_limiters() -> Dict[str, ConcurrencyLimiter]:
+  """
+  One limiter per route group of ADMISSION_CONCURRENCY, or of default_concurrency() when unset.
+
+  Returns:
+      The limiters keyed by route group
+  """
+  concurrency = settings.ADMISSION_CONCURRENCY
+  if concurrency is None:
+    concurrency = default_concurrency()
+  return {
+    group: ConcurrencyLimiter(
+      group,
+      limit,
+      settings.ADMISSION_QUEUE_SIZE.get(group, 0),
+      settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+    )
+    for group, limit in concurrency.items()
+  }
+
+# Limiters of the route groups, used by AdmissionMiddleware
+admission_limiters = build_limiters()
+
+registry.register(CallbackMetric(
+  "http_admission_requests",
+  "Requests holding or waiting for a slot, by route group.",
+  ("group", "state"),
+  lambda: {
+    key: value
+    for group, limiter in admission_limiters.items()
+    for key, value in (((group, "active"), limiter.active), ((group, "queued"), limiter.queued))
+  }
+))
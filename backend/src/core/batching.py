@@ -0,0 +1,142 @@
+# Write batching (group commit)
+import asyncio
+import contextvars
+from collections import defaultdict
+from typing import Callable, List, Optional, Tuple
+
+from sqlmodel import insert
+
+from src.core.cache import project_cache
+from src.core.config import settings
+from src.core.db import AsyncSessionLocal
+from src.core.logging import logger
+from src.core.metrics import db_write_batch_rows, db_write_batch_fallbacks_total
+from src.helpers.task_counters import count_statuses, increment_task_counters
+from src.models.models import Task
+
+PendingTask = Tuple[int, dict, asyncio.Future]
+
+class TaskBatcher:
+  """
+  Coalesces concurrent task inserts into shared transactions.
+
+  Tasks submitted within window_ms of each other, up to max_size of them,
+  are written together: one multi-row INSERT ... RETURNING, one counter
+  UPDATE per project and a single commit on one pooled connection, instead
+  of one connection and commit per request. Each caller's future resolves
+  to its own row.
+
+  If the batch fails as a whole (e.g. one task points at a deleted project),
+  its tasks are retried one transaction each, so only the failing callers
+  get the error.
+
+  It is only touched from the event loop thread, like the caches.
+
+  Attributes:
+      window_ms: How long the first task of a batch waits for others
+      max_size: Batch size that triggers an immediate flush
+  """
+  def __init__(self, session_factory: Callable, window_ms: float, max_size: int):
+    self.session_factory = session_factory
+    self.window_ms = window_ms
+    self.max_size = max_size
+    self._pending: List[PendingTask] = []
+    self._timer: Optional[asyncio.TimerHandle] = None
+    # Strong references to the running flushes, the event loop only keeps weak ones
+    self._flushes = set()
+
+  async def create(self, project_id: int, values: dict) -> Task:
+    """
+    Insert a task in the next batch.
+
+    Args:
+        project_id: ID of the project, already validated
+        values: Column values of the task (TaskCreate.model_dump())
+
+    Returns:
+        Task: The stored row, committed
+
+    Raises:
+        Exception: Whatever the task's own INSERT raised
+    """
+    future = asyncio.get_running_loop().create_future()
+    self._pending.append((project_id, values, future))
+
+    if len(self._pending) >= self.max_size:
+      self._flush()
+    elif self._timer is None:
+      self._timer = asyncio.get_running_loop().call_later(self.window_ms / 1000, self._flush)
+    return await future
+
+  def _flush(self) -> None:
+    if self._timer is not None:
+      self._timer.cancel()
+      self._timer = None
+    batch, self._pending = self._pending, []
+    if not batch:
+      return
+
+    # The batch belongs to no single request, so it runs in an empty context
+    # (no request ID, no request profile)
+    flush = contextvars.Context().run(asyncio.create_task, self._write(batch))
+    self._flushes.add(flush)
+    flush.add_done_callback(self._flushes.discard)
+
+  async def _write(self, batch: List[PendingTask]) -> None:
+    db_write_batch_rows.observe(("tasks",), len(batch))
+    try:
+      tasks = await self._insert(batch)
+    except Exception as e:
+      if len(batch) == 1:
+        self._resolve(batch, error=e)
+        return
+      db_write_batch_fallbacks_total.inc(("tasks",))
+      logger.warning("Task batch of %d failed, retrying one by one: %s", len(batch), e)
+      for item in batch:
+        try:
+          tasks = await self._insert([item])
+        except Exception as item_error:
+          self._resolve([item], error=item_error)
+        else:
+          self._resolve([item], tasks)
+      return
+    self._resolve(batch, tasks)
+
+  async def _insert(self, batch: List[PendingTask]) -> List[Task]:
+    rows = [{**values, "project_id": project_id} for project_id, values, _ in batch]
+    statuses_by_project = defaultdict(list)
+    for row in rows:
+      statuses_by_project[row["project_id"]].append(row["status"])
+
+    async with self.session_factory() as session:
+      try:
+        result = await session.scalars(
+          insert(Task).returning(Task, sort_by_parameter_order=True),
+          rows
+        )
+        tasks = result.all()
+        # Projects in ID order, so concurrent batches lock their rows in the same order
+        for project_id in sorted(statuses_by_project):
+          await increment_task_counters(session, project_id, count_statuses(statuses_by_project[project_id]))
+        await session.commit()
+      except Exception:
+        await session.rollback()
+        raise
+
+    for project_id in statuses_by_project:
+      project_cache.invalidate(project_id)
+    return tasks
+
+  @staticmethod
+  def _resolve(batch: List[PendingTask], tasks: Optional[List[Task]] = None, error: Optional[BaseException] = None) -> None:
+    for index, (_, _, future) in enumerate(batch):
+      # The caller may have gone away (client disconnect) while the batch ran
+      if future.done():
+        continue
+      if error is not None:
+        future.set_exception(error)
+      else:
+        future.set_result(tasks[index])
+
+# Batches are written on the primary
+task_batcher = TaskBatcher(AsyncSessionLocal, settings.TASK_BATCH_WINDOW_MS, settings.TASK_BATCH_MAX_SIZE)
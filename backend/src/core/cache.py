@@ -0,0 +1,95 @@
+# In-process caches
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from src.core.config import settings
+from src.core.metrics import registry, CallbackMetric
+
+class LRUTTLCache:
+  """
+  Bounded least-recently-used cache whose entries also expire after a TTL.
+
+  It is only touched from the event loop thread, so it needs no locking.
+  Values should be plain data (e.g. a model_dump() dict), never ORM
+  instances, so entries are never tied to the session that produced them.
+  
+  Attributes:
+      max_size: Maximum number of entries before the least recently used is evicted
+      ttl_seconds: Lifetime of an entry
+      enabled: When False every lookup misses and nothing is stored
+      hits: Number of lookups served from the cache
+      misses: Number of lookups that were not cached or had expired
+      evictions: Number of entries dropped to stay within max_size
+  """
+  def __init__(self, max_size: int, ttl_seconds: float, enabled: bool = True):
+    self.max_size = max_size
+    self.ttl_seconds = ttl_seconds
+    self.enabled = enabled
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+  def get(self, key: Hashable) -> Optional[Any]:
+    entry = self._entries.get(key) if self.enabled else None
+    if entry is None:
+      self.misses += 1
+      return None
+
+    expires_at, value = entry
+    if expires_at <= time.monotonic():
+      del self._entries[key]
+      self.misses += 1
+      return None
+
+    self._entries.move_to_end(key)
+    self.hits += 1
+    return value
+
+  def set(self, key: Hashable, value: Any) -> None:
+    if not self.enabled:
+      return
+    self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+    self._entries.move_to_end(key)
+    while len(self._entries) > self.max_size:
+      self._entries.popitem(last=False)
+      self.evictions += 1
+
+  def invalidate(self, key: Hashable) -> None:
+    self._entries.pop(key, None)
+
+  def clear(self) -> None:
+    self._entries.clear()
+
+  def stats(self) -> dict:
+    return {
+      "enabled": self.enabled,
+      "size": len(self._entries),
+      "max_size": self.max_size,
+      "ttl_seconds": self.ttl_seconds,
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions
+    }
+
+# Column values of projects keyed by ID, used by validate_existing_project. Per
+# worker: other workers' writes are only seen once the entry expires, so it
+# serves existence checks, never response bodies or validators
+project_cache = LRUTTLCache(
+  max_size=settings.PROJECT_CACHE_MAX_SIZE,
+  ttl_seconds=settings.PROJECT_CACHE_TTL_SECONDS,
+  enabled=settings.PROJECT_CACHE_ENABLED
+)
+
+registry.register(CallbackMetric(
+  "project_cache_events_total",
+  "Project cache lookups and evictions.",
+  ("event",),
+  lambda: {
+    ("hit",): project_cache.hits,
+    ("miss",): project_cache.misses,
+    ("eviction",): project_cache.evictions
+  },
+  type_name="counter"
+))
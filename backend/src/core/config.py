@@ -1,24 +1,72 @@
 # database config
-from typing import List
+from typing import Dict, List, Literal, Optional
 from pydantic_settings import BaseSettings
-from pydantic import ConfigDict
+from pydantic import ConfigDict, model_validator
 
 class Settings(BaseSettings):
-    POSTGRES_SERVER: str
-    POSTGRES_PORT: int 
-    POSTGRES_USER: str 
-    POSTGRES_PASSWORD: str 
-    POSTGRES_DB: str
+    POSTGRES_SERVER: Optional[str] = None
+    POSTGRES_PORT: Optional[int] = None
+    POSTGRES_USER: Optional[str] = None
+    POSTGRES_PASSWORD: Optional[str] = None
+    POSTGRES_DB: Optional[str] = None
+    # Full async URL overriding the POSTGRES_* settings, e.g. sqlite+aiosqlite:///./uptask.db
+    DATABASE_URL: Optional[str] = None
+
+    @model_validator(mode="after")
+    def require_database_settings(self):
+        if self.DATABASE_URL is None:
+            missing = [
+                name for name in ("POSTGRES_SERVER", "POSTGRES_PORT", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB")
+                if getattr(self, name) is None
+            ]
+            if missing:
+                raise ValueError(f"Missing database settings: {', '.join(missing)} (or set DATABASE_URL)")
+        return self
 
     @property
     def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str: 
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}?ssl=require"
+
+    # database engine config
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement caches, set to 0 behind pgbouncer in transaction mode
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: Optional[float] = 60.0
+
+    # startup config
+    # create_all creates the missing tables on every boot and records the
+    # schema version in an empty database, refusing one at another version;
+    # verify only checks the schema_version row (one query), for rolling
+    # restarts of a migrated database; skip does not touch the database
+    # before the first request
+    DB_STARTUP_MODE: Literal["create_all", "verify", "skip"] = "create_all"
+    # Budget of the /readyz connection checkout and ping
+    READINESS_TIMEOUT_SECONDS: float = 2.0
+
+    # read replica config
+    # Async URLs of read replicas, GET requests are routed to them; to try it
+    # locally point one at a copy of the primary SQLite file
+    DATABASE_REPLICA_URLS: List[str] = []
+    DB_REPLICA_STRATEGY: Literal["round_robin", "least_busy"] = "round_robin"
+    # A replica that failed is skipped for this long
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+    # After a client's write its reads stay on the primary this long, longer than the replication lag
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_READ_YOUR_WRITES_COOKIE: str = "uptask_primary_until"
     
     # cors config
     CORS_ORIGINS: List[str]
     CORS_ALLOW_CREDENTIALS: bool = True
     CORS_ALLOW_METHODS: List[str] = ["*"]
     CORS_ALLOW_HEADERS: List[str] = ["*"]
+    # Response headers readable by browser code, ETag is needed to send If-Match
+    CORS_EXPOSE_HEADERS: List[str] = ["ETag", "Last-Modified"]
 
     # logging config
     LOG_LEVEL: str = "INFO"
@@ -26,8 +74,68 @@ class Settings(BaseSettings):
     LOG_FILE: str = "logs/app.log"
     ENABLE_REQUEST_LOGGING: bool = True
     ENABLE_SQL_LOGGING: bool = False
+    LOG_QUEUE_SIZE: int = 10000
+    # Fraction of INFO/DEBUG records kept per logger, e.g. {"app.request": 0.1}
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+
+    # profiler config
+    # The header returns SQL counts and timings to the client, enable it only
+    # for trusted callers or behind PROFILER_HEADER_SECRET (then the header's
+    # value must be the secret)
+    PROFILER_ALLOW_HEADER: bool = False
+    PROFILER_HEADER: str = "X-Profile"
+    PROFILER_HEADER_SECRET: Optional[str] = None
+    PROFILER_SAMPLE_RATE: float = 0.0
+    PROFILER_REPEAT_THRESHOLD: int = 5
+
+    # cache config
+    PROJECT_CACHE_ENABLED: bool = True
+    PROJECT_CACHE_MAX_SIZE: int = 1024
+    PROJECT_CACHE_TTL_SECONDS: float = 30.0
+
+    # pagination config
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 200
+    # Tasks embedded in each project by ?include=tasks, the counters give the totals
+    PROJECT_EMBEDDED_TASKS_LIMIT: int = 20
+
+    # task write batching config
+    # Concurrent task creations are committed together (see src/core/batching.py)
+    TASK_BATCHING_ENABLED: bool = False
+    TASK_BATCH_WINDOW_MS: float = 2.0
+    TASK_BATCH_MAX_SIZE: int = 100
+
+    # admission control config
+    # Requests served at once per route group (see src/core/middleware/admission_middleware.py),
+    # groups left out are not limited. Unset, the DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+    # are split between the groups so they never wait on the pool (src/core/admission.py)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_CONCURRENCY: Optional[Dict[str, int]] = None
+    # Requests waiting for a slot per group, the next ones get a 503 at once
+    ADMISSION_QUEUE_SIZE: Dict[str, int] = {"reads": 50, "writes": 20, "tasks": 50, "exports": 10}
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # bulk operations config
+    TASKS_BULK_MAX_ITEMS: int = 10000
+    PROJECT_IMPORT_CHUNK_SIZE: int = 500
+    PROJECT_IMPORT_MAX_LINE_BYTES: int = 1048576  # 1MB
+    PROJECT_IMPORT_MAX_REPORTED_ERRORS: int = 1000
+
+    # export config
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_FLUSH_BYTES: int = 65536  # 64KB
+
+    # compression config
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes, smaller bodies are sent as is
+    # Preferred first when the client accepts several equally; zstd and br need
+    # the optional zstandard and brotli packages and are skipped without them
+    COMPRESSION_ENCODINGS: List[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_BROTLI_QUALITY: int = 4
 
     model_config = ConfigDict(env_file=".env")
 
 settings = Settings()
-print("CORS_ORIGINS: ", settings.CORS_ORIGINS)
\ No newline at end of file
@@ -1,44 +1,258 @@
 # Database async connection
-from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+import time
+from sqlmodel import SQLModel, insert, select
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from src.core.config import settings
-from fastapi import Depends
+from fastapi import Depends, Request
+from starlette.requests import HTTPConnection
 from contextlib import asynccontextmanager
-from typing import Annotated, AsyncGenerator
-from src.core.logging import log_database_connection, log_service_startup
+from typing import Annotated, AsyncGenerator, AsyncIterator, Optional
+from src.core.logging import logger, log_database_connection, log_service_startup, log_service_shutdown, setup_logging, stop_logging
+from src.core.pool import InstrumentedAsyncQueuePool, get_pool_stats
+from src.core.metrics import registry, CallbackMetric, instrument_engine, db_read_sessions_total
+from src.core.profiler import profile_engine
+from src.core.replicas import READ_METHODS, FallbackSession, ReplicaSet, pinned_to_primary
 
-from src.models.models import Project, TaskStatus, Task
+from src.models.models import SCHEMA_VERSION, Project, SchemaVersion, TaskStatus, Task
+# Registers the full-text search indexes created together with the tables
+import src.models.search
 
-# Create async engine
-async_engine = create_async_engine(
-  settings.SQLALCHEMY_ASYNC_DATABASE_URI,
-  echo=True,
-  future=True,
-)
+def build_engine(database_url: str) -> AsyncEngine:
+  """
+  Create an async engine configured from the DB_* settings.
+  
+  Args:
+      database_url: Async database URL (postgresql+asyncpg, sqlite+aiosqlite, ...)
+      
+  Returns:
+      AsyncEngine: The configured engine
+  """
+  url = make_url(database_url)
+  engine_options = {
+    "future": True,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+  }
+
+  # In-memory SQLite must keep its single connection, everything else gets a sized queue pool
+  if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+    engine_options.update({
+      "poolclass": InstrumentedAsyncQueuePool,
+      "pool_size": settings.DB_POOL_SIZE,
+      "max_overflow": settings.DB_MAX_OVERFLOW,
+      "pool_timeout": settings.DB_POOL_TIMEOUT,
+      "pool_recycle": settings.DB_POOL_RECYCLE,
+    })
+
+  if url.get_driver_name() == "asyncpg":
+    # SQLAlchemy keeps its own prepared statement cache on top of asyncpg's
+    url = url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+    engine_options["connect_args"] = {
+      "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+      "command_timeout": settings.DB_COMMAND_TIMEOUT,
+    }
+
+  return create_async_engine(url, **engine_options)
+
+# Engines, created on first use by get_engine() rather than at import time
+_engine: Optional[AsyncEngine] = None
+replica_set = ReplicaSet([])
 
-# Create async session 
+def _pool_metrics() -> dict:
+  if _engine is None:
+    return {}
+  stats = get_pool_stats(_engine.pool)
+  return {(state,): stats[state] for state in ("checked_out", "idle", "overflow") if state in stats}
+
+registry.register(CallbackMetric(
+  "db_pool_connections", "Pooled database connections by state.", ("state",), _pool_metrics
+))
+
+# Create async session, bound to the primary by get_engine()
 AsyncSessionLocal = async_sessionmaker(
-  async_engine,
   class_=AsyncSession,
   expire_on_commit=False,
 )
 
+# Sessions of read requests on a replica, bound per session to the chosen one
+ReplicaSessionLocal = async_sessionmaker(
+  class_=AsyncSession,
+  sync_session_class=FallbackSession,
+  expire_on_commit=False,
+)
+
+def get_engine() -> AsyncEngine:
+  """
+  The primary engine, built together with the replica engines on first use.
+
+  The lifespan builds them at startup; commands and benchmarks that run the
+  app without it get them on their first session or statement.
+
+  Returns:
+      AsyncEngine: The instrumented primary engine, AsyncSessionLocal is bound to it
+  """
+  global _engine, replica_set
+  if _engine is None:
+    engine = build_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URI)
+    instrument_engine(engine)
+    profile_engine(engine)
+
+    # Read replica engines, instrumented like the primary
+    replica_engines = [build_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+    for replica_engine in replica_engines:
+      instrument_engine(replica_engine)
+      profile_engine(replica_engine)
+    replica_set = ReplicaSet(replica_engines, settings.DB_REPLICA_STRATEGY, settings.DB_REPLICA_RETRY_SECONDS)
+
+    AsyncSessionLocal.configure(bind=engine)
+    _engine = engine
+  return _engine
+
+def __getattr__(name: str):
+  # `from src.core.db import async_engine` (commands, benchmarks) builds the engines on demand
+  if name == "async_engine":
+    return get_engine()
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _check_schema_version(stored: Optional[int]) -> None:
+  if stored != SCHEMA_VERSION:
+    raise RuntimeError(
+      f"Database schema version is {stored}, expected {SCHEMA_VERSION}: "
+      "migrate it, python -m src.commands.upgrade_schema upgrades a database created before "
+      "versioning (DB_STARTUP_MODE=create_all only initializes an empty database)"
+    )
+
+def _table_names(sync_connection) -> set:
+  return set(inspect(sync_connection).get_table_names())
+
 async def create_db_and_tables():
-  async with async_engine.begin() as connection: 
+  """
+  Create the missing tables, recording SCHEMA_VERSION only in an empty database.
+
+  A database that already has tables must hold this SCHEMA_VERSION: create_all
+  only adds missing tables, it would leave older ones without their new
+  columns, so it is neither changed nor marked current.
+
+  Raises:
+      RuntimeError: The database has tables but holds another or no version
+  """
+  async with get_engine().begin() as connection:
+    existing = await connection.run_sync(_table_names)
+    if SchemaVersion.__tablename__ in existing:
+      _check_schema_version((await connection.execute(select(SchemaVersion.version))).scalar())
+    elif existing & set(SQLModel.metadata.tables):
+      _check_schema_version(None)
+
     await connection.run_sync(SQLModel.metadata.create_all)
-    log_database_connection("PostgreSQL", "success")
+    if SchemaVersion.__tablename__ not in existing:
+      await connection.execute(insert(SchemaVersion).values(version=SCHEMA_VERSION))
+    log_database_connection(get_engine().dialect.name, "success")
+
+async def verify_schema_version():
+  """
+  Check that the database was created for this SCHEMA_VERSION, without touching the tables.
+
+  Raises:
+      RuntimeError: The schema_version table is missing or holds another version
+  """
+  async with get_engine().connect() as connection:
+    has_table = await connection.run_sync(lambda sync_connection: inspect(sync_connection).has_table(SchemaVersion.__tablename__))
+    stored = (await connection.execute(select(SchemaVersion.version))).scalar() if has_table else None
+  _check_schema_version(stored)
+  log_database_connection(get_engine().dialect.name, "success")
+
+async def ping_database(timeout: float) -> None:
+  """
+  Run a trivial query on a pooled connection of the primary.
+
+  Args:
+      timeout: Seconds allowed for the checkout and the query
+
+  Raises:
+      TimeoutError: The pool or the database did not answer in time
+      Exception: Whatever the driver raised
+  """
+  async with asyncio.timeout(timeout):
+    async with get_engine().connect() as connection:
+      await connection.execute(text("SELECT 1"))
 
 @asynccontextmanager
 async def lifespan(app): 
-  await create_db_and_tables()
+  startup_began = time.perf_counter()
+  setup_logging()
+  engine = get_engine()
+  if settings.DB_STARTUP_MODE == "create_all":
+    await create_db_and_tables()
+  elif settings.DB_STARTUP_MODE == "verify":
+    await verify_schema_version()
+  logger.info("Database pool: %s", get_pool_stats(engine.pool))
+  if replica_set:
+    logger.info("Read replicas: %d, %s routing", len(replica_set.replicas), replica_set.strategy)
+
+  app.state.ready = True
+  # From the import of src.main (set by it) to here, the startup alone is the schema check
+  now = time.perf_counter()
+  started_at = getattr(app.state, "started_at", startup_began)
+  logger.info(
+    "Cold start: %.0fms, %.0fms of it in startup (DB_STARTUP_MODE=%s)",
+    (now - started_at) * 1000,
+    (now - startup_began) * 1000,
+    settings.DB_STARTUP_MODE
+  )
   log_service_startup("UpTask API")
   yield
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]: 
-  async with AsyncSessionLocal() as session: 
-    try: 
-      yield session
-    finally: 
-      await session.close() 
+  app.state.ready = False
+  log_service_shutdown("UpTask API")
+  await engine.dispose()
+  await replica_set.dispose()
+  stop_logging()
+
+@asynccontextmanager
+async def request_session(request: HTTPConnection) -> AsyncIterator[AsyncSession]:
+  """
+  Session of a request, on a read replica when the request can be served by one.
+
+  GET and HEAD requests go to a replica picked by DB_REPLICA_STRATEGY, unless
+  the client wrote within DB_READ_YOUR_WRITES_SECONDS or every replica is
+  down; everything else uses the primary. A replica failing mid-request
+  hands the session over to the primary (see FallbackSession).
+
+  Args:
+      request: The request the session is opened for
+  """
+  get_engine()
+  replica = None
+  if replica_set and request.method in READ_METHODS and not pinned_to_primary(request):
+    replica = replica_set.choose()
+
+  if replica is None:
+    if request.method in READ_METHODS:
+      db_read_sessions_total.inc(("primary",))
+    async with AsyncSessionLocal() as session: 
+      try: 
+        yield session
+      finally: 
+        await session.close() 
+    return
+
+  db_read_sessions_total.inc((replica.name,))
+  replica.in_use += 1
+  info = {"replica": replica, "replica_set": replica_set, "primary": get_engine().sync_engine}
+  try:
+    async with ReplicaSessionLocal(bind=replica.engine, info=info) as session:
+      try:
+        yield session
+      finally:
+        await session.close()
+  finally:
+    replica.in_use -= 1
+
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]: 
+  """Request-scoped session dependency, see request_session"""
+  async with request_session(request) as session:
+    yield session
 
 AsyncSessionDependency = Annotated[AsyncSession, Depends(get_async_session)]
\ No newline at end of file
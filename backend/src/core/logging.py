@@ -1,68 +1,157 @@
-import logging 
-import logging.config
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
 from pathlib import Path
 from src.core.config import settings
 import colorama
 
+# Attributes every LogRecord has, anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "color"}
+
+class JsonFormatter(logging.Formatter):
+  """Format records as one JSON object per line, including their `extra` fields"""
+  def format(self, record: logging.LogRecord) -> str:
+    payload = {
+      "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+      "level": record.levelname,
+      "logger": record.name,
+      "message": record.getMessage(),
+    }
+    for key, value in record.__dict__.items():
+      if key not in _RECORD_ATTRIBUTES:
+        payload[key] = value
+    if record.exc_info:
+      payload["exc_info"] = self.formatException(record.exc_info)
+    return json.dumps(payload, default=str, ensure_ascii=False)
+
+class ConsoleFormatter(logging.Formatter):
+  """Plain text formatter that wraps the message in the record's `color`, if any"""
+  def formatMessage(self, record: logging.LogRecord) -> str:
+    color = getattr(record, "color", None)
+    if color:
+      record.message = f"{color}{record.message}{LogColors.RESET}"
+    return super().formatMessage(record)
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+  """
+  QueueHandler that never blocks the event loop.
+
+  Only the message interpolation happens on the calling thread; formatting and
+  I/O are done by the QueueListener thread. Records are dropped (and counted)
+  when the queue is full instead of waiting for room.
+  """
+  def __init__(self, log_queue: queue.Queue):
+    super().__init__(log_queue)
+    self.dropped = 0
+
+  def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+    # Records stay in-process, so unlike the base class there is no need to
+    # pre-format or strip exc_info, only to freeze the message arguments
+    record.msg = record.getMessage()
+    record.args = None
+    return record
+
+  def enqueue(self, record: logging.LogRecord) -> None:
+    try:
+      self.queue.put_nowait(record)
+    except queue.Full:
+      self.dropped += 1
+
+class SamplingFilter(logging.Filter):
+  """Let through a fraction of the records below WARNING, warnings and errors always pass"""
+  def __init__(self, rate: float):
+    super().__init__()
+    self.rate = rate
+
+  def filter(self, record: logging.LogRecord) -> bool:
+    return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+# Listener thread draining the log queue, started by setup_logging
+log_listener = None
+
 def setup_logging():
-  """Setup centralized logging configuration"""
-  # Create logs directory if it doesn't exist 
+  """
+  Send every log record through the queue drained by the listener thread.
+
+  Called at startup (the app's lifespan, the commands' main) rather than at
+  import, it creates the log directory and starts the thread; records logged
+  before only reach Python's last resort handler (warnings and errors on
+  stderr). Calling it again does nothing.
+  """
+  global log_listener
+  if log_listener is not None:
+    return
+
+  # Create logs directory if it doesn't exist
   log_dir = Path(settings.LOG_FILE).parent
   log_dir.mkdir(parents=True, exist_ok=True)
 
-  # Logging configuration
-  logging_config = {
-        "version": 1,
-        "disable_existing_loggers": False,
-        "formatters": {
-            "json": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-                "datefmt": "%Y-%m-%d %H:%M:%S"
-            },
-            "simple": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            }
-        },
-        "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "level": settings.LOG_LEVEL,
-                "formatter": "simple",
-                "stream": "ext://sys.stdout"
-            },
-            "file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "level": settings.LOG_LEVEL,
-                "formatter": "json",
-                "filename": settings.LOG_FILE,
-                "maxBytes": 10485760,  # 10MB
-                "backupCount": 5,
-                "encoding": "utf-8"
-            }
-        },
-        "loggers": {
-            "app": {
-                "level": settings.LOG_LEVEL,
-                "handlers": ["console", "file"],
-                "propagate": False
-            },
-            "uvicorn.access": {
-                "level": "INFO",
-                "handlers": ["console", "file"],
-                "propagate": False
-            }
-        },
-        "root": {
-            "level": "INFO",
-            "handlers": ["console"]
-        }
-    }
-    
-  logging.config.dictConfig(logging_config)
-  return logging.getLogger("app")
+  formatters = {
+    "json": JsonFormatter(),
+    "simple": ConsoleFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+  }
+
+  console_handler = logging.StreamHandler(sys.stdout)
+  console_handler.setLevel(settings.LOG_LEVEL)
+  console_handler.setFormatter(formatters["simple"])
+
+  file_handler = logging.handlers.RotatingFileHandler(
+    settings.LOG_FILE,
+    maxBytes=10485760,  # 10MB
+    backupCount=5,
+    encoding="utf-8"
+  )
+  file_handler.setLevel(settings.LOG_LEVEL)
+  file_handler.setFormatter(formatters.get(settings.LOG_FORMAT, formatters["json"]))
+
+  # Console and file I/O run on the listener thread, off the event loop
+  log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+  queue_handler = NonBlockingQueueHandler(log_queue)
+  log_listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+  log_listener.start()
+  atexit.register(stop_logging)
+
+  for name, level in (("app", settings.LOG_LEVEL), ("uvicorn.access", "INFO")):
+    configured_logger = logging.getLogger(name)
+    configured_logger.setLevel(level)
+    configured_logger.handlers = [queue_handler]
+    configured_logger.propagate = False
+
+  for name, rate in settings.LOG_SAMPLE_RATES.items():
+    logging.getLogger(name).addFilter(SamplingFilter(rate))
+
+  # Everything else (SQLAlchemy, the pool, uvicorn, third-party libraries)
+  # reaches the queue through the root logger; uvicorn sets up handlers of
+  # its own before loading the app
+  root_logger = logging.getLogger()
+  root_logger.setLevel("INFO")
+  root_logger.handlers = [queue_handler]
+  uvicorn_logger = logging.getLogger("uvicorn")
+  uvicorn_logger.handlers = []
+  uvicorn_logger.propagate = True
 
-# Main logger instance
-logger = setup_logging()
+  # What the engines' echo flag would log, without the stdout handler it adds
+  if settings.ENABLE_SQL_LOGGING:
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+def stop_logging():
+  """Write out the queued records and stop the listener thread"""
+  global log_listener
+  if log_listener is not None:
+    log_listener.stop()
+    log_listener = None
+
+# Main logger instance, its handlers are set up by setup_logging
+logger = logging.getLogger("app")
+
+# Hot per-request loggers, children of "app" so they can be sampled on their own
+request_logger = logging.getLogger("app.request")
+operation_logger = logging.getLogger("app.operations")
 
 # Color constants for consistent styling across the application
 class LogColors:
@@ -75,24 +164,30 @@ class LogColors:
 # Core logging utility functions
 def log_operation_start(operation: str, entity_name: str = None):
     """Log the start of an operation"""
-    message = f"{LogColors.YELLOW}{operation}"
+    if not operation_logger.isEnabledFor(logging.INFO):
+        return
     if entity_name:
-        message += f": {entity_name}"
-    message += f"{LogColors.RESET}"
-    logger.info(message)
+        operation_logger.info("%s: %s", operation, entity_name, extra={"color": LogColors.YELLOW})
+    else:
+        operation_logger.info("%s", operation, extra={"color": LogColors.YELLOW})
 
 def log_operation_success(operation: str, entity_name: str = None):
     """Log successful completion of an operation"""
-    message = f"{LogColors.GREEN}{operation} completed successfully"
+    if not operation_logger.isEnabledFor(logging.INFO):
+        return
     if entity_name:
-        message += f": {entity_name}"
-    message += f" ✅{LogColors.RESET}"
-    logger.info(message)
+        operation_logger.info("%s completed successfully: %s ✅", operation, entity_name, extra={"color": LogColors.GREEN})
+    else:
+        operation_logger.info("%s completed successfully ✅", operation, extra={"color": LogColors.GREEN})
 
 def log_entity_action(action: str, entity_type: str, entity_name: str, entity_id: int = None):
     """Generic function to log entity actions (created, updated, deleted, etc.)"""
-    id_info = f" (ID: {entity_id})" if entity_id else ""
-    logger.info(f"{LogColors.GREEN}{entity_type} {action} successfully: {entity_name}{id_info} ✅{LogColors.RESET}")
+    if not operation_logger.isEnabledFor(logging.INFO):
+        return
+    if entity_id:
+        operation_logger.info("%s %s successfully: %s (ID: %s) ✅", entity_type, action, entity_name, entity_id, extra={"color": LogColors.GREEN})
+    else:
+        operation_logger.info("%s %s successfully: %s ✅", entity_type, action, entity_name, extra={"color": LogColors.GREEN})
 
 def log_entity_created(entity_type: str, entity_name: str, entity_id: int = None):
     """Log entity creation"""
@@ -109,9 +204,9 @@ def log_entity_deleted(entity_type: str, entity_name: str, entity_id: int = None
 def log_system_status(status_type: str, message: str, is_success: bool = True):
     """Generic function to log system status (database, service, etc.)"""
     if is_success:
-        logger.info(f"{LogColors.GREEN}{status_type}: {message} ✅{LogColors.RESET}")
+        logger.info("%s: %s ✅", status_type, message, extra={"color": LogColors.GREEN})
     else:
-        logger.error(f"{LogColors.RED}{status_type}: {message} ❌{LogColors.RESET}")
+        logger.error("%s: %s ❌", status_type, message, extra={"color": LogColors.RED})
 
 def log_database_connection(connection_type: str, status: str):
     """Log database connection status"""
@@ -121,8 +216,8 @@ def log_database_connection(connection_type: str, status: str):
 
 def log_service_startup(service_name: str):
     """Log service startup"""
-    logger.info(f"{LogColors.GREEN}Service started: {service_name} 🚀{LogColors.RESET}")
+    logger.info("Service started: %s 🚀", service_name, extra={"color": LogColors.GREEN})
 
 def log_service_shutdown(service_name: str):
     """Log service shutdown"""
-    logger.info(f"{LogColors.YELLOW}Service shutting down: {service_name} 🔄{LogColors.RESET}")
\ No newline at end of file
+    logger.info("Service shutting down: %s 🔄", service_name, extra={"color": LogColors.YELLOW})
@@ -0,0 +1,224 @@
+# In-process metrics exposed in the Prometheus text format
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+LabelValues = Tuple[str, ...]
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+  pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+  if extra:
+    pairs.append(extra)
+  return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value) -> str:
+  return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+  if value == float("inf"):
+    return "+Inf"
+  return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric(ABC):
+  """
+  Base class of the metrics held by the registry.
+
+  Metrics are only updated from the event loop thread (request handlers and
+  the SQLAlchemy cursor events, which run in its greenlets), so recording is
+  a couple of dict operations with no locking.
+  """
+  type_name = ""
+
+  def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+
+  @abstractmethod
+  def samples(self) -> List[str]:
+    """Sample lines of the metric in the Prometheus text format"""
+
+  def render(self) -> List[str]:
+    return [
+      f"# HELP {self.name} {self.documentation}",
+      f"# TYPE {self.name} {self.type_name}",
+      *self.samples()
+    ]
+
+class Counter(Metric):
+  type_name = "counter"
+
+  def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+    super().__init__(name, documentation, labelnames)
+    self._values: Dict[LabelValues, float] = {}
+
+  def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+    self._values[labels] = self._values.get(labels, 0) + amount
+
+  def samples(self) -> List[str]:
+    return [
+      f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+      for labels, value in self._values.items()
+    ]
+
+class Gauge(Counter):
+  type_name = "gauge"
+
+  def dec(self, labels: LabelValues = (), amount: float = 1) -> None:
+    self.inc(labels, -amount)
+
+  def set(self, labels: LabelValues, value: float) -> None:
+    self._values[labels] = value
+
+class CallbackMetric(Metric):
+  """Counter or gauge whose values are read from a callback at scrape time"""
+  def __init__(
+      self,
+      name: str,
+      documentation: str,
+      labelnames: Sequence[str],
+      callback: Callable[[], Dict[LabelValues, float]],
+      type_name: str = "gauge"
+  ):
+    super().__init__(name, documentation, labelnames)
+    self.callback = callback
+    self.type_name = type_name
+
+  def samples(self) -> List[str]:
+    return [
+      f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+      for labels, value in self.callback().items()
+    ]
+
+class Histogram(Metric):
+  type_name = "histogram"
+
+  def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+    super().__init__(name, documentation, labelnames)
+    self.buckets = tuple(sorted(buckets))
+    # Per label set: [per-bucket counts (non-cumulative, last one is +Inf), sum, count]
+    self._values: Dict[LabelValues, list] = {}
+
+  def observe(self, labels: LabelValues, value: float) -> None:
+    entry = self._values.get(labels)
+    if entry is None:
+      entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+    entry[0][bisect_left(self.buckets, value)] += 1
+    entry[1] += value
+    entry[2] += 1
+
+  def samples(self) -> List[str]:
+    lines = []
+    for labels, (counts, total, count) in self._values.items():
+      cumulative = 0
+      for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+        cumulative += bucket_count
+        le = f'le="{_format_value(bound)}"'
+        lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+      lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+      lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+    return lines
+
+class MetricsRegistry:
+  def __init__(self):
+    self._metrics: Dict[str, Metric] = {}
+
+  def register(self, metric: Metric) -> Metric:
+    self._metrics[metric.name] = metric
+    return metric
+
+  def render(self) -> str:
+    lines = []
+    for metric in self._metrics.values():
+      lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# HTTP metrics, recorded by MetricsMiddleware
+http_requests_total = registry.register(Counter(
+  "http_requests_total", "Total HTTP requests.", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+  "http_request_duration_seconds", "HTTP request latency in seconds.", ("method", "route", "status")
+))
+http_requests_in_progress = registry.register(Gauge(
+  "http_requests_in_progress", "HTTP requests currently being served.", ("method",)
+))
+
+# Admission metrics, recorded by AdmissionMiddleware
+http_admission_shed_total = registry.register(Counter(
+  "http_admission_shed_total", "Requests refused with 503 by admission control.", ("group", "reason")
+))
+http_admission_queue_wait_seconds = registry.register(Histogram(
+  "http_admission_queue_wait_seconds", "Time admitted requests waited for a slot.", ("group",)
+))
+
+# Compression metrics, recorded by CompressionMiddleware
+http_compression_responses_total = registry.register(Counter(
+  "http_compression_responses_total", "Responses compressed.", ("encoding",)
+))
+http_compression_cpu_seconds_total = registry.register(Counter(
+  "http_compression_cpu_seconds_total", "CPU time spent compressing responses.", ("encoding",)
+))
+http_compression_input_bytes_total = registry.register(Counter(
+  "http_compression_input_bytes_total", "Response bytes before compression.", ("encoding",)
+))
+http_compression_output_bytes_total = registry.register(Counter(
+  "http_compression_output_bytes_total", "Response bytes after compression.", ("encoding",)
+))
+
+# Database metrics, recorded by the engine cursor events
+db_statements_total = registry.register(Counter(
+  "db_statements_total", "Total SQL statements executed.", ("operation",)
+))
+db_statement_duration_seconds = registry.register(Histogram(
+  "db_statement_duration_seconds", "SQL statement execution time in seconds.", ("operation",), DB_LATENCY_BUCKETS
+))
+
+db_write_batch_rows = registry.register(Histogram(
+  "db_write_batch_rows", "Rows written per coalesced write batch.", ("table",), (1, 2, 5, 10, 25, 50, 100, 250, 500)
+))
+db_write_batch_fallbacks_total = registry.register(Counter(
+  "db_write_batch_fallbacks_total", "Write batches that failed and were retried row by row.", ("table",)
+))
+db_read_sessions_total = registry.register(Counter(
+  "db_read_sessions_total", "Sessions opened by read requests, by the engine they started on.", ("target",)
+))
+db_replica_fallbacks_total = registry.register(Counter(
+  "db_replica_fallbacks_total", "Read sessions moved from a failed replica to the primary.", ("replica",)
+))
+
+def _statement_operation(statement: str) -> str:
+  # First keyword only (SELECT, INSERT, ...) to keep the label cardinality bounded
+  return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  context._metrics_start_time = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  start_time = getattr(context, "_metrics_start_time", None)
+  if start_time is None:
+    return
+  labels = (_statement_operation(statement),)
+  db_statements_total.inc(labels)
+  db_statement_duration_seconds.observe(labels, time.perf_counter() - start_time)
+
+def instrument_engine(engine) -> None:
+  """
+  Record count and duration of every statement executed through an engine.
+
+  Args:
+      engine: Engine (sync or async) to instrument
+  """
+  sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+  if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
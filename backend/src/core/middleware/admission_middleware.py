@@ -0,0 +1,72 @@
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.core.admission import ConcurrencyLimiter, admission_limiters
+from src.core.config import settings
+from src.core.metrics import http_admission_shed_total
+from src.core.replicas import READ_METHODS
+
+# Operational endpoints, never limited so probes and scrapes work under overload
+UNLIMITED_PREFIXES = ("/api/system",)
+# Long streamed downloads, limited apart so they never hold the slots of the short reads
+EXPORT_PREFIX = "/api/projects/export"
+
+def route_group(scope: Scope) -> Optional[str]:
+  """
+  Route group a request is admitted under.
+
+  Args:
+      scope: ASGI scope of the request
+
+  Returns:
+      "exports" for the project export, which keeps its slot while the whole
+      file streams, "tasks" for the task routes, "reads" and "writes" for the
+      other API routes, or None for requests that are not limited
+  """
+  path = scope["path"]
+  if not path.startswith("/api/") or path.startswith(UNLIMITED_PREFIXES) or scope["method"] == "OPTIONS":
+    return None
+  if path.startswith(EXPORT_PREFIX):
+    return "exports"
+  if path.startswith("/api/tasks"):
+    return "tasks"
+  if scope["method"] in READ_METHODS:
+    return "reads"
+  return "writes"
+
+class AdmissionMiddleware:
+  """
+  Pure ASGI middleware limiting the API requests served at once, per route group.
+
+  Each request takes a slot of its group's ConcurrencyLimiter before reaching
+  the routes (and their pooled DB session) and keeps it until its response
+  is sent. When the group's queue is full, or the request waited
+  ADMISSION_QUEUE_TIMEOUT_SECONDS, it is answered right away with 503 and
+  Retry-After instead of piling up on the connection pool.
+  """
+  def __init__(self, app: ASGIApp, limiters: Optional[Dict[str, ConcurrencyLimiter]] = None):
+    self.app = app
+    self.limiters = admission_limiters if limiters is None else limiters
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send):
+    limiter = self.limiters.get(route_group(scope)) if scope["type"] == "http" else None
+    if limiter is None:
+      await self.app(scope, receive, send)
+      return
+
+    refused = await limiter.acquire()
+    if refused is not None:
+      http_admission_shed_total.inc((limiter.name, refused))
+      response = JSONResponse(
+        status_code=503,
+        content={"detail": "Server is overloaded, retry later"},
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+      )
+      await response(scope, receive, send)
+      return
+
+    try:
+      await self.app(scope, receive, send)
+    finally:
+      limiter.release()
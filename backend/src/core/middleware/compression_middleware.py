@@ -0,0 +1,261 @@
+import time
+import zlib
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.core.config import settings
+from src.core.metrics import (
+  http_compression_cpu_seconds_total,
+  http_compression_input_bytes_total,
+  http_compression_output_bytes_total,
+  http_compression_responses_total
+)
+from src.helpers.http_cache import encoded_etag, matching_request_etag
+
+try:
+  import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+  zstandard = None
+
+try:
+  import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+  brotli = None
+
+COMPRESSIBLE_TYPES = {
+  "application/json",
+  "application/x-ndjson",
+  "application/javascript",
+  "application/xml",
+  "image/svg+xml",
+}
+
+# Chunks this large are compressed in a worker thread (zlib, zstandard and
+# brotli release the GIL) instead of blocking the event loop
+OFFLOAD_SIZE = 256 * 1024
+
+class _GzipEncoder:
+  def __init__(self, level: int):
+    self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+  def compress(self, chunk: bytes, final: bool) -> bytes:
+    data = self._compressor.compress(chunk)
+    return data + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class _ZstdEncoder:
+  def __init__(self, level: int):
+    self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+  def compress(self, chunk: bytes, final: bool) -> bytes:
+    data = self._compressor.compress(chunk)
+    return data + self._compressor.flush(
+      zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+    )
+
+class _BrotliEncoder:
+  def __init__(self, quality: int):
+    self._compressor = brotli.Compressor(quality=quality)
+
+  def compress(self, chunk: bytes, final: bool) -> bytes:
+    data = self._compressor.process(chunk)
+    return data + (self._compressor.finish() if final else self._compressor.flush())
+
+def available_encoders() -> Dict[str, Callable]:
+  encoders = {"gzip": lambda: _GzipEncoder(settings.COMPRESSION_GZIP_LEVEL)}
+  if zstandard is not None:
+    encoders["zstd"] = lambda: _ZstdEncoder(settings.COMPRESSION_ZSTD_LEVEL)
+  if brotli is not None:
+    encoders["br"] = lambda: _BrotliEncoder(settings.COMPRESSION_BROTLI_QUALITY)
+  return encoders
+
+def negotiate_encoding(accept_encoding: str, supported: Iterable[str]) -> Optional[str]:
+  """
+  Pick the content coding of a response from the request's Accept-Encoding.
+
+  Args:
+      accept_encoding: Accept-Encoding header value, e.g. "gzip, br;q=0.8"
+      supported: Codings the server can produce, most preferred first
+
+  Returns:
+      The coding with the highest q-value, the server's preference breaking
+      ties; None when the client accepts none of them (q=0 excludes a coding,
+      "*" covers the ones not listed)
+  """
+  weights = {}
+  for item in accept_encoding.split(","):
+    coding, _, params = item.strip().partition(";")
+    coding = coding.strip().lower()
+    if not coding:
+      continue
+    weight = 1.0
+    for param in params.split(";"):
+      name, _, value = param.strip().partition("=")
+      if name.strip().lower() == "q":
+        try:
+          weight = float(value)
+        except ValueError:
+          weight = 0.0
+    weights[coding] = weight
+
+  best, best_weight = None, 0.0
+  for coding in supported:
+    weight = weights.get(coding, weights.get("*", 0.0))
+    if weight > best_weight:
+      best, best_weight = coding, weight
+  return best
+
+def is_compressible(headers: Headers) -> bool:
+  media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+  return (
+    media_type.startswith("text/")
+    or media_type in COMPRESSIBLE_TYPES
+    or media_type.endswith(("+json", "+xml"))
+  )
+
+class CompressionMiddleware:
+  """
+  Pure ASGI middleware compressing response bodies with gzip, zstd or brotli.
+
+  The coding is negotiated from Accept-Encoding among COMPRESSION_ENCODINGS
+  (zstd and br only when their packages are installed). Bodies smaller than
+  COMPRESSION_MINIMUM_SIZE, non-text content types, responses that are
+  already encoded or marked no-transform are sent as they are. Streaming
+  responses are compressed chunk by chunk, each chunk flushed so clients
+  receive it without waiting for the end of the stream.
+
+  The CPU time spent and the bytes in and out are recorded per coding in the
+  http_compression_* metrics.
+  """
+  def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+    self.app = app
+    self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+    encoders = available_encoders()
+    self.encoders = {name: encoders[name] for name in settings.COMPRESSION_ENCODINGS if name in encoders}
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send):
+    if scope["type"] != "http" or scope["method"] == "HEAD" or not self.encoders:
+      await self.app(scope, receive, send)
+      return
+
+    request_headers = Headers(scope=scope)
+    encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), self.encoders)
+    responder = _CompressionResponder(
+      send, encoding, self.encoders.get(encoding), self.minimum_size, request_headers.get("if-none-match")
+    )
+    await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+  def __init__(self, send: Send, encoding: Optional[str], encoder_factory, minimum_size: int, if_none_match: Optional[str]):
+    self._send = send
+    self.encoding = encoding
+    self.encoder_factory = encoder_factory
+    self.minimum_size = minimum_size
+    self.if_none_match = if_none_match
+    self.start_message: Optional[Message] = None
+    self.encoder = None
+    self.passthrough = False
+
+  async def send(self, message: Message):
+    if message["type"] == "http.response.start":
+      self._on_start(message)
+      if self.passthrough:
+        await self._send(message)
+      return
+
+    if message["type"] != "http.response.body" or self.passthrough:
+      await self._send(message)
+      return
+
+    body = message.get("body", b"")
+    more_body = message.get("more_body", False)
+
+    if self.encoder is None:
+      # First body message, it decides between a single and a streamed body
+      headers = MutableHeaders(scope=self.start_message)
+      if not more_body and len(body) < self.minimum_size:
+        self.passthrough = True
+        await self._send(self.start_message)
+        await self._send(message)
+        return
+
+      self.encoder = self.encoder_factory()
+      headers["Content-Encoding"] = self.encoding
+      if "etag" in headers:
+        headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+      if more_body:
+        del headers["content-length"]
+        await self._send(self.start_message)
+        await self._send_chunk(body, final=False)
+      else:
+        data = await self._compress(body, final=True)
+        headers["Content-Length"] = str(len(data))
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": data})
+      return
+
+    await self._send_chunk(body, final=not more_body)
+
+  def _on_start(self, message: Message):
+    headers = MutableHeaders(scope=message)
+    status_code = message["status"]
+
+    if status_code == 304:
+      # A 304 repeats the validator of the representation the client holds:
+      # its own tag, with the coding suffix when the body it got was encoded
+      # (whether it was depends on the body size, unknown here)
+      headers.add_vary_header("Accept-Encoding")
+      if "etag" in headers and self.if_none_match is not None:
+        client_etag = matching_request_etag(self.if_none_match, headers["etag"])
+        if client_etag is not None:
+          headers["ETag"] = client_etag
+      self.passthrough = True
+      return
+
+    if status_code < 200 or status_code == 204:
+      self.passthrough = True
+      return
+
+    if "content-encoding" in headers or not is_compressible(headers):
+      self.passthrough = True
+      return
+
+    # Caches must key the stored body on the coding the client accepted
+    headers.add_vary_header("Accept-Encoding")
+
+    content_length = headers.get("content-length")
+    if (
+      self.encoding is None
+      or "no-transform" in headers.get("cache-control", "").lower()
+      or (content_length is not None and content_length.isdigit() and int(content_length) < self.minimum_size)
+    ):
+      self.passthrough = True
+      return
+
+    self.start_message = message
+
+  async def _send_chunk(self, body: bytes, final: bool):
+    if not body and not final:
+      return
+    data = await self._compress(body, final)
+    await self._send({"type": "http.response.body", "body": data, "more_body": not final})
+
+  async def _compress(self, body: bytes, final: bool) -> bytes:
+    if len(body) >= OFFLOAD_SIZE:
+      data, cpu_seconds = await anyio.to_thread.run_sync(self._timed_compress, body, final)
+    else:
+      data, cpu_seconds = self._timed_compress(body, final)
+
+    labels = (self.encoding,)
+    http_compression_cpu_seconds_total.inc(labels, cpu_seconds)
+    http_compression_input_bytes_total.inc(labels, len(body))
+    http_compression_output_bytes_total.inc(labels, len(data))
+    if final:
+      http_compression_responses_total.inc(labels)
+    return data
+
+  def _timed_compress(self, body: bytes, final: bool) -> Tuple[bytes, float]:
+    start = time.thread_time()
+    data = self.encoder.compress(body, final)
+    return data, time.thread_time() - start
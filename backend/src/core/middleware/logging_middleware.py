@@ -1,45 +1,79 @@
+import logging
 import time
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from src.core.config import settings
-from src.core.logging import logger, LogColors
+from src.core.logging import request_logger, LogColors
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-  async def dispatch(self, request: Request, call_next):
-    if not settings.ENABLE_REQUEST_LOGGING:
-      return await call_next(request)
+class LoggingMiddleware:
+  """
+  Pure ASGI middleware that logs the start and completion of every HTTP request.
+
+  Unlike BaseHTTPMiddleware it does not wrap the request in an extra task or
+  re-stream the response body, so streaming responses pass through untouched.
+  """
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send):
+    if (
+      scope["type"] != "http"
+      or not settings.ENABLE_REQUEST_LOGGING
+      or not request_logger.isEnabledFor(logging.INFO)
+    ):
+      await self.app(scope, receive, send)
+      return
     
     # Start timer
-    start_time = time.time()
+    start_time = time.perf_counter()
+    method = scope["method"]
+    path = scope["path"]
+    headers = Headers(scope=scope)
+    client = scope.get("client")
 
     # Log request start
-    logger.info(
-      f"Request Started: {LogColors.YELLOW}{request.method} {request.url.path}{LogColors.RESET}",
+    request_logger.info(
+      "Request Started: %s %s",
+      method,
+      path,
       extra={
-        "method": request.method,
-        "path": request.url.path,
-        "query_params": str(request.query_params),
-        "client_ip": request.client.host if request.client else None,
-        "user_agent": request.headers.get("user-agent")
+        "color": LogColors.YELLOW,
+        "method": method,
+        "path": path,
+        "query_params": scope.get("query_string", b"").decode("latin-1"),
+        "client_ip": client[0] if client else None,
+        "user_agent": headers.get("user-agent")
       }
     )
 
+    response_start = {}
+
+    async def send_wrapper(message: Message):
+      if message["type"] == "http.response.start":
+        response_start.update(message)
+      await send(message)
+
     # Process the request
-    response = await call_next(request)
+    await self.app(scope, receive, send_wrapper)
 
     # Calculate response time
-    response_time = (time.time() - start_time) * 1000
+    response_time = (time.perf_counter() - start_time) * 1000
+    status_code = response_start.get("status")
+    content_length = Headers(raw=response_start.get("headers", [])).get("content-length")
 
     # Log response completion
-    logger.info(
-      f"Request Completed: {LogColors.YELLOW}{request.method} {request.url.path}{LogColors.RESET} - {LogColors.GREEN}{response.status_code}{LogColors.RESET} in {LogColors.YELLOW}{response_time:.2f}ms{LogColors.RESET}",
+    request_logger.info(
+      "Request Completed: %s %s - %s in %.2fms",
+      method,
+      path,
+      status_code,
+      response_time,
       extra={
-        "method": request.method,
-        "path": request.url.path,
-        "status_code": response.status_code,
+        "color": LogColors.GREEN,
+        "method": method,
+        "path": path,
+        "status_code": status_code,
         "response_time": response_time,
-        "content_length": response.headers.get("content-length")
+        "content_length": content_length
       }
     )
-
-    return response 
\ No newline at end of file
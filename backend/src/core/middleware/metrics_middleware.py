@@ -0,0 +1,43 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.core.metrics import (
+  http_requests_total,
+  http_request_duration_seconds,
+  http_requests_in_progress
+)
+
+class MetricsMiddleware:
+  """
+  Pure ASGI middleware recording request count, latency and in-flight requests.
+
+  Requests are labeled with the route template (e.g. /api/projects/{project_id})
+  resolved by the router rather than the raw path, so label cardinality stays
+  bounded; requests that matched no route are labeled "unmatched".
+  """
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    method = scope["method"]
+    status_code = 500
+    start_time = time.perf_counter()
+    http_requests_in_progress.inc((method,))
+
+    async def send_wrapper(message: Message):
+      nonlocal status_code
+      if message["type"] == "http.response.start":
+        status_code = message["status"]
+      await send(message)
+
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      route = scope.get("route")
+      labels = (method, getattr(route, "path", "unmatched"), str(status_code))
+      http_requests_total.inc(labels)
+      http_request_duration_seconds.observe(labels, time.perf_counter() - start_time)
+      http_requests_in_progress.dec((method,))
@@ -0,0 +1,77 @@
+import hmac
+import random
+import uuid
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.core.config import settings
+from src.core.logging import logger
+from src.core.profiler import RequestProfile, current_profile, request_id_var
+
+def profile_requested(value: str) -> bool:
+  """
+  Check the PROFILER_HEADER value of a request.
+
+  Args:
+      value: Header value, empty when absent
+
+  Returns:
+      bool: True for the PROFILER_HEADER_SECRET when one is set, otherwise for 1, true or yes
+  """
+  if settings.PROFILER_HEADER_SECRET:
+    return hmac.compare_digest(value.encode(), settings.PROFILER_HEADER_SECRET.encode())
+  return value.lower() in ("1", "true", "yes")
+
+class ProfilerMiddleware:
+  """
+  Pure ASGI middleware assigning a request ID and profiling the SQL of selected requests.
+
+  A request is profiled when it sends the PROFILER_HEADER header (if
+  PROFILER_ALLOW_HEADER is on, with PROFILER_HEADER_SECRET as its value when
+  set) or is picked by PROFILER_SAMPLE_RATE. Responses to the header carry a
+  Server-Timing header with the db/app split, sampled requests are only
+  logged. A warning is logged when a statement shape repeats more than
+  PROFILER_REPEAT_THRESHOLD times in the request.
+  """
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    headers = Headers(scope=scope)
+    request_id = headers.get("x-request-id") or uuid.uuid4().hex
+    request_id_token = request_id_var.set(request_id)
+
+    requested = settings.PROFILER_ALLOW_HEADER and profile_requested(headers.get(settings.PROFILER_HEADER, ""))
+    sampled = settings.PROFILER_SAMPLE_RATE > 0 and random.random() < settings.PROFILER_SAMPLE_RATE
+    profile = RequestProfile(request_id) if requested or sampled else None
+    profile_token = current_profile.set(profile)
+
+    async def send_wrapper(message: Message):
+      if message["type"] == "http.response.start":
+        response_headers = MutableHeaders(scope=message)
+        response_headers.append("X-Request-ID", request_id)
+        if requested:
+          response_headers.append("Server-Timing", profile.server_timing())
+      await send(message)
+
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      current_profile.reset(profile_token)
+      request_id_var.reset(request_id_token)
+
+    if profile is not None:
+      for shape, count, operations in profile.repeated_statements(settings.PROFILER_REPEAT_THRESHOLD):
+        logger.warning(
+          "Possible N+1 query: statement repeated %d times in %s %s (request %s) from %s: %s",
+          count,
+          scope["method"],
+          scope["path"],
+          request_id,
+          ", ".join(operations),
+          shape,
+          extra={"request_id": request_id, "statement_count": count, "operations": operations}
+        )
@@ -0,0 +1,35 @@
+import math
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.core.config import settings
+from src.core.replicas import READ_METHODS
+
+class ReadYourWritesMiddleware:
+  """
+  Pure ASGI middleware pinning a client's reads to the primary after it writes.
+
+  Every successful write response sets the DB_READ_YOUR_WRITES_COOKIE cookie
+  to the time until which the client's reads skip the replicas, so a client
+  never reads a replica that has not yet replayed its own write. Only
+  registered when read replicas are configured.
+  """
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send):
+    if scope["type"] != "http" or scope["method"] in READ_METHODS or scope["method"] == "OPTIONS":
+      await self.app(scope, receive, send)
+      return
+
+    async def send_wrapper(message: Message):
+      if message["type"] == "http.response.start" and message["status"] < 400:
+        window = settings.DB_READ_YOUR_WRITES_SECONDS
+        until = time.time() + window
+        MutableHeaders(scope=message).append(
+          "Set-Cookie",
+          f"{settings.DB_READ_YOUR_WRITES_COOKIE}={until:.3f}; Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=Lax"
+        )
+      await send(message)
+
+    await self.app(scope, receive, send_wrapper)
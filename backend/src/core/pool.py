@@ -0,0 +1,76 @@
+# Connection pool instrumentation
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+class PoolWaitStats:
+  """
+  Time spent by checkouts waiting for a pooled connection.
+  
+  Attributes:
+      checkouts: Number of connections handed out
+      total_wait: Sum of the waits, in seconds
+      max_wait: Longest single wait, in seconds
+  """
+  def __init__(self):
+    self.checkouts = 0
+    self.total_wait = 0.0
+    self.max_wait = 0.0
+
+  def record(self, wait: float) -> None:
+    self.checkouts += 1
+    self.total_wait += wait
+    if wait > self.max_wait:
+      self.max_wait = wait
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+  """AsyncAdaptedQueuePool that records how long each checkout waited for a connection"""
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.wait_stats = PoolWaitStats()
+
+  def _do_get(self):
+    start = time.perf_counter()
+    try:
+      return super()._do_get()
+    finally:
+      self.wait_stats.record(time.perf_counter() - start)
+
+  def recreate(self):
+    # Keep the counters when the pool is recreated (e.g. after dispose)
+    pool = super().recreate()
+    pool.wait_stats = self.wait_stats
+    return pool
+
+def get_pool_stats(pool) -> dict:
+  """
+  Snapshot of a pool's usage, used to size it against the number of workers.
+  
+  Args:
+      pool: The engine's pool (engine.pool)
+      
+  Returns:
+      dict: Checked out, idle and overflow connections plus checkout wait times
+  """
+  stats = {"pool_class": type(pool).__name__}
+
+  if isinstance(pool, QueuePool):
+    stats.update({
+      "size": pool.size(),
+      "max_overflow": pool._max_overflow,
+      "checked_out": pool.checkedout(),
+      "idle": pool.checkedin(),
+      # Negative while the pool has not opened all of its pool_size connections yet
+      "overflow": pool.overflow(),
+      "timeout": pool.timeout()
+    })
+
+  wait_stats = getattr(pool, "wait_stats", None)
+  if wait_stats is not None:
+    stats.update({
+      "checkouts": wait_stats.checkouts,
+      "wait_seconds_total": round(wait_stats.total_wait, 6),
+      "wait_seconds_avg": round(wait_stats.total_wait / wait_stats.checkouts, 6) if wait_stats.checkouts else 0.0,
+      "wait_seconds_max": round(wait_stats.max_wait, 6)
+    })
+  return stats
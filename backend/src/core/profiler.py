@@ -0,0 +1,105 @@
+# Per-request SQL profiling
+import functools
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Set by ProfilerMiddleware for every request
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# Set only for the requests being profiled
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+# Controller method or dependency currently running, set by @profiled
+current_operation: ContextVar[Optional[str]] = ContextVar("current_operation", default=None)
+
+# Lists of bound parameters, e.g. IN (?, ?, ?) or VALUES ($1, $2), whose length varies per call
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|\$\d+|:\w+|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|\$\d+|:\w+|%\(\w+\)s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+  """Normalize a SQL statement so calls that differ only in the number of bound values compare equal"""
+  return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+class RequestProfile:
+  """
+  SQL statements issued while serving one request.
+
+  Attributes:
+      request_id: ID of the profiled request
+      started_at: perf_counter() value when the request started
+      statements: (statement, duration in seconds, issuing operation) per statement
+  """
+  def __init__(self, request_id: str):
+    self.request_id = request_id
+    self.started_at = time.perf_counter()
+    self.statements: List[Tuple[str, float, str]] = []
+
+  @property
+  def db_time(self) -> float:
+    return sum(duration for _, duration, _ in self.statements)
+
+  def repeated_statements(self, threshold: int) -> List[Tuple[str, int, List[str]]]:
+    """
+    Statement shapes issued more than `threshold` times, the usual sign of an N+1 pattern.
+
+    Returns:
+        List of (shape, count, operations that issued it)
+    """
+    counts = Counter(statement_shape(statement) for statement, _, _ in self.statements)
+    repeated = []
+    for shape, count in counts.items():
+      if count > threshold:
+        operations = sorted({operation for statement, _, operation in self.statements if statement_shape(statement) == shape})
+        repeated.append((shape, count, operations))
+    return repeated
+
+  def server_timing(self) -> str:
+    """Server-Timing header value splitting the elapsed time between the database and the app"""
+    total_ms = (time.perf_counter() - self.started_at) * 1000
+    db_ms = self.db_time * 1000
+    return (
+      f'db;dur={db_ms:.2f};desc="{len(self.statements)} queries", '
+      f"app;dur={max(total_ms - db_ms, 0):.2f}, "
+      f"total;dur={total_ms:.2f}"
+    )
+
+def profiled(func):
+  """Record the decorated coroutine function as the operation issuing the statements run inside it"""
+  operation = func.__qualname__
+
+  @functools.wraps(func)
+  async def wrapper(*args, **kwargs):
+    token = current_operation.set(operation)
+    try:
+      return await func(*args, **kwargs)
+    finally:
+      current_operation.reset(token)
+
+  return wrapper
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  if current_profile.get() is not None:
+    context._profile_start_time = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  profile = current_profile.get()
+  start_time = getattr(context, "_profile_start_time", None)
+  if profile is None or start_time is None:
+    return
+  profile.statements.append((statement, time.perf_counter() - start_time, current_operation.get() or "unknown"))
+
+def profile_engine(engine) -> None:
+  """
+  Record the statements of profiled requests executed through an engine.
+
+  Args:
+      engine: Engine (sync or async) to profile
+  """
+  sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+  if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,131 @@
+# Read replica routing
+import itertools
+import time
+from typing import List, Optional, Sequence
+
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
+
+from src.core.config import settings
+from src.core.logging import logger
+from src.core.metrics import db_replica_fallbacks_total
+
+# Requests served by a replica, every other method may write
+READ_METHODS = ("GET", "HEAD")
+
+# Errors of a replica that the primary may not have (down, unreachable, lagging schema)
+REPLICA_ERRORS = (OperationalError, InterfaceError, OSError)
+
+class Replica:
+  """
+  A read replica engine and its routing state.
+
+  Attributes:
+      name: Label of the replica in logs and metrics (replica0, replica1, ...)
+      engine: Async engine connected to the replica
+      in_use: Number of sessions currently open on the replica
+      down_until: Monotonic time before which the replica is skipped after an error
+  """
+  def __init__(self, name: str, engine: AsyncEngine):
+    self.name = name
+    self.engine = engine
+    self.in_use = 0
+    self.down_until = 0.0
+
+class ReplicaSet:
+  """
+  The read replicas GET requests are spread over.
+
+  Only touched from the event loop thread, like the caches and metrics, so
+  the routing state needs no locking.
+
+  Attributes:
+      replicas: Configured replicas, in DATABASE_REPLICA_URLS order
+      strategy: round_robin, or least_busy to pick the replica with the fewest open sessions
+      retry_seconds: How long a failed replica is skipped
+  """
+  def __init__(self, engines: Sequence[AsyncEngine], strategy: str = "round_robin", retry_seconds: float = 30.0):
+    self.replicas: List[Replica] = [Replica(f"replica{index}", engine) for index, engine in enumerate(engines)]
+    self.strategy = strategy
+    self.retry_seconds = retry_seconds
+    self._turns = itertools.count()
+
+  def __bool__(self) -> bool:
+    return bool(self.replicas)
+
+  def choose(self) -> Optional[Replica]:
+    """
+    Pick the replica of a new read session.
+
+    Returns:
+        A healthy replica, or None when they are all marked down
+    """
+    now = time.monotonic()
+    available = [replica for replica in self.replicas if replica.down_until <= now]
+    if not available:
+      return None
+    if self.strategy == "least_busy":
+      return min(available, key=lambda replica: replica.in_use)
+    return available[next(self._turns) % len(available)]
+
+  def mark_down(self, replica: Replica, error: BaseException) -> None:
+    replica.down_until = time.monotonic() + self.retry_seconds
+    db_replica_fallbacks_total.inc((replica.name,))
+    logger.warning(
+      "Read replica %s failed, falling back to the primary for %.0fs: %s",
+      replica.name,
+      self.retry_seconds,
+      error,
+      extra={"replica": replica.name}
+    )
+
+  async def dispose(self) -> None:
+    for replica in self.replicas:
+      await replica.engine.dispose()
+
+class FallbackSession(Session):
+  """
+  Session of a read request running on a replica.
+
+  When a statement fails with a replica error, the replica is marked down
+  and the statement is run again on the primary, where the rest of the
+  session then stays. Retrying is safe because these sessions only read.
+  The session is closed rather than rolled back before switching, so the
+  objects already loaded keep their state instead of being expired.
+
+  session.info holds the "replica" in use (None once on the primary), the
+  "replica_set" it belongs to and the "primary" engine to fall back to.
+  """
+  def execute(self, statement, *args, **kwargs):
+    replica = self.info.get("replica")
+    try:
+      return super().execute(statement, *args, **kwargs)
+    except REPLICA_ERRORS as e:
+      if replica is None:
+        raise
+      self.close()
+      self.bind = self.info["primary"]
+      self.info["replica"] = None
+      self.info["replica_set"].mark_down(replica, e)
+      return super().execute(statement, *args, **kwargs)
+
+def uses_replica(session) -> bool:
+  """Whether a session reads from a replica, whose rows may lag behind the primary"""
+  return session.info.get("replica") is not None
+
+def pinned_to_primary(connection: HTTPConnection) -> bool:
+  """
+  Whether the client wrote recently and must read its own writes.
+
+  ReadYourWritesMiddleware sets the cookie after every successful write, its
+  value is the time until which reads stay on the primary.
+  """
+  value = connection.cookies.get(settings.DB_READ_YOUR_WRITES_COOKIE)
+  if value is None:
+    return False
+  try:
+    return float(value) > time.time()
+  except ValueError:
+    return False
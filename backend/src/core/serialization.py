@@ -0,0 +1,126 @@
+# Response serialization
+from typing import Generic, List, Optional, Type, TypeVar
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import NotRequired, TypedDict
+
+try:
+  import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+  orjson = None
+
+if orjson is not None:
+  from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+else:
+  DefaultJSONResponse = JSONResponse
+
+T = TypeVar("T")
+
+# Shapes of the response bodies, serialized with the row model itself
+class _ItemEnvelope(TypedDict, Generic[T]):
+  message: NotRequired[str]
+  data: T
+  status: str
+
+class _PageEnvelope(TypedDict, Generic[T]):
+  data: List[T]
+  next_cursor: Optional[str]
+  status: str
+
+class ResponseSerializer:
+  """
+  Serializes responses holding rows of a SQLModel straight to JSON bytes.
+
+  The rows are dumped by the pydantic-core serializer of their own model,
+  restricted to the fields of a response schema, in a single pass. FastAPI's
+  response_model handling would validate them into the schema first and then
+  encode the result again; returning the rendered Response skips both, the
+  schema is still declared as response_model for the docs.
+
+  Each method takes the sparse fieldset of the request, if any, to restrict
+  the rows further; the rows may then be partially loaded (load_only), only
+  the requested attributes are read.
+
+  Attributes:
+      model: Model of the rows
+      fields: Names of the schema fields included for each row
+  """
+  def __init__(self, model: Type[BaseModel], schema: Type[BaseModel]):
+    self.model = model
+    self.fields = set(schema.model_fields)
+    self._one = TypeAdapter(model)
+    self._item = TypeAdapter(_ItemEnvelope[model])
+    self._page = TypeAdapter(_PageEnvelope[model])
+
+  def one(self, row, status_code: int = 200, headers: Optional[dict] = None, fields: Optional[List[str]] = None) -> Response:
+    """A bare row"""
+    return self._response(self._one.dump_json(row, include=self._fields(fields)), status_code, headers)
+
+  def item(self, envelope: dict, status_code: int = 200, headers: Optional[dict] = None, fields: Optional[List[str]] = None) -> Response:
+    """A {"message", "data": row, "status"} envelope"""
+    include = {key: True for key in envelope}
+    include["data"] = self._fields(fields)
+    return self._response(self._item.dump_json(envelope, include=include), status_code, headers)
+
+  def page(self, envelope: dict, status_code: int = 200, headers: Optional[dict] = None, fields: Optional[List[str]] = None) -> Response:
+    """A {"data": [rows], "next_cursor", "status"} envelope"""
+    include = {key: True for key in envelope}
+    include["data"] = {"__all__": self._fields(fields)}
+    return self._response(self._page.dump_json(envelope, include=include), status_code, headers)
+
+  def _fields(self, fields: Optional[List[str]]) -> set:
+    return self.fields if fields is None else self.fields.intersection(fields)
+
+  @staticmethod
+  def _response(body: bytes, status_code: int, headers: Optional[dict]) -> Response:
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+class EmbeddingSerializer(ResponseSerializer):
+  """
+  Serializes rows of a ResponseSerializer together with related rows.
+
+  The related rows are read from a relationship of each row, which must have
+  been populated beforehand (e.g. with set_committed_value), and are dumped by
+  the related serializer, still in the same single pass.
+
+  Attributes:
+      relationship: Name of the relationship embedded in each row
+      related: Serializer of the embedded rows
+  """
+  def __init__(self, parent: ResponseSerializer, relationship: str, related: ResponseSerializer):
+    self.model = parent.model
+    self.fields = parent.fields
+    self.relationship = relationship
+    self.related = related
+
+    # Rows are rendered from dicts holding the selected columns and the related rows
+    row = TypedDict(f"_{self.model.__name__}With{relationship.title()}", {
+      **{name: self.model.model_fields[name].annotation for name in self.fields},
+      relationship: List[related.model]
+    }, total=False)
+    self._one = TypeAdapter(row)
+    self._item = TypeAdapter(_ItemEnvelope[row])
+    self._page = TypeAdapter(_PageEnvelope[row])
+
+  def one(self, row, status_code: int = 200, headers: Optional[dict] = None, fields: Optional[List[str]] = None) -> Response:
+    return super().one(self._embed(row, fields), status_code, headers, fields)
+
+  def item(self, envelope: dict, status_code: int = 200, headers: Optional[dict] = None, fields: Optional[List[str]] = None) -> Response:
+    return super().item({**envelope, "data": self._embed(envelope["data"], fields)}, status_code, headers, fields)
+
+  def page(self, envelope: dict, status_code: int = 200, headers: Optional[dict] = None, fields: Optional[List[str]] = None) -> Response:
+    rows = [self._embed(row, fields) for row in envelope["data"]]
+    return super().page({**envelope, "data": rows}, status_code, headers, fields)
+
+  def _fields(self, fields: Optional[List[str]]) -> dict:
+    include = dict.fromkeys(super()._fields(fields), True)
+    include[self.relationship] = {"__all__": self.related.fields}
+    return include
+
+  def _embed(self, row, fields: Optional[List[str]]) -> dict:
+    names = super()._fields(fields)
+    embedded = {name: getattr(row, name) for name in self.model.model_fields if name in names}
+    embedded[self.relationship] = getattr(row, self.relationship)
+    return embedded
@@ -0,0 +1,2 @@
+class InvalidFieldsError(Exception):
+  pass
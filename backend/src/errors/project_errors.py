@@ -8,4 +8,10 @@ class DuplicateProjectNameError(Exception):
   pass 
 
 class NoFieldsToUpdateError(Exception):
-  pass 
\ No newline at end of file
+  pass
+
+class ProjectVersionMismatchError(Exception):
+  def __init__(self, message: str, etag: str):
+    super().__init__(message)
+    # ETag of the stored version, sent back with the 412
+    self.etag = etag
@@ -0,0 +1,5 @@
+class EmptySearchQueryError(Exception):
+  pass 
+
+class SearchNotSupportedError(Exception):
+  pass
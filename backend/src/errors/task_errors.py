@@ -0,0 +1,5 @@
+class EmptyTaskBatchError(Exception):
+  pass 
+
+class TaskBatchTooLargeError(Exception):
+  pass 
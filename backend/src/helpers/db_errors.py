@@ -0,0 +1,39 @@
+import traceback
+
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+def is_unique_violation(error: IntegrityError, column: str) -> bool:
+  """
+  Check whether an IntegrityError was raised by the unique index on a column.
+
+  The driver messages differ (PostgreSQL names the index, SQLite names the
+  column), but both mention the column and the word "unique".
+  
+  Args:
+      error: The error raised by the flush or execute
+      column: Name of the column the unique index covers
+      
+  Returns:
+      bool: True if the error is a duplicate value on that column
+  """
+  message = str(error.orig).lower()
+  return "unique" in message and column in message
+
+def release_failed_cursor(error: DBAPIError) -> None:
+  """
+  Free the driver cursor of a failed statement before rolling back.
+
+  The aiosqlite adapter does not close the cursor when a statement fails, it
+  stays referenced from the frames of the error's traceback, which are part
+  of reference cycles. Left to the garbage collector, it is finalized on the
+  event loop thread whenever a collection runs, resetting its statement
+  under the connection's lock: if another request is by then running a
+  statement on that connection that waits for the database lock, the whole
+  loop blocks until SQLite's busy timeout. Called in the except block, while
+  the session still holds the connection, the cursor is freed right away.
+  Harmless for the other drivers.
+
+  Args:
+      error: The error caught from the flush or execute
+  """
+  traceback.clear_frames(error.__traceback__)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, List, Optional
+
+from fastapi import Request, Response, status
+
+def entity_etag(entity_id: int, version: int) -> str:
+  """
+  Strong ETag of a single row.
+
+  Built from the row's version column, which every UPDATE increments, so it
+  changes on every write even when updated_at (second precision) does not.
+  """
+  return f'"{entity_id}-{version}"'
+
+def collection_etag(fingerprint: Any) -> str:
+  """
+  Strong ETag of a list response.
+
+  Args:
+      fingerprint: JSON-serializable value that changes whenever the body does,
+          e.g. the query parameters and the (id, version) of every row
+  """
+  raw = json.dumps(fingerprint, separators=(",", ":"), default=str).encode("utf-8")
+  return f'"{hashlib.sha1(raw).hexdigest()}"'
+
+def http_date(value: datetime) -> str:
+  """Format a timestamp as an HTTP-date, naive values are taken as local time like the stored ones"""
+  return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+# Suffixes CompressionMiddleware appends to the ETags of encoded responses
+ENCODED_ETAG_SUFFIXES = ("-gzip", "-br", "-zstd")
+
+def encoded_etag(etag: str, encoding: str) -> str:
+  """
+  ETag of the content-encoded form of a response.
+
+  Each encoding is a different representation, so it gets its own strong
+  validator; the suffix is dropped again when request validators are compared.
+  """
+  if etag.endswith('"'):
+    return f'{etag[:-1]}-{encoding}"'
+  return etag
+
+def _strip_encoding(tag: str) -> str:
+  for suffix in ENCODED_ETAG_SUFFIXES:
+    if tag.endswith(f'{suffix}"'):
+      return f'{tag[:-len(suffix) - 1]}"'
+  return tag
+
+def _parse_etags(header: str) -> List[str]:
+  return [_strip_encoding(tag.strip()) for tag in header.split(",") if tag.strip()]
+
+def _strip_weak(tag: str) -> str:
+  return tag[2:] if tag.startswith("W/") else tag
+
+def matching_request_etag(if_none_match: str, etag: str) -> Optional[str]:
+  """
+  Tag of an If-None-Match header that matched a resource's ETag, as the client stored it.
+
+  A 304 must repeat the validator of the response the client holds, which
+  carries the suffix of its content coding when that response was encoded.
+
+  Args:
+      if_none_match: If-None-Match header value
+      etag: ETag of the resource, without coding suffix
+
+  Returns:
+      The client's tag (made strong), None when no tag matched or on "*"
+  """
+  for tag in if_none_match.split(","):
+    tag = _strip_weak(tag.strip())
+    if _strip_encoding(tag) == _strip_weak(etag):
+      return tag
+  return None
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+  """
+  Evaluate If-None-Match, or If-Modified-Since when it is absent (RFC 9110 13.2.2).
+
+  Args:
+      request: Incoming GET request
+      etag: Current ETag of the resource
+      last_modified: Current modification time of the resource
+
+  Returns:
+      bool: True if the client's copy is still current and a 304 can be sent
+  """
+  if_none_match = request.headers.get("if-none-match")
+  if if_none_match is not None:
+    tags = _parse_etags(if_none_match)
+    return "*" in tags or _strip_weak(etag) in {_strip_weak(tag) for tag in tags}
+
+  if_modified_since = request.headers.get("if-modified-since")
+  if if_modified_since is not None and last_modified is not None:
+    try:
+      since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+      return False
+    if since.tzinfo is None:
+      return False
+    # HTTP-dates have second precision, like the stored timestamps
+    return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
+
+  return False
+
+def has_conditional_headers(request: Request) -> bool:
+  return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+  """Validator headers of a response; clients may store it but must revalidate before reuse"""
+  headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+  if last_modified is not None:
+    headers["Last-Modified"] = http_date(last_modified)
+  return headers
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+  return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, last_modified))
+
+def if_match_versions(request: Request, entity_id: int) -> Optional[List[int]]:
+  """
+  Versions of an entity listed in the request's If-Match header.
+
+  Args:
+      request: Incoming write request
+      entity_id: ID of the entity being written
+
+  Returns:
+      None when there is no precondition (no header or "*"), otherwise the
+      versions the client accepts; empty when none of its ETags can match,
+      the write must then fail with 412
+  """
+  if_match = request.headers.get("if-match")
+  if if_match is None:
+    return None
+
+  tags = _parse_etags(if_match)
+  if "*" in tags:
+    return None
+
+  versions = []
+  for tag in tags:
+    # Weak ETags never match under the strong comparison If-Match requires
+    if tag.startswith("W/") or len(tag) < 2 or tag[0] != '"' or tag[-1] != '"':
+      continue
+    tag_id, _, tag_version = tag[1:-1].partition("-")
+    if tag_id == str(entity_id) and tag_version.isdigit():
+      versions.append(int(tag_version))
+  return versions
@@ -0,0 +1,50 @@
+from typing import AsyncIterator, Optional, Tuple
+
+async def iter_ndjson_lines(stream: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+  """
+  Split a byte stream into NDJSON lines without buffering the whole body.
+
+  Blank lines are skipped. A line longer than max_line_bytes is discarded up
+  to its newline and yielded as None so the caller can report it, which keeps
+  memory bounded by max_line_bytes whatever the client sends.
+  
+  Args:
+      stream: Async iterator of raw body chunks (e.g. request.stream())
+      max_line_bytes: Maximum accepted size of a single line
+      
+  Yields:
+      Tuple[int, Optional[bytes]]: 1-based line number and the line, or None if it was too long
+  """
+  buffer = bytearray()
+  line_number = 0
+  discarding = False
+
+  async for chunk in stream:
+    start = 0
+    while True:
+      newline = chunk.find(b"\n", start)
+      if newline == -1:
+        if not discarding:
+          buffer += chunk[start:]
+          if len(buffer) > max_line_bytes:
+            buffer.clear()
+            discarding = True
+        break
+
+      line_number += 1
+      if discarding:
+        discarding = False
+        yield line_number, None
+      else:
+        buffer += chunk[start:newline]
+        if len(buffer) > max_line_bytes:
+          yield line_number, None
+        elif buffer.strip():
+          yield line_number, bytes(buffer)
+        buffer.clear()
+      start = newline + 1
+
+  if discarding:
+    yield line_number + 1, None
+  elif buffer.strip():
+    yield line_number + 1, bytes(buffer)
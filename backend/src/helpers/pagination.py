@@ -0,0 +1,41 @@
+import base64
+import json
+
+from src.errors.pagination_errors import InvalidCursorError
+
+def encode_cursor(values: dict) -> str:
+  """
+  Encode the keyset position of the last row of a page as an opaque token.
+
+  Args:
+      values: Ordering column values of the last row returned (e.g. {"id": 42})
+
+  Returns:
+      str: URL-safe cursor token
+  """
+  raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+  return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, required_keys: tuple = ("id",)) -> dict:
+  """
+  Decode a cursor token produced by encode_cursor.
+
+  Args:
+      cursor: Opaque cursor token received from the client
+      required_keys: Keys that must be present in the decoded position
+
+  Returns:
+      dict: The keyset position
+
+  Raises:
+      InvalidCursorError: If the token is malformed or incomplete
+  """
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+  except (ValueError, UnicodeError) as e:
+    raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+  if not isinstance(values, dict) or any(key not in values for key in required_keys):
+    raise InvalidCursorError(f"Invalid cursor: {cursor}")
+  return values
@@ -0,0 +1,52 @@
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import load_only
+from sqlmodel import SQLModel
+
+from src.errors.field_errors import InvalidFieldsError
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+  """
+  Parse a ?fields= sparse fieldset.
+
+  Args:
+      fields: Comma-separated field names, e.g. "id,project_name"
+      allowed: Names the client may ask for
+
+  Returns:
+      The requested names in order without duplicates, or None when the
+      parameter is absent and the full representation is wanted
+
+  Raises:
+      InvalidFieldsError: If the list is empty or names an unknown field
+  """
+  if fields is None:
+    return None
+
+  names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+  if not names:
+    raise InvalidFieldsError("fields must name at least one field")
+
+  allowed = set(allowed)
+  unknown = [name for name in names if name not in allowed]
+  if unknown:
+    raise InvalidFieldsError(
+      f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(sorted(allowed))}"
+    )
+  return names
+
+def load_fields(model: type[SQLModel], fields: Iterable[str], required: Iterable[str] = ()):
+  """
+  Loader option reading only the given columns of a model.
+
+  Args:
+      model: Table model being selected
+      fields: Columns requested by the client
+      required: Columns the query needs regardless, e.g. for the keyset cursor
+
+  Returns:
+      A load_only() option for select(model).options(...); the other columns
+      are left unloaded and must not be accessed
+  """
+  names = dict.fromkeys([*fields, *required])
+  return load_only(*(getattr(model, name) for name in names))
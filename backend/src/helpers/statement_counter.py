@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+class StatementCounter:
+  """
+  Records the SQL statements an engine sends to the database while active.
+
+  Meant for tests and benchmarks that pin the round-trip budget of an
+  endpoint, e.g. one INSERT ... RETURNING for a create.
+  
+  Attributes:
+      statements: SQL text of every statement issued, in order
+  """
+  def __init__(self, engine):
+    self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    self.statements: List[str] = []
+
+  def _record(self, conn, cursor, statement, parameters, context, executemany):
+    self.statements.append(statement)
+
+  def __enter__(self) -> "StatementCounter":
+    event.listen(self.engine, "before_cursor_execute", self._record)
+    return self
+
+  def __exit__(self, exc_type, exc, tb) -> None:
+    event.remove(self.engine, "before_cursor_execute", self._record)
+
+  @property
+  def count(self) -> int:
+    return len(self.statements)
+
+@contextmanager
+def assert_statement_count(engine, expected: int) -> Iterator[StatementCounter]:
+  """
+  Assert that the wrapped block issues exactly `expected` SQL statements.
+  
+  Args:
+      engine: Engine (sync or async) the statements go through
+      expected: Number of statements the block is allowed to issue
+      
+  Raises:
+      AssertionError: If a different number of statements was issued
+  """
+  with StatementCounter(engine) as counter:
+    yield counter
+
+  if counter.count != expected:
+    issued = "\n".join(f"  {index + 1}. {statement}" for index, statement in enumerate(counter.statements))
+    raise AssertionError(f"Expected {expected} SQL statements, {counter.count} were issued:\n{issued}")
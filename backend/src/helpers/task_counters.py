@@ -0,0 +1,90 @@
+from collections import Counter
+from typing import Dict, Iterable, Mapping
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from src.models.models import Project, Task, TaskStatus
+
+# Project column holding the number of tasks in each status
+TASK_COUNTER_COLUMNS: Dict[TaskStatus, str] = {
+  TaskStatus.PENDING: "tasks_pending",
+  TaskStatus.ON_HOLD: "tasks_on_hold",
+  TaskStatus.IN_PROGRESS: "tasks_in_progress",
+  TaskStatus.UNDER_REVIEW: "tasks_under_review",
+  TaskStatus.COMPLETED: "tasks_completed",
+}
+
+def count_statuses(statuses: Iterable[TaskStatus]) -> Dict[TaskStatus, int]:
+  """
+  Count the tasks of a batch per status.
+
+  Args:
+      statuses: Status of every task in the batch
+
+  Returns:
+      dict: Number of tasks per status (statuses absent from the batch are omitted)
+  """
+  return dict(Counter(statuses))
+
+def initial_task_counters(status_counts: Mapping[TaskStatus, int]) -> dict:
+  """
+  Counter column values for a project inserted together with its tasks.
+
+  Args:
+      status_counts: Number of the new project's tasks per status
+
+  Returns:
+      dict: Value of every counter column, to merge into the project row
+  """
+  return {column: status_counts.get(task_status, 0) for task_status, column in TASK_COUNTER_COLUMNS.items()}
+
+async def increment_task_counters(session: AsyncSession, project_id: int, status_counts: Mapping[TaskStatus, int]) -> None:
+  """
+  Add to a project's counters in the session's current transaction.
+
+  The increments are computed by the database (SET col = col + n), so
+  concurrent writers serialize on the project row instead of overwriting
+  each other. Counts can be negative, a status change is -1 on the old
+  status and +1 on the new one.
+
+  Args:
+      session: Session whose transaction also writes the tasks
+      project_id: ID of the project the tasks belong to
+      status_counts: Change of the number of tasks per status
+  """
+  values = {
+    TASK_COUNTER_COLUMNS[task_status]: getattr(Project, TASK_COUNTER_COLUMNS[task_status]) + count
+    for task_status, count in status_counts.items()
+    if count
+  }
+  if values:
+    await session.execute(
+      update(Project).where(Project.id == project_id).values(**values, version=Project.version + 1)
+    )
+
+async def repair_task_counters(connection: AsyncConnection) -> int:
+  """
+  Recompute every project's counters from the tasks table in one statement.
+
+  Each counter is a correlated COUNT over the (project_id, status, id)
+  index, so projects without tasks are reset to zero as well. updated_at is
+  left as it was, but the version is bumped so clients holding an ETag
+  refetch a project whose counters had drifted.
+
+  Args:
+      connection: Connection to run the UPDATE on, the caller commits
+
+  Returns:
+      int: Number of projects updated
+  """
+  values = {
+    column: (
+      select(func.count(Task.id))
+      .where(Task.project_id == Project.id, Task.status == task_status)
+      .scalar_subquery()
+    )
+    for task_status, column in TASK_COUNTER_COLUMNS.items()
+  }
+  result = await connection.execute(update(Project).values(**values, updated_at=Project.updated_at, version=Project.version + 1))
+  return result.rowcount
@@ -1,12 +1,24 @@
 # Main entry point for the FastAPI application
+import time
+# Cold start is measured from here to the end of the lifespan startup
+STARTED_AT = time.perf_counter()
+
 from fastapi import FastAPI
 from src.core.db import lifespan
 from src.core.config import settings
+from src.core.serialization import DefaultJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.routes.project_routes import api_router
 from src.routes.task_routes import api_router as task_api_router
+from src.routes.search_routes import api_router as search_api_router
+from src.routes.system_routes import api_router as system_api_router, root_router as system_root_router
 from src.core.middleware.logging_middleware import LoggingMiddleware
-from src.middleware.validation import validation_middleware
+from src.core.middleware.metrics_middleware import MetricsMiddleware
+from src.core.middleware.profiler_middleware import ProfilerMiddleware
+from src.core.middleware.compression_middleware import CompressionMiddleware
+from src.core.middleware.admission_middleware import AdmissionMiddleware
+from src.core.middleware.read_your_writes_middleware import ReadYourWritesMiddleware
+from src.middleware.validation import ValidationMiddleware
 
 # Create FastAPI app    
 app = FastAPI(
@@ -14,17 +26,41 @@ app = FastAPI(
     title="UpTask API", 
     description="API for the UpTask project", 
     version="0.1.0",
+    # orjson when installed; the hot routes render their own responses
+    default_response_class=DefaultJSONResponse,
 ) 
+app.state.started_at = STARTED_AT
 
 # Include routes
 app.include_router(api_router, prefix="/api")
 app.include_router(task_api_router, prefix="/api")
+app.include_router(search_api_router, prefix="/api")
+app.include_router(system_api_router, prefix="/api")
+app.include_router(system_root_router)
 
 # Add logging middleware
 app.add_middleware(LoggingMiddleware)
 
 # Add validation middleware
-app.middleware("http")(validation_middleware)
+app.add_middleware(ValidationMiddleware)
+
+# Add profiler middleware
+app.add_middleware(ProfilerMiddleware)
+
+# Add read-your-writes middleware (keeps a client's reads on the primary after it writes)
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Add compression middleware (inside metrics so its time counts in the request latency)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Add admission middleware (inside metrics and CORS so shed requests are counted and readable)
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
+# Add metrics middleware (outside validation so rejected requests are counted too)
+app.add_middleware(MetricsMiddleware)
 
 # Add CORS middleware
 app.add_middleware(
@@ -33,6 +69,7 @@ app.add_middleware(
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=settings.CORS_ALLOW_METHODS,
     allow_headers=settings.CORS_ALLOW_HEADERS,
+    expose_headers=settings.CORS_EXPOSE_HEADERS,
 )
 
 @app.get("/")
@@ -0,0 +1,37 @@
+from typing import Callable, List, Optional
+from fastapi import HTTPException, Query, status
+
+from src.core.serialization import ResponseSerializer
+from src.errors.field_errors import InvalidFieldsError
+from src.helpers.sparse_fields import parse_fields
+
+def sparse_fieldset(serializer: ResponseSerializer) -> Callable:
+  """
+  Build a dependency parsing the ?fields= parameter of the serializer's responses.
+
+  Only fields that are both in the response schema and columns of the table
+  can be requested, so the selection can always be pushed down to the query.
+  
+  Args:
+      serializer: Serializer of the endpoint's rows
+      
+  Returns:
+      Callable: Dependency returning the requested field names, or None for all of them
+      
+  Raises:
+      HTTPException: 400 if a field is unknown
+  """
+  allowed = sorted(set(serializer.fields) & set(serializer.model.__table__.columns.keys()))
+
+  def dependency(
+    fields: Optional[str] = Query(
+      default=None,
+      description=f"Comma-separated fields to return, any of: {', '.join(allowed)}"
+    )
+  ) -> Optional[List[str]]:
+    try:
+      return parse_fields(fields, allowed)
+    except InvalidFieldsError as e:
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+  return dependency
@@ -1,49 +1,87 @@
 from fastapi import HTTPException, status
-from sqlmodel import select
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
 
 from src.models.models import Project
-from src.errors.project_errors import ProjectNotFoundError, DuplicateProjectNameError
+from src.core.cache import project_cache
+from src.core.replicas import uses_replica
+from src.errors.project_errors import ProjectNotFoundError
 from src.core.db import AsyncSessionDependency
+from src.core.profiler import profiled
 from src.core.logging import log_operation_start, log_operation_success
 
-async def validate_existing_project(project_id: int, session: AsyncSessionDependency) -> Project:
+def attach_cached_project(session: AsyncSessionDependency, project_data: dict) -> Project:
   """
-  Dependency to validate that a project exists.
+  Build a Project from cached column values and attach it to the session.
+
+  The instance is marked as already loaded, so it behaves like a row fetched
+  by this session (changes are flushed as UPDATEs) without a DB round trip.
+  
+  Args:
+      session: Database session the project is attached to
+      project_data: Column values stored in the project cache
+      
+  Returns:
+      Project: A persistent project owned by the given session
+  """
+  existing = session.identity_map.get(identity_key(Project, project_data["id"]))
+  if existing is not None:
+    return existing
+
+  project = Project(**project_data)
+  make_transient_to_detached(project)
+  session.add(project)
+  return project
+
+def validate_project_id(project_id: int) -> int:
+  """
+  Dependency to validate the format of a project ID without loading the project.
   
   Args:
       project_id: The ID of the project to validate
-      session: Database session dependency
       
   Returns:
-      Project: The validated project object
+      int: The validated project ID
       
   Raises:
-      HTTPException: 404 if project not found, 400 if invalid ID format
+      HTTPException: 400 if invalid ID format
   """
+  # Validate and convert project_id to int
   try:
-    log_operation_start("Validating project existence", f"ID: {project_id}")
-    
-    # Validate and convert project_id to int
-    try:
-      project_id_int = int(project_id)
-    except (ValueError, TypeError):
-      raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST, 
-        detail=f"Invalid project ID format: {project_id}. Must be a valid integer."
-      )
-    
-    # Validate project_id is positive
-    if project_id_int <= 0:
-      raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST, 
-        detail=f"Project ID must be a positive integer, got: {project_id_int}"
-      )
+    project_id_int = int(project_id)
+  except (ValueError, TypeError):
+    raise HTTPException(
+      status_code=status.HTTP_400_BAD_REQUEST, 
+      detail=f"Invalid project ID format: {project_id}. Must be a valid integer."
+    )
+  
+  # Validate project_id is positive
+  if project_id_int <= 0:
+    raise HTTPException(
+      status_code=status.HTTP_400_BAD_REQUEST, 
+      detail=f"Project ID must be a positive integer, got: {project_id_int}"
+    )
+  return project_id_int
+
+async def _existing_project(project_id: int, session: AsyncSessionDependency, use_cache: bool) -> Project:
+  project_id_int = validate_project_id(project_id)
+
+  try:
+    log_operation_start("Validating project existence", f"ID: {project_id_int}")
     
-    # Get project from database
-    project = await session.get(Project, project_id_int)
+    # Get project from the cache, falling back to the database
+    cached_project = project_cache.get(project_id_int) if use_cache else None
+    if cached_project is not None:
+      project = attach_cached_project(session, cached_project)
+    else:
+      project = await session.get(Project, project_id_int)
     
-    if not project: 
-      raise ProjectNotFoundError(f"Project with ID {project_id_int} not found or does not exist")
+      if not project: 
+        raise ProjectNotFoundError(f"Project with ID {project_id_int} not found or does not exist")
+
+      # A replica may not have replayed the latest write yet, only primary rows are cached
+      if not uses_replica(session):
+        project_cache.set(project.id, project.model_dump())
   
     log_operation_success("Project validation", f"Project: {project.project_name}")
     return project
@@ -56,48 +94,45 @@ async def validate_existing_project(project_id: int, session: AsyncSessionDepend
       detail=f"Error validating project: {str(e)}"
     )
 
-async def validate_project_name_not_exists(project_name: str, session: AsyncSessionDependency, exclude_project_id: int = None) -> None:
+@profiled
+async def validate_existing_project(project_id: int, session: AsyncSessionDependency) -> Project:
   """
-  Dependency to validate that a project name doesn't already exist.
+  Dependency to validate that a project exists.
+
+  The project may come from this worker's cache, which does not see the
+  writes handled by other workers for up to PROJECT_CACHE_TTL_SECONDS: good
+  for an existence check, not for responses carrying the project's body or
+  validators (see load_existing_project).
   
   Args:
-      project_name: The project name to validate
+      project_id: The ID of the project to validate
       session: Database session dependency
-      exclude_project_id: Optional project ID to exclude from validation (for updates)
+      
+  Returns:
+      Project: The validated project object
       
   Raises:
-      HTTPException: 400 if project name already exists
+      HTTPException: 404 if project not found, 400 if invalid ID format
   """
-  try:
-    log_operation_start("Validating project name uniqueness", f"Name: {project_name}")
-    
-    # Validate project name length
-    if len(project_name) < 3:
-      raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail="Project name must be at least 3 characters long"
-      )
-    
-    # Build query to check for existing project with same name
-    query = select(Project).where(Project.project_name == project_name)
-    
-    # If updating, exclude current project from validation
-    if exclude_project_id is not None:
-      query = query.where(Project.id != exclude_project_id)
-    
-    existing_project = await session.execute(query)
-    
-    if existing_project.scalars().first():
-      raise DuplicateProjectNameError(f"A project with the name '{project_name}' already exists")
-    
-    log_operation_success("Project name validation", f"Name '{project_name}' is available")
-    
-  except DuplicateProjectNameError as e:
-    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-  except HTTPException:
-    raise
-  except Exception as e:
-    raise HTTPException(
-      status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-      detail=f"Error validating project name: {str(e)}"
-    )
\ No newline at end of file
+  return await _existing_project(project_id, session, use_cache=True)
+
+@profiled
+async def load_existing_project(project_id: int, session: AsyncSessionDependency) -> Project:
+  """
+  Dependency loading a project from the database, never from the cache.
+
+  For GET /api/projects/{id}, whose body, ETag and Last-Modified must be the
+  current ones whichever worker handled the last write. The row read from
+  the primary refreshes this worker's cache.
+  
+  Args:
+      project_id: The ID of the project to load
+      session: Database session dependency
+      
+  Returns:
+      Project: The current project
+      
+  Raises:
+      HTTPException: 404 if project not found, 400 if invalid ID format
+  """
+  return await _existing_project(project_id, session, use_cache=False)
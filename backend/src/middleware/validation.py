@@ -1,30 +1,123 @@
 # Validate request
-from fastapi import Request, HTTPException
-from typing import Callable
+from typing import Any, Callable
 import json
 
-async def validation_middleware(request: Request, call_next: Callable):
-    # Validations before processing the request
-    if request.method == "POST":
-        # Validate Content-Type
-        if "application/json" not in request.headers.get("content-type", ""):
-            raise HTTPException(status_code=400, detail="Content-Type must be application/json")
-        
-        # Validate that the body is not empty
-        try:
-            body = await request.body()
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Bodies of these content types are streamed to their route and parsed there
+STREAMING_CONTENT_TYPES = ("application/x-ndjson",)
+
+# Keys under scope["state"] holding the body read by ValidationMiddleware
+RAW_BODY_STATE_KEY = "raw_body"
+JSON_BODY_STATE_KEY = "json_body"
+
+class ValidationMiddleware:
+    """
+    Pure ASGI middleware validating requests before they reach the routes.
+
+    POST bodies are read and decoded once here; the raw bytes and the parsed
+    JSON are stored on the request scope and replayed downstream, so routes
+    using CachedBodyRoute do not decode the body a second time.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Validations before processing the request
+        headers = Headers(scope=scope)
+        content_type = headers.get("content-type", "")
+        is_streaming_body = any(streaming_type in content_type for streaming_type in STREAMING_CONTENT_TYPES)
+
+        if scope["method"] == "POST" and not is_streaming_body:
+            # Validate Content-Type
+            if "application/json" not in content_type:
+                await _reject(scope, receive, send, "Content-Type must be application/json")
+                return
+
+            # Validate that the body is not empty
+            body = await _read_body(receive)
             if not body:
-                raise HTTPException(status_code=400, detail="Request body cannot be empty")
-            
+                await _reject(scope, receive, send, "Request body cannot be empty")
+                return
+
             # Validate that the body is a valid JSON
-            json.loads(body)
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=400, detail="Invalid JSON format")
-    
-    # Validate required headers
-    if not request.headers.get("user-agent"):
-        raise HTTPException(status_code=400, detail="User-Agent header is required")
-    
-    # Continue with the request if all validations pass
-    return await call_next(request)
-    
\ No newline at end of file
+            try:
+                json_body = json.loads(body)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                await _reject(scope, receive, send, "Invalid JSON format")
+                return
+
+            scope["state"] = {
+                **scope.get("state", {}),
+                RAW_BODY_STATE_KEY: body,
+                JSON_BODY_STATE_KEY: json_body
+            }
+            receive = _replay_body(body, receive)
+
+        # Validate required headers
+        if not headers.get("user-agent"):
+            await _reject(scope, receive, send, "User-Agent header is required")
+            return
+
+        # Continue with the request if all validations pass
+        await self.app(scope, receive, send)
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    body_sent = False
+
+    async def replay() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Once the body is consumed, defer to the server (e.g. for http.disconnect)
+        return await receive()
+
+    return replay
+
+async def _reject(scope: Scope, receive: Receive, send: Send, detail: str):
+    response = JSONResponse(status_code=400, content={"detail": detail})
+    await response(scope, receive, send)
+
+class CachedBodyRequest(Request):
+    """Request that reuses the body and JSON already decoded by ValidationMiddleware."""
+    async def body(self) -> bytes:
+        state = self.scope.get("state", {})
+        if RAW_BODY_STATE_KEY in state:
+            return state[RAW_BODY_STATE_KEY]
+        return await super().body()
+
+    async def json(self) -> Any:
+        state = self.scope.get("state", {})
+        if JSON_BODY_STATE_KEY in state:
+            return state[JSON_BODY_STATE_KEY]
+        return await super().json()
+
+class CachedBodyRoute(APIRoute):
+    """Route class handing endpoints a CachedBodyRequest."""
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await original_route_handler(CachedBodyRequest(request.scope, request.receive))
+
+        return route_handler
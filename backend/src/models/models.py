@@ -3,7 +3,7 @@ from enum import Enum
 from sqlmodel import Field, SQLModel, Relationship
 from typing import Optional, List
 from datetime import datetime
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from sqlalchemy.orm import Mapped, relationship
 from sqlalchemy.types import DateTime as SQLAlchemyDateTime
 from src.helpers.format_date import now_without_microseconds
@@ -19,19 +19,29 @@ class Project(SQLModel, table=True):
   
   Attributes:
       id: Primary key identifier for the project
-      project_name: Name of the project (indexed for faster queries)
+      project_name: Name of the project (unique index, also used for faster queries)
       project_description: Detailed description of the project
       client_name: Name of the client (indexed for faster queries)
       tasks: One-to-many relationship with Task objects
+      tasks_pending, tasks_on_hold, tasks_in_progress, tasks_under_review, tasks_completed:
+          Number of the project's tasks in each status, kept up to date by the
+          statements that write tasks (see src/helpers/task_counters.py)
+      version: Incremented by every UPDATE of the row, the ETag and If-Match checks use it
       created_at: Timestamp for when the project was created
       updated_at: Timestamp for when the project was last updated
   """
   __tablename__ = "projects"
   id: Optional[int] = Field(default=None, primary_key=True)
-  project_name: str = Field(index=True, min_length=3, max_length=255)
+  project_name: str = Field(index=True, unique=True, min_length=3, max_length=255)
   project_description: str = Field(min_length=3, max_length=255)
   client_name: str = Field(index=True, min_length=3, max_length=255)
   tasks: Mapped[List["Task"]] = Relationship(sa_relationship=relationship("Task", back_populates="project"))
+  tasks_pending: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  tasks_on_hold: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  tasks_in_progress: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  tasks_under_review: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  tasks_completed: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
   created_at: datetime = Field(
     default_factory=now_without_microseconds, 
     sa_column=Column(
@@ -74,11 +84,49 @@ class Task(SQLModel, table=True):
       status: Current status of the task (pending, in_progress, etc.)
       created_at: Timestamp for when the task was created
       updated_at: Timestamp for when the task was last updated
+
+  Indexes:
+      (project_id, status, id): a project's tasks filtered by status in ID order,
+      also serves any lookup by project_id alone
+      (project_id, created_at, id): a project's tasks in creation order
   """
   __tablename__ = "tasks"
+  __table_args__ = (
+    Index("ix_tasks_project_id_status_id", "project_id", "status", "id"),
+    Index("ix_tasks_project_id_created_at_id", "project_id", "created_at", "id"),
+  )
   id: Optional[int] = Field(default=None, primary_key=True)
   task_name: str = Field(index=True, min_length=3, max_length=255)
   task_description: str = Field(min_length=3, max_length=255) 
   project_id: Optional[int] = Field(default=None, foreign_key="projects.id") 
   project: Mapped[Optional["Project"]] = Relationship(sa_relationship=relationship("Project", back_populates="tasks"))
-  status: TaskStatus = Field(default=TaskStatus.PENDING)
\ No newline at end of file
+  status: TaskStatus = Field(default=TaskStatus.PENDING)
+  created_at: datetime = Field(
+    default_factory=now_without_microseconds, 
+    sa_column=Column(
+    SQLAlchemyDateTime, 
+    default=now_without_microseconds)
+  )
+  updated_at: datetime = Field(
+    default_factory=now_without_microseconds, 
+    sa_column=Column(
+    SQLAlchemyDateTime, 
+    default=now_without_microseconds, 
+    onupdate=now_without_microseconds)  
+  )
+
+# Schema version
+
+# Bump whenever a table, column or index above changes, so servers started
+# with DB_STARTUP_MODE=verify refuse a database that was not migrated
+SCHEMA_VERSION = 1
+
+class SchemaVersion(SQLModel, table=True):
+  """
+  Single-row table holding the schema version the database was created with.
+
+  Attributes:
+      version: SCHEMA_VERSION of the code that created or last migrated the tables
+  """
+  __tablename__ = "schema_version"
+  version: int = Field(primary_key=True)
@@ -0,0 +1,112 @@
+# Full-text search indexes over projects and tasks
+import re
+from typing import Dict, List, Tuple
+
+from sqlalchemy import DDL, Index, event, func, literal_column, table, column
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.models.models import Project, Task
+
+# Text search configuration of the PostgreSQL indexes. 'simple' does no
+# stemming or stop words, names and clients are mostly proper nouns.
+# Changing it means recreating the indexes.
+TS_CONFIG = literal_column("'simple'::regconfig")
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# PostgreSQL: weighted tsvector expressions, indexed with GIN. The queries must
+# use the very same expressions for the planner to pick the indexes.
+
+def _weighted(text_column, weight: str):
+  return func.setweight(func.to_tsvector(TS_CONFIG, text_column), literal_column(f"'{weight}'"))
+
+def project_search_document():
+  columns = Project.__table__.c
+  return (
+    _weighted(columns.project_name, "A")
+    .op("||")(_weighted(columns.client_name, "B"))
+    .op("||")(_weighted(columns.project_description, "C"))
+  )
+
+def task_search_document():
+  columns = Task.__table__.c
+  return _weighted(columns.task_name, "A").op("||")(_weighted(columns.task_description, "C"))
+
+SEARCH_INDEXES = [
+  Index("ix_projects_search", project_search_document(), postgresql_using="gin").ddl_if(dialect="postgresql"),
+  Index("ix_tasks_search", task_search_document(), postgresql_using="gin").ddl_if(dialect="postgresql"),
+]
+# Expression-only indexes are not bound to their table automatically
+Project.__table__.append_constraint(SEARCH_INDEXES[0])
+Task.__table__.append_constraint(SEARCH_INDEXES[1])
+
+# SQLite: external content FTS5 tables kept in sync with their source table by
+# triggers. Updates only touch the index when a searchable column changes, so
+# e.g. the task counter updates on projects do not rewrite it.
+
+# source table -> (FTS table, searchable columns, bm25 weight of each column)
+FTS_TABLES: Dict[str, Tuple[str, Tuple[str, ...], Tuple[float, ...]]] = {
+  "projects": ("projects_fts", ("project_name", "project_description", "client_name"), (10.0, 2.0, 4.0)),
+  "tasks": ("tasks_fts", ("task_name", "task_description"), (10.0, 2.0)),
+}
+
+def fts_table(source: str):
+  """Lightweight table construct of the FTS5 table indexing a source table"""
+  fts_name, columns, _ = FTS_TABLES[source]
+  return table(fts_name, column("rowid"), *(column(name) for name in columns))
+
+def _fts_ddl(source: str) -> List[str]:
+  fts_name, columns, _ = FTS_TABLES[source]
+  names = ", ".join(columns)
+  new_values = ", ".join(f"new.{name}" for name in columns)
+  old_values = ", ".join(f"old.{name}" for name in columns)
+  delete_old = f"INSERT INTO {fts_name}({fts_name}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+  insert_new = f"INSERT INTO {fts_name}(rowid, {names}) VALUES (new.id, {new_values});"
+  return [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_name} USING fts5("
+    f"{names}, content='{source}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {fts_name}_ai AFTER INSERT ON {source} BEGIN {insert_new} END",
+    f"CREATE TRIGGER IF NOT EXISTS {fts_name}_ad AFTER DELETE ON {source} BEGIN {delete_old} END",
+    f"CREATE TRIGGER IF NOT EXISTS {fts_name}_au AFTER UPDATE OF {names} ON {source} BEGIN {delete_old} {insert_new} END",
+  ]
+
+for _source_table in (Project.__table__, Task.__table__):
+  for _statement in _fts_ddl(_source_table.name):
+    event.listen(_source_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+  event.listen(
+    _source_table, "after_drop", DDL(f"DROP TABLE IF EXISTS {FTS_TABLES[_source_table.name][0]}").execute_if(dialect="sqlite")
+  )
+
+def search_terms(query: str) -> List[str]:
+  """Words of a user query; punctuation and search operators are dropped"""
+  return _WORD.findall(query)
+
+def postgres_tsquery(terms: List[str]) -> str:
+  """to_tsquery() input matching every term, the last one as a prefix (search as you type)"""
+  return " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+
+def fts5_query(terms: List[str]) -> str:
+  """FTS5 MATCH expression matching every term, the last one as a prefix (search as you type)"""
+  quoted = [f'"{term}"' for term in terms]
+  quoted[-1] += "*"
+  return " ".join(quoted)
+
+async def ensure_search_indexes(connection: AsyncConnection) -> None:
+  """
+  Create the search indexes of a database whose tables already exist, and
+  (re)build them from the current rows.
+
+  create_all only sets them up together with new tables.
+
+  Args:
+      connection: Connection to run the DDL on, the caller commits
+  """
+  dialect = connection.dialect.name
+  if dialect == "postgresql":
+    for index in SEARCH_INDEXES:
+      await connection.run_sync(lambda sync_connection, index=index: index.create(sync_connection, checkfirst=True))
+  elif dialect == "sqlite":
+    for source, (fts_name, _, _) in FTS_TABLES.items():
+      for statement in _fts_ddl(source):
+        await connection.exec_driver_sql(statement)
+      await connection.exec_driver_sql(f"INSERT INTO {fts_name}({fts_name}) VALUES ('rebuild')")
@@ -1,47 +1,131 @@
-from fastapi import APIRouter, status, Depends
+from typing import List, Optional
+from fastapi import APIRouter, status, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 
 from src.controllers.project_controller import ProjectController
-from src.core.db import AsyncSessionDependency
-from src.schemas.ProjectSchema import ProjectCreate, ProjectUpdate
+from src.controllers.export_controller import ExportController
+from src.core.db import AsyncSessionDependency, request_session
+from src.middleware.validation import CachedBodyRoute
+from src.core.config import settings
+from src.schemas.ProjectSchema import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectWithTasksResponse, ProjectInclude
+from src.schemas.TaskSchema import TaskResponse
+from src.schemas.ResponseSchema import ItemResponse, PageResponse
+from src.core.serialization import EmbeddingSerializer, ResponseSerializer
+from src.schemas.ExportSchema import ExportFormat, ExportInclude
 from src.middleware.project import (
-    validate_existing_project,
-    validate_project_name_not_exists
+    load_existing_project,
+    validate_project_id
 )
-from src.models.models import Project
+from src.middleware.fields import sparse_fieldset
+from src.models.models import Project, Task
+from src.helpers.http_cache import (
+    cache_headers,
+    entity_etag,
+    has_conditional_headers,
+    if_match_versions,
+    is_not_modified,
+    not_modified_response
+)
+
+api_router = APIRouter(prefix="/projects", tags=["projects"], route_class=CachedBodyRoute)
 
-api_router = APIRouter(prefix="/projects", tags=["projects"])
+# Project rows are rendered straight to JSON with the ProjectResponse fields
+project_serializer = ResponseSerializer(Project, ProjectResponse)
+project_fields = sparse_fieldset(project_serializer)
+# ?include=tasks adds each project's first tasks
+project_tasks_serializer = EmbeddingSerializer(project_serializer, "tasks", ResponseSerializer(Task, TaskResponse))
 
-@api_router.post("/", status_code=status.HTTP_201_CREATED)
+@api_router.post("/", status_code=status.HTTP_201_CREATED, response_model=ItemResponse[ProjectResponse])
 async def create_project(
     project_data: ProjectCreate,
     session: AsyncSessionDependency
 ):
-    await validate_project_name_not_exists(project_data.project_name, session)
-
+    # Duplicate names are rejected by the unique index on project_name
     project_controller = ProjectController(session)
-    return await project_controller.create_project(project_data)
+    result = await project_controller.create_project(project_data)
+    return project_serializer.item(result, status_code=status.HTTP_201_CREATED)
     
-@api_router.get("/")
-async def get_all_projects(session: AsyncSessionDependency):
+@api_router.post("/import", status_code=status.HTTP_201_CREATED)
+async def import_projects(request: Request, session: AsyncSessionDependency):
+    # The body is NDJSON and is consumed incrementally, never buffered whole
+    project_controller = ProjectController(session)
+    return await project_controller.import_projects(request.stream())
+
+@api_router.get("/", response_model=PageResponse[ProjectWithTasksResponse])
+async def get_all_projects(
+    request: Request,
+    session: AsyncSessionDependency,
+    limit: int = Query(default=settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    client_name: Optional[str] = None,
+    project_name: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(project_fields),
+    include: Optional[ProjectInclude] = None
+):
   project_controller = ProjectController(session)
-  return await project_controller.get_all_projects()
 
-@api_router.get("/{project_id}")
+  # Revalidations are answered from the page's row versions, without loading the rows
+  if has_conditional_headers(request):
+    validators = await project_controller.get_projects_page_validators(limit, cursor, client_name, project_name)
+    if validators is not None and is_not_modified(request, *validators):
+      return not_modified_response(*validators)
+
+  # ?fields= limits both the columns read and the ones serialized
+  include_tasks = include == ProjectInclude.TASKS
+  result = await project_controller.get_all_projects(limit, cursor, client_name, project_name, fields, include_tasks)
+  validators = ProjectController.projects_page_validators(
+    limit, cursor, client_name, project_name, result["data"], has_next=result["next_cursor"] is not None
+  )
+  serializer = project_tasks_serializer if include_tasks else project_serializer
+  return serializer.page(result, headers=cache_headers(*validators), fields=fields)
+
+@api_router.get("/export")
+async def export_projects(
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    include: Optional[ExportInclude] = None
+):
+    # The body is streamed after the dependencies are torn down, the export opens
+    # its session then, on a replica like the other reads
+    export_controller = ExportController(session_factory=lambda: request_session(request))
+    body = export_controller.stream_projects(format, include == ExportInclude.TASKS)
+
+    if format == ExportFormat.CSV:
+        return StreamingResponse(
+            body,
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="projects.csv"'}
+        )
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
+@api_router.get("/{project_id}", response_model=ProjectWithTasksResponse)
 async def get_project_by_id(
+    request: Request,
     session: AsyncSessionDependency,
-    project: Project = Depends(validate_existing_project)
+    project: Project = Depends(load_existing_project),
+    fields: Optional[List[str]] = Depends(project_fields),
+    include: Optional[ProjectInclude] = None
 ):
+    # A client with the current version gets a 304 before anything is serialized,
+    # adding a task bumps the project's version so it also covers the embedded tasks
+    etag = entity_etag(project.id, project.version)
+    if is_not_modified(request, etag, project.updated_at):
+        return not_modified_response(etag, project.updated_at)
+
+    include_tasks = include == ProjectInclude.TASKS
     project_controller = ProjectController(session)
-    return await project_controller.get_project_by_id(project)
+    project = await project_controller.get_project_by_id(project, include_tasks)
+    serializer = project_tasks_serializer if include_tasks else project_serializer
+    return serializer.one(project, headers=cache_headers(etag, project.updated_at), fields=fields)
 
-@api_router.patch("/{project_id}")
+@api_router.patch("/{project_id}", response_model=ProjectResponse)
 async def update_project(
+    request: Request,
     project_data: ProjectUpdate,
     session: AsyncSessionDependency,
-    project: Project = Depends(validate_existing_project)
+    project_id: int = Depends(validate_project_id)
 ):
-    if project_data.project_name:
-        await validate_project_name_not_exists(project_data.project_name, session, project.id)
-
+    # Existence, name uniqueness and the If-Match version are checked by the UPDATE itself
     project_controller = ProjectController(session)
-    return await project_controller.update_project(project, project_data)
\ No newline at end of file
+    project = await project_controller.update_project(project_id, project_data, if_match_versions(request, project_id))
+    return project_serializer.one(project, headers=cache_headers(entity_etag(project.id, project.version), project.updated_at))
\ No newline at end of file
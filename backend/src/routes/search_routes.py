@@ -0,0 +1,20 @@
+from typing import Optional
+from fastapi import APIRouter, Query
+
+from src.controllers.search_controller import SearchController
+from src.core.config import settings
+from src.core.db import AsyncSessionDependency
+from src.schemas.SearchSchema import SearchType
+
+api_router = APIRouter(prefix="/search", tags=["search"])
+
+@api_router.get("")
+async def search(
+  session: AsyncSessionDependency,
+  q: str = Query(min_length=1, max_length=200),
+  type: Optional[SearchType] = None,
+  limit: int = Query(default=settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+  cursor: Optional[str] = None
+):
+  search_controller = SearchController(session)
+  return await search_controller.search(q, limit, cursor, type)
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src.core.admission import admission_limiters
+from src.core.cache import project_cache
+from src.core.config import settings
+from src.core.db import get_engine, ping_database
+from src.core.logging import logger
+from src.core.pool import get_pool_stats
+from src.core.metrics import registry
+
+api_router = APIRouter(prefix="/system", tags=["system"])
+
+# Operational endpoints served at the root, outside /api
+root_router = APIRouter(tags=["system"])
+
+@api_router.get("/cache")
+async def get_cache_stats():
+  return {
+    "data": {"projects": project_cache.stats()},
+    "status": "success"
+  }
+
+@api_router.get("/pool")
+async def get_pool_usage():
+  return {
+    "data": get_pool_stats(get_engine().pool),
+    "status": "success"
+  }
+
+@api_router.get("/admission")
+async def get_admission_usage():
+  return {
+    "data": {group: limiter.stats() for group, limiter in admission_limiters.items()},
+    "status": "success"
+  }
+
+@root_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+  return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@root_router.get("/healthz")
+async def get_liveness():
+  # Liveness: the event loop answers, no I/O so a slow database never gets the process restarted
+  return {"status": "ok"}
+
+@root_router.get("/readyz")
+async def get_readiness(request: Request):
+  """
+  Readiness: startup finished and a pooled connection answers within READINESS_TIMEOUT_SECONDS.
+
+  Returns:
+      200 when the instance can take traffic, 503 otherwise
+  """
+  if not getattr(request.app.state, "ready", False):
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "starting"})
+  try:
+    await ping_database(settings.READINESS_TIMEOUT_SECONDS)
+  except Exception as e:
+    logger.warning("Readiness check failed: %r", e)
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "unavailable"})
+  return {"status": "ready"}
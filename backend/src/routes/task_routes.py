@@ -1,14 +1,51 @@
-from fastapi import APIRouter, status, Depends
+from typing import Any, List, Optional
+from fastapi import APIRouter, status, Depends, Body, Query
 
 from src.controllers.task_controller import TaskController
-from src.schemas.TaskSchema import TaskCreate
+from src.schemas.TaskSchema import TaskCreate, TaskResponse, TaskSort, SortOrder
+from src.schemas.ResponseSchema import ItemResponse, PageResponse
+from src.core.serialization import ResponseSerializer
+from src.core.config import settings
 from src.core.db import AsyncSessionDependency
+from src.middleware.validation import CachedBodyRoute
 from src.middleware.project import validate_existing_project
-from src.models.models import Project
+from src.middleware.fields import sparse_fieldset
+from src.models.models import Project, Task, TaskStatus
 
-api_router = APIRouter(prefix="/tasks", tags=["tasks"])
+api_router = APIRouter(prefix="/tasks", tags=["tasks"], route_class=CachedBodyRoute)
 
-@api_router.post("/{project_id}/tasks", status_code=status.HTTP_201_CREATED)
+# Task rows are rendered straight to JSON with the TaskResponse fields
+task_serializer = ResponseSerializer(Task, TaskResponse)
+task_fields = sparse_fieldset(task_serializer)
+
+@api_router.post("/{project_id}/tasks", status_code=status.HTTP_201_CREATED, response_model=ItemResponse[TaskResponse])
 async def create_task(task_data: TaskCreate, session: AsyncSessionDependency, project: Project = Depends(validate_existing_project)):
    task_controller = TaskController(session)
-   return await task_controller.create_task(project.id, task_data)
\ No newline at end of file
+   result = await task_controller.create_task(project.id, task_data)
+   return task_serializer.item(result, status_code=status.HTTP_201_CREATED)
+
+@api_router.get("/{project_id}/tasks", response_model=PageResponse[TaskResponse])
+async def get_tasks(
+   session: AsyncSessionDependency,
+   project: Project = Depends(validate_existing_project),
+   limit: int = Query(default=settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+   cursor: Optional[str] = None,
+   task_status: Optional[List[TaskStatus]] = Query(default=None, alias="status"),
+   sort: TaskSort = TaskSort.ID,
+   order: SortOrder = SortOrder.ASC,
+   fields: Optional[List[str]] = Depends(task_fields)
+):
+   # Repeat ?status= to match several statuses, e.g. the open ones
+   task_controller = TaskController(session)
+   result = await task_controller.get_tasks(project.id, limit, cursor, task_status, sort, order, fields)
+   return task_serializer.page(result, fields=fields)
+
+@api_router.post("/{project_id}/tasks/bulk", status_code=status.HTTP_201_CREATED)
+async def create_tasks_bulk(
+   session: AsyncSessionDependency,
+   tasks_data: List[Any] = Body(...),
+   project: Project = Depends(validate_existing_project)
+):
+   # Items are validated one by one in the controller so errors can be reported per item
+   task_controller = TaskController(session)
+   return await task_controller.create_tasks_bulk(project.id, tasks_data)
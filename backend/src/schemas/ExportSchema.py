@@ -0,0 +1,14 @@
+from enum import Enum
+
+class ExportFormat(str, Enum):
+  """
+  Enum representing the supported export formats.
+  """
+  NDJSON = "ndjson"
+  CSV = "csv"
+
+class ExportInclude(str, Enum):
+  """
+  Enum representing the related entities that can be embedded in an export.
+  """
+  TASKS = "tasks"
@@ -1,7 +1,10 @@
 # Validate data 
-from typing import Optional
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
 from pydantic import ConfigDict
 from src.schemas.base import CleanStrModel, ProjectValidators
+from src.schemas.TaskSchema import TaskCreate, TaskResponse
 from sqlmodel import Field
 
 class ProjectBase(CleanStrModel):
@@ -12,8 +15,22 @@ class ProjectBase(CleanStrModel):
 class ProjectCreate(ProjectBase, ProjectValidators):
   pass
 
+class ProjectImport(ProjectCreate):
+  tasks: List[TaskCreate] = Field(default_factory=list)
+
 class ProjectResponse(ProjectBase):
   id: int 
+  tasks_pending: int
+  tasks_on_hold: int
+  tasks_in_progress: int
+  tasks_under_review: int
+  tasks_completed: int
+  version: int
+  created_at: datetime
+  updated_at: datetime
+
+class ProjectWithTasksResponse(ProjectResponse):
+  tasks: Optional[List[TaskResponse]] = Field(default=None, description="First tasks of the project, with ?include=tasks")
 
 class ProjectUpdate(ProjectBase, ProjectValidators):
   project_name: Optional[str] = Field(default=None)
@@ -21,4 +38,10 @@ class ProjectUpdate(ProjectBase, ProjectValidators):
   client_name: Optional[str] = Field(default=None)
 
   # Pydantic config
-  model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+  model_config = ConfigDict(from_attributes=True)
+
+class ProjectInclude(str, Enum):
+  """
+  Enum representing the related entities that can be embedded in a project response.
+  """
+  TASKS = "tasks"
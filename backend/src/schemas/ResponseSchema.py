@@ -0,0 +1,14 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+class ItemResponse(BaseModel, Generic[T]):
+  message: Optional[str] = None
+  data: T
+  status: str
+
+class PageResponse(BaseModel, Generic[T]):
+  data: List[T]
+  next_cursor: Optional[str] = None
+  status: str
@@ -0,0 +1,8 @@
+from enum import Enum
+
+class SearchType(str, Enum):
+  """
+  Enum representing the entities a search can be restricted to.
+  """
+  PROJECTS = "projects"
+  TASKS = "tasks"
@@ -1,3 +1,5 @@
+from datetime import datetime
+from enum import Enum
 from typing import Optional
 from pydantic import ConfigDict
 from src.schemas.base import CleanStrModel, TaskValidators
@@ -15,8 +17,8 @@ class TaskCreate(TaskBase, TaskValidators):
 class TaskResponse(TaskBase):
   id: int
   project_id: int
-  created_at: str
-  updated_at: str
+  created_at: datetime
+  updated_at: datetime
 
 class TaskUpdate(TaskBase, TaskValidators):
   task_name: Optional[str] = Field(default=None, min_length=3, max_length=255)
@@ -26,3 +28,16 @@ class TaskUpdate(TaskBase, TaskValidators):
   # Pydantic config
   model_config = ConfigDict(from_attributes=True)
 
+class TaskSort(str, Enum):
+  """
+  Enum representing the orderings available when listing a project's tasks.
+  """
+  ID = "id"
+  CREATED_AT = "created_at"
+
+class SortOrder(str, Enum):
+  """
+  Enum representing the sort direction of a listing.
+  """
+  ASC = "asc"
+  DESC = "desc"